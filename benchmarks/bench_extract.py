@@ -0,0 +1,85 @@
+"""
+Benchmark of the HTML text extractors on the saved pages of benchmarks/fixtures/html.
+
+Each fixture `<name>.html` comes with `<name>.txt`, the text of its main content. For every
+extractor the script reports the CPU time per page and, over the words of the output:
+- precision: the share of the output that belongs to the main content,
+- recall: the share of the main content that is in the output,
+- budget recall: the recall within the first `--text-length` characters, i.e. what reaches the prompt.
+BeautifulSoup's `get_text`, used by ScrapTool before, is included when bs4 is installed.
+
+Usage:
+    python benchmarks/bench_extract.py [--text-length 4000] [--repeat 5]
+"""
+import os
+import re
+import time
+import argparse
+import functools
+from collections import Counter
+from miniagent.tools.html_extractor import available_backends, extract_main_text, extract_text
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+WORD = re.compile(r"\w+")
+
+
+def words(text: str) -> Counter:
+    return Counter(WORD.findall(text.lower()))
+
+
+def overlap(output: str, gold: str):
+    output_words, gold_words = words(output), words(gold)
+    common = sum((output_words & gold_words).values())
+    precision = common / max(sum(output_words.values()), 1)
+    recall = common / max(sum(gold_words.values()), 1)
+    return precision, recall
+
+
+def extractors():
+    found = {}
+    try:
+        from bs4 import BeautifulSoup
+        found["bs4 get_text"] = lambda html: BeautifulSoup(html, "html.parser").get_text()
+    except ImportError:
+        pass
+    found["text"] = extract_text
+    for backend in available_backends():
+        found[f"main ({backend})"] = functools.partial(extract_main_text, backend=backend)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--text-length", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = []
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.endswith(".html"):
+            with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+                html = f.read()
+            with open(os.path.join(FIXTURES, name[:-5] + ".txt"), encoding="utf-8") as f:
+                pages.append((name, html, f.read()))
+
+    print(f"{'extractor':<20}{'ms/page':>10}{'precision':>11}{'recall':>9}{'budget recall':>15}")
+    for name, extractor in extractors().items():
+        elapsed, precision, recall, budget_recall = 0.0, 0.0, 0.0, 0.0
+        for _, html, gold in pages:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                output = extractor(html)
+                best = min(best, time.perf_counter() - start)
+            elapsed += best
+            p, r = overlap(output, gold)
+            precision += p
+            recall += r
+            budget_recall += overlap(output[:args.text_length], gold)[1]
+        n = len(pages)
+        print(f"{name:<20}{elapsed / n * 1e3:>10.2f}{precision / n:>11.2%}{recall / n:>9.2%}{budget_recall / n:>15.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Import-time regression benchmark, based on `python -X importtime`.
+
+Each statement runs in a fresh interpreter. The script reports the median time spent importing
+modules (interpreter start-up excluded) and the heavy dependencies the statement loaded. With
+--check, it exits with an error if importing the packages loads a heavy dependency, or if a
+statement exceeds --budget-ms.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 5] [--check] [--budget-ms 300]
+"""
+import sys
+import argparse
+import statistics
+import subprocess
+
+
+HEAVY_MODULES = ["openai", "arxiv", "yagmail", "pypdf", "search_engines", "bs4", "ftfy", "lxml", "tiktoken"]
+
+# statement -> whether it must stay free of heavy dependencies
+STATEMENTS = {
+    "import miniagent.llm": True,
+    "import miniagent.tools": True,
+    "import miniagent.agent": True,
+    "from miniagent.tools import PDFReaderTool, TOOL_REGISTER; TOOL_REGISTER['PDFReaderTool']()": True,
+    "from miniagent.tools import ArxivTool; ArxivTool()": False,
+    "from miniagent.llm import ChatGPT": False,
+}
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Returns the cumulative import time in microseconds of each top-level import.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # nested imports are indented
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def run(statement: str):
+    code = f"{statement}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    return parse_importtime(process.stderr), [m for m in process.stdout.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="Fail on a heavy import or a time over budget.")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    startup = set(run("pass")[0])
+    failures = []
+    print(f"{'statement':<92}{'import (ms)':>12}  heavy modules")
+    for statement, light in STATEMENTS.items():
+        try:
+            samples = []
+            for _ in range(args.repeat):
+                times, heavy = run(statement)
+                samples.append(sum(t for name, t in times.items() if name not in startup) / 1000)
+        except RuntimeError as e:
+            print(f"{statement:<92}{'error':>12}  {e}")
+            continue
+        elapsed = statistics.median(samples)
+        print(f"{statement:<92}{elapsed:>12.1f}  {', '.join(heavy) or '-'}")
+        if light and heavy:
+            failures.append(f"{statement!r} imports {', '.join(heavy)}")
+        if light and args.budget_ms is not None and elapsed > args.budget_ms:
+            failures.append(f"{statement!r} takes {elapsed:.1f} ms, over the budget of {args.budget_ms} ms")
+
+    if args.check and failures:
+        print("\n".join(["", "Import regressions:"] + failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
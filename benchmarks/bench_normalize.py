@@ -0,0 +1,66 @@
+"""
+Benchmark of the text normalization of the tools on representative inputs:
+- arxiv: the summaries of benchmarks/fixtures/arxiv, as ArxivTool formats them,
+- pdf: the pages of examples/example.pdf, as extracted by pypdf,
+- html: the main text of the pages of benchmarks/fixtures/html, as ScrapTool extracts it.
+
+Compares ftfy.fix_text, used by the tools before, with `normalize_text`, which only runs ftfy on
+the lines that may need fixing, checks that both return the same texts, and reports the share of
+texts left untouched by the fast path.
+
+Usage:
+    python benchmarks/bench_normalize.py [--repeat 20]
+"""
+import os
+import json
+import time
+import argparse
+import ftfy
+from pypdf import PdfReader
+from miniagent.tools.html_extractor import extract_main_text
+from miniagent.utils.text import SUSPICIOUS_CHAR, normalize_many, normalize_text
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def load_corpora():
+    with open(os.path.join(FIXTURES, "arxiv", "summaries.json"), encoding="utf-8") as f:
+        arxiv = [summary.replace("\n", " ") for summary in json.load(f)]
+    pdf = [page.extract_text() or "" for page in PdfReader(os.path.join(ROOT, "examples", "example.pdf")).pages]
+    html_dir = os.path.join(FIXTURES, "html")
+    html = []
+    for name in sorted(os.listdir(html_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(html_dir, name), encoding="utf-8") as f:
+                html.append(extract_main_text(f.read()))
+    return {"arxiv": arxiv, "pdf": pdf, "html": html}
+
+
+def timeit(function, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        output = function(texts)
+    return (time.perf_counter() - start) / repeat, output
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'corpus':<8}{'texts':>7}{'chars':>10}{'clean':>8}{'ftfy (ms)':>12}{'normalize (ms)':>16}"
+          f"{'batch (ms)':>12}{'speedup':>9}")
+    for name, texts in load_corpora().items():
+        legacy_time, legacy = timeit(lambda items: [ftfy.fix_text(text) for text in items], texts, args.repeat)
+        new_time, output = timeit(lambda items: [normalize_text(text) for text in items], texts, args.repeat)
+        batch_time, batch = timeit(normalize_many, texts, args.repeat)
+        assert output == legacy and batch == legacy, f"normalize_text differs from ftfy on {name}"
+        clean = sum(SUSPICIOUS_CHAR.search(text) is None for text in texts) / len(texts)
+        print(f"{name:<8}{len(texts):>7}{sum(map(len, texts)):>10}{clean:>8.0%}{legacy_time * 1000:>12.2f}"
+              f"{new_time * 1000:>16.2f}{batch_time * 1000:>12.2f}{legacy_time / new_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
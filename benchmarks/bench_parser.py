@@ -0,0 +1,142 @@
+"""
+Micro-benchmark of the ReAct output parser.
+
+Compares the regex helpers the agent used before (copied verbatim below as `legacy_*`)
+with the single-pass parser in `miniagent.agent.parser`, over real model outputs and
+adversarial ones (long hallucinated observations, backtracking-prone action inputs).
+
+Usage:
+    python benchmarks/bench_parser.py
+"""
+import re
+import ast
+import time
+from miniagent.agent.parser import parse_react_output, parse_action_input
+
+
+EMAIL_ARGS = ["email", "subject", "contents"]
+QUERY_ARGS = ["query"]
+
+
+# ---------------------------------------------------------------- legacy helpers
+def legacy_remove_outer_quotes(s):
+    return re.sub(r'^["\']?(.*?)["\']?$', r'\1', s, flags=re.DOTALL)
+
+def legacy_remove_trailing_newlines_and_special_chars(s):
+    return re.sub(r'(\n+[\W_]*)$', '', s)
+
+def legacy_processing_string(input_string):
+    for func in [legacy_remove_outer_quotes, legacy_remove_trailing_newlines_and_special_chars]:
+        input_string = func(input_string)
+    return input_string.strip()
+
+def legacy_extract_action_input(input_string, input_args):
+    action_input_match = re.search(r"Action Input:\s*(?P<action_input>.+)", input_string, re.DOTALL)
+    action_input_content = action_input_match.group("action_input") if action_input_match else None
+    extracted_args = {}
+    output = None
+    if action_input_content:
+        action_input_content = legacy_processing_string(action_input_content)
+        try:
+            action_input = ast.literal_eval(action_input_content)
+            if isinstance(action_input, dict):
+                for k, v in action_input.items():
+                    if k not in input_args:
+                        output = "The Action Input has incorrect input, Please check again."
+                return action_input, output
+        except Exception:
+            pass
+        for i, arg in enumerate(input_args):
+            next_arg = input_args[i + 1] if i + 1 < len(input_args) else "$"
+            arg_pattern = rf"{arg}\s*[:=]\s*(?P<{arg}>.+?)(?=\s*{next_arg}\s*[:=]\s*|$)"
+            arg_match = re.search(arg_pattern, action_input_content, re.DOTALL)
+            if arg_match:
+                extracted_args[arg] = legacy_processing_string(arg_match.group(arg).strip())
+        if not extracted_args and len(input_args) == 1:
+            extracted_args[input_args[0]] = legacy_processing_string(action_input_content.strip())
+    return extracted_args, output
+
+def legacy_extract_action(input_string):
+    action_match = re.search(r"Action:\s*(?P<action>[^\n]+)", input_string)
+    action = action_match.group("action") if action_match else None
+    return action.strip()
+
+def legacy_split_content(input_string):
+    return input_string.split("\nObservation:")[0].strip()
+
+def legacy_extract_yes_no(input_string):
+    match = re.search(r"Thought: Do I need to use a tool\? (Yes|No)", input_string)
+    return match.group(1).lower().strip() == "yes" if match else False
+
+
+def legacy_parse(text, input_args):
+    use_tool = legacy_extract_yes_no(text)
+    if not use_tool:
+        return use_tool, None, None
+    content = legacy_split_content(text)
+    return use_tool, legacy_extract_action(content), legacy_extract_action_input(content, input_args)[0]
+
+
+def single_pass_parse(text, input_args):
+    output = parse_react_output(text)
+    if not output.use_tool:
+        return output.use_tool, None, None
+    action = output.actions[0]
+    return output.use_tool, action.name, parse_action_input(action.input, input_args)[0]
+
+
+# ---------------------------------------------------------------- corpus
+REAL_OUTPUTS = [
+    ("Thought: Do I need to use a tool? Yes\nAction: ArxivTool\nAction Input: {'query': 'language agent'}", QUERY_ARGS),
+    ("Thought: Do I need to use a tool? Yes\nAction: PDFReaderTool\nAction Input: filepath: './examples/cv.pdf'", ["filepath"]),
+    ("Thought: Do I need to use a tool? Yes\nAction: ScrapTool\nAction Input: \"https://www.langchain.com\"\n", ["url"]),
+    ("Thought: Do I need to use a tool? Yes\nAction: EmailTool\nAction Input: email: rayyang0116@gmail.com\n"
+     "subject: Papers about language agents\ncontents: 1. ReAct: Synergizing Reasoning and Acting in Language Models\n"
+     "2. Toolformer: Language Models Can Teach Themselves to Use Tools\n", EMAIL_ARGS),
+    ("Thought: Do I need to use a tool? Yes\nAction: SearchTool\nAction Input: {'query': 'python asyncio'}\n"
+     "Observation: [{'link': 'https://docs.python.org/3/library/asyncio.html'}]", QUERY_ARGS),
+    ("Thought: Do I need to use a tool? No\nAI: The candidate has six years of experience as a site reliability engineer.", QUERY_ARGS),
+]
+
+ADVERSARIAL_OUTPUTS = [
+    ("long hallucinated observation",
+     "Thought: Do I need to use a tool? Yes\nAction: ArxivTool\nAction Input: {'query': 'agents'}\nObservation: "
+     + "Published: 2024-01-01\nTitle: A paper\nSummary: " + "lorem ipsum dolor sit amet " * 8000, QUERY_ARGS),
+    ("newlines and punctuation in a value",
+     "Thought: Do I need to use a tool? Yes\nAction: EmailTool\nAction Input: email: a@b.c, contents: x" + "\n!" * 3000 + "x",
+     EMAIL_ARGS),
+    ("long multi-line contents",
+     "Thought: Do I need to use a tool? Yes\nAction: EmailTool\nAction Input: email: a@b.c\nsubject: report\ncontents: "
+     + "line of the report,\n" * 5000, EMAIL_ARGS),
+    ("argument names without separators",
+     "Thought: Do I need to use a tool? Yes\nAction: EmailTool\nAction Input: email: a@b.c subject "
+     + "contents " * 5000, EMAIL_ARGS),
+]
+
+
+def bench(func, text, input_args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text, input_args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print("Equivalence on real outputs:")
+    for text, input_args in REAL_OUTPUTS:
+        legacy, new = legacy_parse(text, input_args), single_pass_parse(text, input_args)
+        print(f"  {'same' if legacy == new else 'DIFF'}: {new}")
+
+    print(f"\n{'case':<40}{'legacy (ms)':>14}{'single-pass (ms)':>18}{'speedup':>10}")
+    cases = [(f"real #{idx}", text, args) for idx, (text, args) in enumerate(REAL_OUTPUTS)]
+    cases += ADVERSARIAL_OUTPUTS
+    for name, text, input_args in cases:
+        legacy = bench(legacy_parse, text, input_args)
+        new = bench(single_pass_parse, text, input_args)
+        print(f"{name:<40}{legacy * 1e3:>14.3f}{new * 1e3:>18.3f}{legacy / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
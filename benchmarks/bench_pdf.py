@@ -0,0 +1,87 @@
+"""
+Benchmark of PDFReaderTool on examples/example.pdf and on larger synthetic PDFs, built by
+repeating its pages.
+
+Compares the eager extraction the tool used before (every page extracted and fixed, then
+truncated to `max_length` words) with the current extraction, then the extraction of the
+full text in this process with the extraction in a pool of `--workers` processes.
+
+Usage:
+    python benchmarks/bench_pdf.py [--pages 100 300] [--max-length 1024] [--workers 4]
+"""
+import os
+import time
+import argparse
+import tempfile
+import ftfy
+from pypdf import PdfReader, PdfWriter
+from miniagent.tools import PDFReaderTool
+
+
+EXAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "examples", "example.pdf")
+
+
+def make_pdf(source: str, pages: int, directory: str) -> str:
+    """
+    Writes a PDF of `pages` pages by repeating the pages of `source`.
+    """
+    reader = PdfReader(source)
+    writer = PdfWriter()
+    for idx in range(pages):
+        writer.add_page(reader.pages[idx % len(reader.pages)])
+    path = os.path.join(directory, f"synthetic_{pages}.pdf")
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def legacy_read(filepath: str, max_length: int) -> str:
+    reader = PdfReader(filepath)
+    output = []
+    for page in reader.pages:
+        text = page.extract_text()
+        if text:
+            output.append(ftfy.fix_text(text))
+    return " ".join("\n".join(output).split()[:max_length])
+
+
+def bench(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--max-length", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tool = PDFReaderTool(max_length=args.max_length)
+    with tempfile.TemporaryDirectory() as directory:
+        files = [("example.pdf", EXAMPLE_PDF)]
+        files += [(f"synthetic {pages} pages", make_pdf(EXAMPLE_PDF, pages, directory)) for pages in args.pages]
+        print(f"{'file':<28}{'eager (s)':>12}{'lazy (s)':>12}{'speedup':>10}")
+        for name, path in files:
+            assert tool.invoke(path) == legacy_read(path, args.max_length)
+            eager = bench(lambda: legacy_read(path, args.max_length), args.repeat)
+            lazy = bench(lambda: tool.invoke(path), args.repeat)
+            print(f"{name:<28}{eager:>12.3f}{lazy:>12.3f}{eager / lazy:>9.1f}x")
+
+        serial_tool = PDFReaderTool(max_length=10 ** 9)
+        parallel_tool = PDFReaderTool(max_length=10 ** 9, workers=args.workers)
+        print(f"\n{'full text':<28}{'serial (s)':>12}{f'{args.workers} procs (s)':>14}{'speedup':>10}")
+        for name, path in files:
+            assert serial_tool.invoke(path) == parallel_tool.invoke(path)
+            serial = bench(lambda: serial_tool.invoke(path), args.repeat)
+            parallel = bench(lambda: parallel_tool.invoke(path), args.repeat)
+            print(f"{name:<28}{serial:>12.3f}{parallel:>14.3f}{serial / parallel:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
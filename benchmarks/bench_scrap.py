@@ -0,0 +1,96 @@
+"""
+Benchmark of ScrapTool on large pages, served from memory in chunks by an httpx mock transport.
+
+Compares the path the tool used before (download the whole body, parse it with BeautifulSoup,
+then keep the first `text_length` characters) with the streaming "text" extractor, which stops
+once enough text has been collected. Requires bs4 for the old path.
+
+Usage:
+    python benchmarks/bench_scrap.py [--files page1.html page2.html] [--bandwidth 10]
+"""
+import os
+import time
+import argparse
+import ftfy
+import httpx
+from bs4 import BeautifulSoup
+from miniagent.tools import ScrapTool
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def make_page(paragraphs: int) -> bytes:
+    """
+    Builds a large page with navigation, scripts, styles and article paragraphs.
+    """
+    nav = "<nav><ul>" + "".join(f"<li><a href='/p{i}'>Section {i}</a></li>" for i in range(200)) + "</ul></nav>"
+    script = "<script>" + "var data = {'key': 'value'};\n" * 2000 + "</script>"
+    style = "<style>" + ".c { color: red; }\n" * 2000 + "</style>"
+    body = "".join(f"<p>Paragraph {i}: the quick brown fox jumps over the lazy dog, " * 3 + "</p>\n"
+                   for i in range(paragraphs))
+    html = f"<html><head><title>Large page</title>{style}</head><body>{nav}{script}<article>{body}</article></body></html>"
+    return html.encode("utf-8")
+
+
+class Server:
+    """
+    Serves pages in chunks, optionally throttled to a bandwidth in MB/s, and counts the bytes sent.
+    """
+
+    def __init__(self, pages, bandwidth: float = 0.0) -> None:
+        self.pages = pages
+        self.bandwidth = bandwidth
+        self.sent = 0
+
+    def _chunks(self, data: bytes):
+        for start in range(0, len(data), CHUNK_SIZE):
+            chunk = data[start:start + CHUNK_SIZE]
+            if self.bandwidth:
+                time.sleep(len(chunk) / (self.bandwidth * 1024 * 1024))
+            self.sent += len(chunk)
+            yield chunk
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        data = self.pages[request.url.path.lstrip("/")]
+        return httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"}, content=self._chunks(data))
+
+
+def legacy_scrap(client: httpx.Client, url: str, text_length: int) -> str:
+    res = client.get(url).text
+    soup = BeautifulSoup(res, "html.parser")
+    return ftfy.fix_text(soup.get_text())[:text_length]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", nargs="*", default=[])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[1000, 20000])
+    parser.add_argument("--text-length", type=int, default=8000)
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="MB/s, 0 for no throttling")
+    args = parser.parse_args()
+
+    pages = {f"synthetic_{n}": make_page(n) for n in args.paragraphs}
+    for path in args.files:
+        with open(path, "rb") as f:
+            pages[os.path.basename(path)] = f.read()
+
+    server = Server(pages, args.bandwidth)
+    client = httpx.Client(transport=httpx.MockTransport(server))
+    tool = ScrapTool(text_length=args.text_length, client=client, extractor="text")
+    print(f"{'page':<24}{'size (KB)':>10}{'old (s)':>10}{'old KB':>9}{'new (s)':>10}{'new KB':>9}{'speedup':>9}")
+    for name, data in pages.items():
+        url = f"http://bench.local/{name}"
+        server.sent = 0
+        start = time.perf_counter()
+        legacy_scrap(client, url, args.text_length)
+        old, old_sent = time.perf_counter() - start, server.sent
+        server.sent = 0
+        start = time.perf_counter()
+        tool.invoke(url)
+        new, new_sent = time.perf_counter() - start, server.sent
+        print(f"{name:<24}{len(data) // 1024:>10}{old:>10.3f}{old_sent // 1024:>9}{new:>10.3f}{new_sent // 1024:>9}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
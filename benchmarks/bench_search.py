@@ -0,0 +1,74 @@
+"""
+Latency benchmark of SearchTool against simulated search engines.
+
+Each engine answers after a random latency with a heavy tail, and is sometimes blocked: it then
+returns nothing after a timeout, as the scraped engines do. Compares the sequential strategy the
+tool used before (each engine retried without backoff) with the race and hedge strategies, and
+reports the latency percentiles and the number of engine requests per search.
+
+Usage:
+    python benchmarks/bench_search.py [--searches 300] [--scale 0.01]
+"""
+import time
+import random
+import argparse
+from loguru import logger
+from miniagent.tools import SearchTool
+
+
+def make_engine(name: str, latency: float, tail: float, blocked: float, timeout: float, scale: float, counter: dict):
+    """
+    Builds an engine class answering in `latency` seconds, 10 times slower with probability `tail`,
+    and blocked until `timeout` with probability `blocked`. Times are multiplied by `scale`.
+    """
+    class Engine:
+        def search(self, query, pages=1):
+            counter[name] = counter.get(name, 0) + 1
+            if random.random() < blocked:
+                time.sleep(timeout * scale)
+                return []
+            time.sleep(latency * (10 if random.random() < tail else 1) * random.uniform(0.5, 1.5) * scale)
+            return [{"link": f"https://{name.lower()}.com/{query}", "title": query, "text": name}]
+    Engine.__name__ = name
+    return Engine
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q / 100 * len(values)), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--searches", type=int, default=300)
+    parser.add_argument("--scale", type=float, default=0.01, help="Simulated seconds per real second.")
+    args = parser.parse_args()
+    logger.remove()
+    random.seed(0)
+
+    configs = {
+        "sequential (before)": dict(strategy="sequential", backoff=0.0),
+        "race": dict(strategy="race"),
+        "hedge": dict(strategy="hedge", hedge_delay=1.5 * args.scale),
+    }
+    print(f"{'strategy':<22}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}{'requests':>10}")
+    for label, config in configs.items():
+        counter = {}
+        engines = [make_engine("Duckduckgo", 1.0, 0.05, 0.2, 10.0, args.scale, counter),
+                   make_engine("Google", 0.8, 0.05, 0.3, 10.0, args.scale, counter),
+                   make_engine("Bing", 1.2, 0.05, 0.1, 10.0, args.scale, counter)]
+        config.setdefault("backoff", 0.5 * args.scale)
+        tool = SearchTool(engines=engines, timeout=30 * args.scale, max_backoff=8 * args.scale,
+                          failure_threshold=1000, **config)
+        latencies = []
+        for i in range(args.searches):
+            start = time.perf_counter()
+            tool.invoke(f"query{i}")
+            latencies.append((time.perf_counter() - start) / args.scale)
+        requests = sum(counter.values()) / args.searches
+        print(f"{label:<22}{percentile(latencies, 50):>10.2f}{percentile(latencies, 95):>10.2f}"
+              f"{percentile(latencies, 99):>10.2f}{requests:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 from .agent import Agent
 from .response_agent import ResponseAgent
 from .human_agent import HumanAgent
+from .batch import BatchResult
 
 
 __all__ = [
     "Agent",
+    "BatchResult",
     "HumanAgent",
     "ResponseAgent"
 ]
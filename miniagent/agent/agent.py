@@ -1,10 +1,20 @@
+import json
+import asyncio
 from loguru import logger
-from typing import Optional, Dict, List
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, Dict, List, Union
+from concurrent.futures import ThreadPoolExecutor
 from miniagent.llm import LLMInput
 from miniagent.agent.base import BaseAgent
+from miniagent.agent.batch import BatchResult, run_batch, arun_batch
+from miniagent.agent.scratchpad import Scratchpad, LLMSummarizer
 from miniagent.tools import BaseTool, ToolList
 from miniagent.prompt import ReactPromptTemplate, PromptTemplate
-from miniagent.agent.utils import extract_action, extract_action_input, split_content, extract_yes_no
+from miniagent.agent.parser import ReactAction, parse_react_output, parse_action_input
+from miniagent.agent.utils import find_action_end, is_action_input_complete
+
+
+# the model stops generating before it hallucinates the output of a tool
+STOP_SEQUENCES = ["\nObservation:"]
 
 
 class Agent(BaseAgent):
@@ -16,7 +26,16 @@ class Agent(BaseAgent):
                  llm: Optional[BaseAgent] = None,
                  tools: Optional[ToolList] = None,
                  prompt_template: PromptTemplate = ReactPromptTemplate(),
-                 limit: int = 10) -> None:
+                 limit: int = 10,
+                 max_workers: int = 4,
+                 stop: Optional[List[str]] = STOP_SEQUENCES,
+                 stream: bool = False,
+                 eager_tools: bool = False,
+                 use_messages: bool = False,
+                 max_scratchpad_tokens: Optional[int] = None,
+                 keep_last_steps: int = 2,
+                 summary_llm: Optional[BaseAgent] = None,
+                 function_calling: bool = False) -> None:
         """
         Initializes the Agent with a language model, a list of tools, a prompt template, and a step limit.
 
@@ -25,6 +44,23 @@ class Agent(BaseAgent):
             tools (Optional[ToolList]): The list of tools the agent can use.
             prompt_template (PromptTemplate): The template for generating prompts.
             limit (int): The maximum number of steps the agent can execute.
+            max_workers (int): The maximum number of tools run concurrently when a step emits several actions.
+            stop (Optional[List[str]]): The stop sequences sent to the language model.
+            stream (bool): Whether to stream the response of the language model and cut it
+                as soon as a complete Action Input has been generated.
+            eager_tools (bool): Whether to start each tool as soon as its action is complete in the stream,
+                overlapping the tool call with the rest of the generation. Implies `stream`.
+            use_messages (bool): Whether to send the static part of the prompt as a stable system message
+                and append every step as new messages, instead of re-rendering the whole prompt.
+                It requires a template with `format_system` and `format_user`, e.g. ReactPromptTemplate.
+            max_scratchpad_tokens (Optional[int]): The token budget of the scratchpad. Older observations
+                are compacted once it is exceeded. None means no limit.
+            keep_last_steps (int): The number of recent steps kept verbatim when the scratchpad is compacted.
+            summary_llm (Optional[BaseAgent]): The language model used to summarize old observations.
+                They are truncated when it is None.
+            function_calling (bool): Whether to pass the tools through the function-calling API of the
+                language model instead of describing them in the ReAct prompt and parsing the text output.
+                It requires a template with `prefix_prompt` and `format_function_call`, e.g. ReactPromptTemplate.
         """
         super().__init__()
         self.llm = llm
@@ -36,53 +72,611 @@ class Agent(BaseAgent):
             self.prompt_kwargs["tool_names"] = tools.tool_names
             self.prompt_kwargs["tools"] = tools.tool_descriptions
         self.limit = limit
+        self.max_workers = max_workers
+        self.stop = list(stop) if stop else []
+        self.stream = stream or eager_tools
+        self.eager_tools = eager_tools
+        if use_messages and not hasattr(prompt_template, "format_system"):
+            raise ValueError("use_messages requires a prompt template with format_system and format_user.")
+        self.use_messages = use_messages
+        self.max_scratchpad_tokens = max_scratchpad_tokens
+        self.keep_last_steps = keep_last_steps
+        self.summarizer = LLMSummarizer(summary_llm) if summary_llm is not None else None
+        if function_calling and not hasattr(prompt_template, "format_function_call"):
+            raise ValueError("function_calling requires a prompt template with format_function_call.")
+        self.function_calling = function_calling
+        self.tool_schemas = tools.tool_schemas if tools is not None else []
 
-    def _invoke_tool(self, content: str) -> str:
+    def _parse_action(self, action: ReactAction):
         """
-        Invokes a tool based on the action extracted from the content.
+        Extracts the arguments of the tool of an action.
 
         Args:
-            content (str): The content from which to extract the action and invoke the corresponding tool.
+            action (ReactAction): The action parsed from the response.
 
         Returns:
-            str: The original content with the observation (tool output) appended.
+            tuple: The parsed action input and the fallback output,
+            or None if the action is not in the tools pocket.
+        """
+        if action.name not in self.tools_pocket:
+            logger.error(f"Action '{action.name}' not found in tools pocket.")
+            return None
+        action_input, output = parse_action_input(action.input, [x[0] for x in self.tools_pocket[action.name].tool_args])
+        logger.info("\n" + f"Invoking tool: action={action.name}, action_input={action_input}")
+        return action_input, output
+
+    def _run_action(self, action: ReactAction) -> Optional[str]:
         """
-        action = extract_action(content)
-        if action not in self.tools_pocket:
-            logger.error(f"Action '{action}' not found in tools pocket.")
-            return content
-        action_input, output = extract_action_input(content, [x[0] for x in self.tools_pocket[action].tool_args])
-        logger.info("\n" + f"Invoking tool: action={action}, action_input={action_input}")
+        Runs the tool of a single action.
+
+        Args:
+            action (ReactAction): The action parsed from the response.
+
+        Returns:
+            Optional[str]: The tool output, or None if the action is not in the tools pocket.
+        """
+        parsed = self._parse_action(action)
+        if parsed is None:
+            return None
+        action_input, output = parsed
         try:
-            action_output = self.tools_pocket[action].invoke(**action_input)
+            action_output = self.tools_pocket[action.name].invoke(**action_input)
         except Exception as e:
             logger.error(e)
             action_output = output
         logger.info(f"\nAction output:\n{action_output}")
-        return content + f"\nObservation: {action_output}"
+        return action_output
 
-    def _step(self, prompt_kwargs: Dict[str, str], print_prompt: bool=True) -> (str, bool):
+    async def _arun_action(self, action: ReactAction, semaphore: asyncio.Semaphore) -> Optional[str]:
         """
-        Performs a single step of the agent's execution loop.
+        Asynchronous version of `_run_action`, bounded by a semaphore.
+
+        Args:
+            action (ReactAction): The action parsed from the response.
+            semaphore (asyncio.Semaphore): Limits the number of tools running at the same time.
+
+        Returns:
+            Optional[str]: The tool output, or None if the action is not in the tools pocket.
+        """
+        parsed = self._parse_action(action)
+        if parsed is None:
+            return None
+        action_input, output = parsed
+        try:
+            async with semaphore:
+                action_output = await self.tools_pocket[action.name].ainvoke(**action_input)
+        except Exception as e:
+            logger.error(e)
+            action_output = output
+        logger.info(f"\nAction output:\n{action_output}")
+        return action_output
+
+    @staticmethod
+    def _format_observation(actions: List[ReactAction], action_outputs: List[Optional[str]]) -> str:
+        """
+        Formats the tool outputs of a step as one observation.
+
+        Args:
+            actions (List[ReactAction]): The actions of the step.
+            action_outputs (List[Optional[str]]): The output of each action.
+
+        Returns:
+            str: The observation to append to the content of the step, empty if there is none.
+        """
+        if len(actions) <= 1:
+            if not action_outputs or action_outputs[0] is None:
+                return ""
+            return f"\nObservation: {action_outputs[0]}"
+        observations = []
+        for idx, (action, action_output) in enumerate(zip(actions, action_outputs), start=1):
+            if action_output is None:
+                action_output = f"Action '{action.name}' not found in tools."
+            observations.append(f"[{idx}] {action.name}: {action_output}")
+        return "\nObservation:\n" + "\n".join(observations)
+
+    def _run_actions(self, actions: List[ReactAction]) -> str:
+        """
+        Runs the tools of the actions of a step. Several actions are executed concurrently.
+
+        Args:
+            actions (List[ReactAction]): The actions of the step.
+
+        Returns:
+            str: The observation (tool outputs) of the step.
+        """
+        if not actions:
+            logger.error("No action found in the response.")
+            return ""
+        if len(actions) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(actions))) as executor:
+                action_outputs = list(executor.map(self._run_action, actions))
+        else:
+            action_outputs = [self._run_action(actions[0])]
+        return self._format_observation(actions, action_outputs)
+
+    async def _arun_actions(self, actions: List[ReactAction]) -> str:
+        """
+        Asynchronous version of `_run_actions`.
+
+        Args:
+            actions (List[ReactAction]): The actions of the step.
+
+        Returns:
+            str: The observation (tool outputs) of the step.
+        """
+        if not actions:
+            logger.error("No action found in the response.")
+            return ""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        action_outputs = await asyncio.gather(*[self._arun_action(action, semaphore) for action in actions])
+        return self._format_observation(actions, list(action_outputs))
+
+    def _invoke_tool(self, content: str) -> str:
+        """
+        Invokes the tools based on the actions extracted from the content.
+
+        Args:
+            content (str): The content from which to extract the actions and invoke the corresponding tools.
+
+        Returns:
+            str: The original content with the observation (tool outputs) appended.
+        """
+        return content + self._run_actions(parse_react_output(content).actions)
+
+    async def _ainvoke_tool(self, content: str) -> str:
+        """
+        Asynchronous version of `_invoke_tool`.
+
+        Args:
+            content (str): The content from which to extract the actions and invoke the corresponding tools.
+
+        Returns:
+            str: The original content with the observation (tool outputs) appended.
+        """
+        return content + await self._arun_actions(parse_react_output(content).actions)
+
+    def _prefix_messages(self, prompt_kwargs: Dict[str, str]) -> List[LLMInput]:
+        """
+        Formats the messages sent before the steps when the agent uses messages.
 
         Args:
             prompt_kwargs (Dict[str, str]): The variables to be used for formatting the prompt.
 
         Returns:
-            tuple: A tuple containing the response content and a boolean indicating whether the step is final.
+            List[LLMInput]: The system and the user message, or an empty list in text mode.
         """
+        if not self.use_messages:
+            return []
+        return [
+            LLMInput(role="system", content=self.prompt_template.format_system(**prompt_kwargs)),
+            LLMInput(role="user", content=self.prompt_template.format_user(**{**prompt_kwargs, "agent_scratchpad": ""})),
+        ]
+
+    def _new_scratchpad(self, prompt_kwargs: Dict[str, str]) -> Scratchpad:
+        """
+        Creates the scratchpad of a run.
+
+        Args:
+            prompt_kwargs (Dict[str, str]): The variables to be used for formatting the prompt.
+
+        Returns:
+            Scratchpad: An empty scratchpad with the token budget of the agent.
+        """
+        return Scratchpad(prefix=self._prefix_messages(prompt_kwargs),
+                          max_tokens=self.max_scratchpad_tokens,
+                          keep_last=self.keep_last_steps,
+                          summarizer=self.summarizer)
+
+    def _build_messages(self, prompt_kwargs: Dict[str, str], scratchpad: Scratchpad, print_prompt: bool = True) -> List[LLMInput]:
+        """
+        Builds the messages sent to the language model in a step.
+
+        Args:
+            prompt_kwargs (Dict[str, str]): The variables to be used for formatting the prompt.
+            scratchpad (Scratchpad): The steps executed so far.
+            print_prompt (bool): Whether to log the prompt.
+
+        Returns:
+            List[LLMInput]: The messages for the language model.
+        """
+        if self.use_messages:
+            messages = scratchpad.to_messages()
+            if print_prompt:
+                logger.info("\nPROMPT:\n" + "\n".join(m.content for m in messages) + "\n")
+            return messages
+        prompt_kwargs["agent_scratchpad"] = scratchpad.to_text()
         f_prompt = self.prompt_template.format(**prompt_kwargs)
         if print_prompt:
             logger.info("\nPROMPT:\n"+f_prompt+"\n")
-        messages = [LLMInput(role="user", content=f_prompt)]
-        response = self.llm.invoke(messages=messages)
-        logger.info(f"\nLLM output:\n{response.content}")
-        use_tool = extract_yes_no(response.content)
-        if not use_tool:
-            return response.content, True
-        action_content = split_content(response.content)
-        action_output = self._invoke_tool(content=action_content)
-        return action_output, False
+        return [LLMInput(role="user", content=f_prompt)]
+
+    @property
+    def _llm_kwargs(self) -> Dict[str, List[str]]:
+        return {"stop": self.stop} if self.stop else {}
+
+    def _generate(self, messages: List[LLMInput]) -> str:
+        """
+        Gets the response of the language model for the messages of a step.
+        When streaming, the stream is closed as soon as a complete Action Input is parsed.
+
+        Args:
+            messages (List[LLMInput]): The messages for the language model.
+
+        Returns:
+            str: The response content.
+        """
+        if not self.stream:
+            return self.llm.invoke(messages=messages, **self._llm_kwargs).content
+        content = ""
+        chunks = self.llm.stream(messages=messages, **self._llm_kwargs)
+        try:
+            for chunk in chunks:
+                content += chunk
+                end = find_action_end(content)
+                if end is not None:
+                    content = content[:end]
+                    break
+        finally:
+            chunks.close()
+        return content.strip()
+
+    async def _agenerate(self, messages: List[LLMInput]) -> str:
+        """
+        Asynchronous version of `_generate`.
+
+        Args:
+            messages (List[LLMInput]): The messages for the language model.
+
+        Returns:
+            str: The response content.
+        """
+        if not self.stream:
+            response = await self.llm.ainvoke(messages=messages, **self._llm_kwargs)
+            return response.content
+        content = ""
+        chunks = self.llm.astream(messages=messages, **self._llm_kwargs)
+        try:
+            async for chunk in chunks:
+                content += chunk
+                end = find_action_end(content)
+                if end is not None:
+                    content = content[:end]
+                    break
+        finally:
+            await chunks.aclose()
+        return content.strip()
+
+    def _completed_actions(self, content: str, finished: bool) -> List[ReactAction]:
+        """
+        Finds the actions of a partially streamed response that can no longer change.
+
+        Args:
+            content (str): The response streamed so far.
+            finished (bool): Whether the response is complete.
+
+        Returns:
+            List[ReactAction]: The complete actions, in order.
+        """
+        output = parse_react_output(content)
+        if not output.use_tool:
+            return []
+        if finished:
+            return output.actions
+        # an action is complete once the next one has started and its input dict is closed
+        actions = []
+        for action in output.actions[:-1]:
+            if not is_action_input_complete(action.input):
+                break
+            actions.append(action)
+        return actions
+
+    def _dispatch_actions(self, content: str, finished: bool, dispatched: Dict[int, tuple], submit) -> None:
+        """
+        Submits the complete and valid actions of the streamed response which are not running yet.
+        The tools which are not `cacheable` have side effects, so they are never started before the
+        response is final.
+
+        Args:
+            content (str): The response streamed so far.
+            finished (bool): Whether the response is complete.
+            dispatched (Dict[int, tuple]): The running actions, as action index to (action, future).
+            submit (Callable): Starts `_run_action` for an action and returns its future.
+        """
+        for idx, action in enumerate(self._completed_actions(content, finished)):
+            tool = self.tools_pocket.get(action.name)
+            if idx in dispatched or tool is None or not (tool.cacheable or finished):
+                continue
+            logger.info(f"Dispatching action {idx + 1} while the response is streaming.")
+            dispatched[idx] = (action, submit(action))
+
+    @staticmethod
+    def _collect_actions(actions: List[ReactAction], dispatched: Dict[int, tuple], submit) -> (List[ReactAction], list):
+        """
+        Matches the actions of the final response with the dispatched ones and submits the others.
+        A dispatched action is never submitted again, even if its final text differs.
+
+        Args:
+            actions (List[ReactAction]): The actions of the final response.
+            dispatched (Dict[int, tuple]): The running actions, as action index to (action, future).
+            submit (Callable): Starts `_run_action` for an action and returns its future.
+
+        Returns:
+            tuple: The actions which run, and the future of each one.
+        """
+        running, futures = [], []
+        for idx, action in enumerate(actions):
+            if idx in dispatched:
+                dispatched_action, future = dispatched[idx]
+                if dispatched_action != action:
+                    logger.warning(f"Action {idx + 1} changed after it was dispatched, keeping the running one.")
+                running.append(dispatched_action)
+                futures.append(future)
+            else:
+                running.append(action)
+                futures.append(submit(action))
+        return running, futures
+
+    def _eager_step(self, messages: List[LLMInput]) -> (str, str, bool):
+        """
+        Performs a step while streaming the response, starting every tool as soon as its action is complete.
+
+        Args:
+            messages (List[LLMInput]): The messages for the language model.
+
+        Returns:
+            tuple: The response content, its observation and a boolean indicating whether the step is final.
+        """
+        content = ""
+        dispatched = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            submit = lambda action: executor.submit(self._run_action, action)
+            chunks = self.llm.stream(messages=messages, **self._llm_kwargs)
+            try:
+                for chunk in chunks:
+                    content += chunk
+                    end = find_action_end(content)
+                    if end is not None:
+                        content = content[:end]
+                    self._dispatch_actions(content, end is not None, dispatched, submit)
+                    if end is not None:
+                        break
+            finally:
+                chunks.close()
+            content = content.strip()
+            logger.info(f"\nLLM output:\n{content}")
+            output = parse_react_output(content)
+            if not output.use_tool:
+                return content, "", True
+            if not output.actions:
+                return output.content, self._run_actions(output.actions), False
+            actions, futures = self._collect_actions(output.actions, dispatched, submit)
+            action_outputs = [future.result() for future in futures]
+        return output.content, self._format_observation(actions, action_outputs), False
+
+    async def _aeager_step(self, messages: List[LLMInput]) -> (str, str, bool):
+        """
+        Asynchronous version of `_eager_step`.
+
+        Args:
+            messages (List[LLMInput]): The messages for the language model.
+
+        Returns:
+            tuple: The response content, its observation and a boolean indicating whether the step is final.
+        """
+        content = ""
+        dispatched = {}
+        semaphore = asyncio.Semaphore(self.max_workers)
+        submit = lambda action: asyncio.ensure_future(self._arun_action(action, semaphore))
+        try:
+            chunks = self.llm.astream(messages=messages, **self._llm_kwargs)
+            try:
+                async for chunk in chunks:
+                    content += chunk
+                    end = find_action_end(content)
+                    if end is not None:
+                        content = content[:end]
+                    self._dispatch_actions(content, end is not None, dispatched, submit)
+                    if end is not None:
+                        break
+            finally:
+                await chunks.aclose()
+            content = content.strip()
+            logger.info(f"\nLLM output:\n{content}")
+            output = parse_react_output(content)
+            if not output.use_tool:
+                return content, "", True
+            if not output.actions:
+                return output.content, await self._arun_actions(output.actions), False
+            actions, tasks = self._collect_actions(output.actions, dispatched, submit)
+            action_outputs = await asyncio.gather(*tasks)
+        finally:
+            # the tasks are all done unless the step failed; cancelling them does not stop a tool
+            # already running in its executor thread
+            for _, task in dispatched.values():
+                task.cancel()
+        return output.content, self._format_observation(actions, list(action_outputs)), False
+
+    def _step(self, messages: List[LLMInput]) -> (str, str, bool):
+        """
+        Performs a single step of the agent's execution loop.
+
+        Args:
+            messages (List[LLMInput]): The messages for the language model.
+
+        Returns:
+            tuple: The response content, its observation and a boolean indicating whether the step is final.
+        """
+        if self.eager_tools:
+            return self._eager_step(messages)
+        content = self._generate(messages)
+        logger.info(f"\nLLM output:\n{content}")
+        output = parse_react_output(content)
+        if not output.use_tool:
+            return content, "", True
+        return output.content, self._run_actions(output.actions), False
+
+    async def _astep(self, messages: List[LLMInput]) -> (str, str, bool):
+        """
+        Asynchronous version of `_step`.
+
+        Args:
+            messages (List[LLMInput]): The messages for the language model.
+
+        Returns:
+            tuple: The response content, its observation and a boolean indicating whether the step is final.
+        """
+        if self.eager_tools:
+            return await self._aeager_step(messages)
+        content = await self._agenerate(messages)
+        logger.info(f"\nLLM output:\n{content}")
+        output = parse_react_output(content)
+        if not output.use_tool:
+            return content, "", True
+        return output.content, await self._arun_actions(output.actions), False
+
+    def _call_tool(self, tool_call) -> LLMInput:
+        """
+        Runs a tool requested through the function-calling API.
+
+        Args:
+            tool_call: The tool call of the assistant message.
+
+        Returns:
+            LLMInput: The tool message answering the call.
+        """
+        name = tool_call.function.name
+        try:
+            arguments = json.loads(tool_call.function.arguments or "{}")
+            logger.info("\n" + f"Invoking tool: action={name}, action_input={arguments}")
+            action_output = self.tools_pocket[name].invoke(**arguments)
+        except Exception as e:
+            logger.error(e)
+            action_output = f"The tool call failed: {e!r}"
+        logger.info(f"\nAction output:\n{action_output}")
+        return LLMInput(role="tool", content=str(action_output), tool_call_id=tool_call.id)
+
+    async def _acall_tool(self, tool_call, semaphore: asyncio.Semaphore) -> LLMInput:
+        """
+        Asynchronous version of `_call_tool`, bounded by a semaphore.
+
+        Args:
+            tool_call: The tool call of the assistant message.
+            semaphore (asyncio.Semaphore): Limits the number of tools running at the same time.
+
+        Returns:
+            LLMInput: The tool message answering the call.
+        """
+        name = tool_call.function.name
+        try:
+            arguments = json.loads(tool_call.function.arguments or "{}")
+            logger.info("\n" + f"Invoking tool: action={name}, action_input={arguments}")
+            async with semaphore:
+                action_output = await self.tools_pocket[name].ainvoke(**arguments)
+        except Exception as e:
+            logger.error(e)
+            action_output = f"The tool call failed: {e!r}"
+        logger.info(f"\nAction output:\n{action_output}")
+        return LLMInput(role="tool", content=str(action_output), tool_call_id=tool_call.id)
+
+    def _function_call_messages(self, prompt_kwargs: Dict[str, str]) -> List[LLMInput]:
+        """
+        Formats the first messages of a run in function-calling mode.
+
+        Args:
+            prompt_kwargs (Dict[str, str]): The variables to be used for formatting the prompt.
+
+        Returns:
+            List[LLMInput]: The system and the user message.
+        """
+        messages = [
+            LLMInput(role="system", content=self.prompt_template.prefix_prompt),
+            LLMInput(role="user", content=self.prompt_template.format_function_call(**prompt_kwargs)),
+        ]
+        logger.info("\nPROMPT:\n" + "\n".join(m.content for m in messages) + "\n")
+        return messages
+
+    @staticmethod
+    def _assistant_message(response) -> LLMInput:
+        tool_calls = [tool_call.model_dump() for tool_call in response.message.tool_calls]
+        return LLMInput(role="assistant", content=response.content, tool_calls=tool_calls)
+
+    def _execute_function_calling(self, prompt_kwargs: Dict[str, str]) -> Optional[str]:
+        """
+        Executes the agent with the function-calling API: the tools are sent as JSON schemas
+        and their arguments come back structured, so no text parsing is needed.
+
+        Args:
+            prompt_kwargs (Dict[str, str]): The variables to be used for formatting the prompt.
+
+        Returns:
+            Optional[str]: The final output from the agent, or None if no answer was given within the limit.
+        """
+        messages = self._function_call_messages(prompt_kwargs)
+        for _ in range(self.limit):
+            response = self.llm.invoke(messages=messages, tools=self.tool_schemas)
+            logger.info(f"\nLLM output:\n{response.content}")
+            if not response.message.tool_calls:
+                return response.content
+            messages.append(self._assistant_message(response))
+            tool_calls = response.message.tool_calls
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tool_calls))) as executor:
+                messages.extend(executor.map(self._call_tool, tool_calls))
+        return None
+
+    async def _aexecute_function_calling(self, prompt_kwargs: Dict[str, str]) -> Optional[str]:
+        """
+        Asynchronous version of `_execute_function_calling`.
+
+        Args:
+            prompt_kwargs (Dict[str, str]): The variables to be used for formatting the prompt.
+
+        Returns:
+            Optional[str]: The final output from the agent, or None if no answer was given within the limit.
+        """
+        messages = self._function_call_messages(prompt_kwargs)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        for _ in range(self.limit):
+            response = await self.llm.ainvoke(messages=messages, tools=self.tool_schemas)
+            logger.info(f"\nLLM output:\n{response.content}")
+            if not response.message.tool_calls:
+                return response.content
+            messages.append(self._assistant_message(response))
+            tool_messages = await asyncio.gather(
+                *[self._acall_tool(tool_call, semaphore) for tool_call in response.message.tool_calls])
+            messages.extend(tool_messages)
+        return None
+
+    def _prepare_prompt_kwargs(self, kwargs: Dict[str, str]) -> Dict[str, str]:
+        """
+        Merges the user arguments with the tool information of the agent.
+
+        Args:
+            kwargs (Dict[str, str]): Additional arguments for prompt.
+
+        Returns:
+            Dict[str, str]: The variables expected by the prompt template.
+        """
+        kwargs.update(self.prompt_kwargs)
+        return {k: kwargs.get(k, None) for k in self.prompt_template.input_variables}
+
+    @staticmethod
+    def _final_output(scratchpad: Scratchpad) -> Optional[str]:
+        """
+        Extracts the final answer from the last step of the scratchpad, or returns the whole
+        step if it has no "AI:" line (e.g. when the step limit was reached).
+
+        Args:
+            scratchpad (Scratchpad): The steps of the run.
+
+        Returns:
+            Optional[str]: The final answer, or None if no steps were executed.
+        """
+        if scratchpad.last is not None:
+            agent_output = parse_react_output(scratchpad.last).final_answer
+            if agent_output is None:
+                agent_output = scratchpad.last.strip()
+            agent_output = agent_output.replace("`", "")
+            return agent_output
 
     def execute(self, **kwargs) -> Optional[str]:
         """
@@ -94,17 +688,83 @@ class Agent(BaseAgent):
         Returns:
             Optional[str]: The final output from the agent after executing the steps, or None if no steps were executed.
         """
-        kwargs.update(self.prompt_kwargs)
-        prompt_kwargs = {k: kwargs.get(k, None) for k in self.prompt_template.input_variables}
-        agent_scratchpad = []  # base input
+        prompt_kwargs = self._prepare_prompt_kwargs(kwargs)
+        if self.function_calling:
+            return self._execute_function_calling(prompt_kwargs)
+        scratchpad = self._new_scratchpad(prompt_kwargs)
         for idx in range(self.limit):
-            prompt_kwargs["agent_scratchpad"] = "\n".join(agent_scratchpad)
-            output, done = self._step(prompt_kwargs, print_prompt=False if idx > 0 else True)
-            agent_scratchpad.append(output)
-            # logger.info(f"\nSTEP {idx+1}:\n{output}")
+            messages = self._build_messages(prompt_kwargs, scratchpad, print_prompt=False if idx > 0 else True)
+            content, observation, done = self._step(messages)
+            scratchpad.append(content, observation)
+            # logger.info(f"\nSTEP {idx+1}:\n{content + observation}")
             if done:
                 break
-        if agent_scratchpad:
-            agent_output = agent_scratchpad[-1].split("AI:")[-1].strip()
-            agent_output = agent_output.replace("`", "")
-            return agent_output
+        return self._final_output(scratchpad)
+
+    async def aexecute(self, **kwargs) -> Optional[str]:
+        """
+        Asynchronous version of `execute`. The language model and the tools are awaited,
+        so a single event loop can drive many agents concurrently.
+
+        Args:
+        - kwargs: Additional arguments for prompt.
+
+        Returns:
+            Optional[str]: The final output from the agent after executing the steps, or None if no steps were executed.
+        """
+        prompt_kwargs = self._prepare_prompt_kwargs(kwargs)
+        if self.function_calling:
+            return await self._aexecute_function_calling(prompt_kwargs)
+        scratchpad = self._new_scratchpad(prompt_kwargs)
+        for idx in range(self.limit):
+            messages = self._build_messages(prompt_kwargs, scratchpad, print_prompt=False if idx > 0 else True)
+            content, observation, done = await self._astep(messages)
+            if self.summarizer is not None:
+                # summarizing old observations calls the language model synchronously
+                await asyncio.get_running_loop().run_in_executor(None, scratchpad.append, content, observation)
+            else:
+                scratchpad.append(content, observation)
+            if done:
+                break
+        return self._final_output(scratchpad)
+
+    def execute_many(self,
+                     inputs: Iterable[Union[str, Dict[str, Any]]],
+                     max_concurrency: int = 8,
+                     ordered: bool = True,
+                     **kwargs) -> Iterator[BatchResult]:
+        """
+        Executes the agent over many inputs with bounded concurrency and streams the results.
+        Every input gets its own scratchpad, while the language model client (and its HTTP pool)
+        and the tools are shared by all runs.
+
+        Args:
+            inputs (Iterable[Union[str, Dict[str, Any]]]): Strings used as `input`, or dicts of prompt arguments.
+            max_concurrency (int): The maximum number of inputs executed at the same time.
+            ordered (bool): Yield the results in input order, otherwise as soon as they finish.
+        - kwargs: Additional arguments for prompt shared by all inputs.
+
+        Returns:
+            Iterator[BatchResult]: The result of each input. A failing input is reported in its result
+            and does not stop the batch.
+        """
+        return run_batch(self.execute, inputs, max_concurrency=max_concurrency, ordered=ordered, **kwargs)
+
+    def aexecute_many(self,
+                      inputs: Iterable[Union[str, Dict[str, Any]]],
+                      max_concurrency: int = 8,
+                      ordered: bool = True,
+                      **kwargs) -> AsyncIterator[BatchResult]:
+        """
+        Asynchronous version of `execute_many`, running every input with `aexecute` on the current event loop.
+
+        Args:
+            inputs (Iterable[Union[str, Dict[str, Any]]]): Strings used as `input`, or dicts of prompt arguments.
+            max_concurrency (int): The maximum number of inputs executed at the same time.
+            ordered (bool): Yield the results in input order, otherwise as soon as they finish.
+        - kwargs: Additional arguments for prompt shared by all inputs.
+
+        Returns:
+            AsyncIterator[BatchResult]: The result of each input.
+        """
+        return arun_batch(self.aexecute, inputs, max_concurrency=max_concurrency, ordered=ordered, **kwargs)
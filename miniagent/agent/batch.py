@@ -0,0 +1,230 @@
+import time
+import asyncio
+from loguru import logger
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Union
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of a single input of a batch run.
+
+    Attributes:
+    - index (int): The position of the input in the batch.
+    - input (Dict[str, Any]): The keyword arguments the agent was executed with.
+    - output (Optional[str]): The final output of the agent, None if the run failed.
+    - error (Optional[Exception]): The exception raised by the run, if any.
+    - elapsed (float): The wall-clock time of the run in seconds.
+    """
+    index: int
+    input: Dict[str, Any]
+    output: Optional[str] = None
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchStats:
+    """
+    Counts finished runs of a batch and reports its throughput.
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.done = 0
+        self.failed = 0
+
+    def update(self, result: BatchResult) -> BatchResult:
+        self.done += 1
+        if not result.ok:
+            self.failed += 1
+        return result
+
+    def report(self) -> None:
+        elapsed = time.perf_counter() - self.start
+        throughput = self.done / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Batch finished: {self.done} inputs ({self.failed} failed) "
+                    f"in {elapsed:.2f}s, {throughput:.2f} inputs/s")
+
+
+def _normalize_input(item: Union[str, Dict[str, Any]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    # a bare string is taken as the `input` variable of the prompt
+    item = {"input": item} if isinstance(item, str) else dict(item)
+    return {**kwargs, **item}
+
+
+def _run_one(func: Callable[..., Optional[str]], index: int, item: Dict[str, Any]) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        output = func(**item)
+        return BatchResult(index=index, input=item, output=output, elapsed=time.perf_counter() - start)
+    except Exception as e:
+        logger.error(f"Batch input {index} failed: {e}")
+        return BatchResult(index=index, input=item, error=e, elapsed=time.perf_counter() - start)
+
+
+async def _arun_one(afunc: Callable[..., Awaitable[Optional[str]]], index: int, item: Dict[str, Any]) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        output = await afunc(**item)
+        return BatchResult(index=index, input=item, output=output, elapsed=time.perf_counter() - start)
+    except Exception as e:
+        logger.error(f"Batch input {index} failed: {e}")
+        return BatchResult(index=index, input=item, error=e, elapsed=time.perf_counter() - start)
+
+
+def _check_concurrency(max_concurrency: int) -> None:
+    # checked before the generator is created, so the error is raised at the call site
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+
+def run_batch(func: Callable[..., Optional[str]],
+              inputs: Iterable[Union[str, Dict[str, Any]]],
+              max_concurrency: int = 8,
+              ordered: bool = True,
+              **kwargs) -> Iterator[BatchResult]:
+    """
+    Runs `func` over many inputs on a bounded thread pool and streams the results.
+
+    Args:
+        func (Callable): The function executed for every input, e.g. `Agent.execute`.
+        inputs (Iterable): Strings (used as `input`) or dicts of keyword arguments. Consumed lazily.
+        max_concurrency (int): The maximum number of inputs in flight.
+        ordered (bool): Yield results in input order, otherwise as soon as they finish.
+        kwargs: Keyword arguments shared by every input.
+
+    Returns:
+        Iterator[BatchResult]: The result of each input. Failures are reported in the result, never raised.
+
+    Raises:
+        ValueError: If `max_concurrency` is lower than 1.
+    """
+    _check_concurrency(max_concurrency)
+    return _run_batch(func, inputs, max_concurrency, ordered, kwargs)
+
+
+def _run_batch(func: Callable[..., Optional[str]],
+               inputs: Iterable[Union[str, Dict[str, Any]]],
+               max_concurrency: int,
+               ordered: bool,
+               kwargs: Dict[str, Any]) -> Iterator[BatchResult]:
+    items = enumerate(inputs)
+    stats = BatchStats()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def submit():
+        for index, item in items:
+            return executor.submit(_run_one, func, index, _normalize_input(item, kwargs))
+        return None
+
+    try:
+        if ordered:
+            queue = deque()
+            for _ in range(max_concurrency):
+                future = submit()
+                if future is None:
+                    break
+                queue.append(future)
+            while queue:
+                result = queue.popleft().result()
+                future = submit()
+                if future is not None:
+                    queue.append(future)
+                yield stats.update(result)
+        else:
+            pending = set()
+            for _ in range(max_concurrency):
+                future = submit()
+                if future is None:
+                    break
+                pending.add(future)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    next_future = submit()
+                    if next_future is not None:
+                        pending.add(next_future)
+                    yield stats.update(future.result())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        stats.report()
+
+
+def arun_batch(afunc: Callable[..., Awaitable[Optional[str]]],
+               inputs: Iterable[Union[str, Dict[str, Any]]],
+               max_concurrency: int = 8,
+               ordered: bool = True,
+               **kwargs) -> AsyncIterator[BatchResult]:
+    """
+    Asynchronous version of `run_batch`, running the coroutine `afunc` as tasks on the current event loop.
+
+    Args:
+        afunc (Callable): The coroutine function executed for every input, e.g. `Agent.aexecute`.
+        inputs (Iterable): Strings (used as `input`) or dicts of keyword arguments. Consumed lazily.
+        max_concurrency (int): The maximum number of inputs in flight.
+        ordered (bool): Yield results in input order, otherwise as soon as they finish.
+        kwargs: Keyword arguments shared by every input.
+
+    Returns:
+        AsyncIterator[BatchResult]: The result of each input. Failures are reported in the result, never raised.
+
+    Raises:
+        ValueError: If `max_concurrency` is lower than 1.
+    """
+    _check_concurrency(max_concurrency)
+    return _arun_batch(afunc, inputs, max_concurrency, ordered, kwargs)
+
+
+async def _arun_batch(afunc: Callable[..., Awaitable[Optional[str]]],
+                      inputs: Iterable[Union[str, Dict[str, Any]]],
+                      max_concurrency: int,
+                      ordered: bool,
+                      kwargs: Dict[str, Any]) -> AsyncIterator[BatchResult]:
+    items = enumerate(inputs)
+    stats = BatchStats()
+    tasks = set()
+
+    def submit():
+        for index, item in items:
+            task = asyncio.ensure_future(_arun_one(afunc, index, _normalize_input(item, kwargs)))
+            tasks.add(task)
+            return task
+        return None
+
+    try:
+        if ordered:
+            queue = deque()
+            for _ in range(max_concurrency):
+                task = submit()
+                if task is None:
+                    break
+                queue.append(task)
+            while queue:
+                task = queue.popleft()
+                result = await task
+                tasks.discard(task)
+                next_task = submit()
+                if next_task is not None:
+                    queue.append(next_task)
+                yield stats.update(result)
+        else:
+            for _ in range(max_concurrency):
+                if submit() is None:
+                    break
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    submit()
+                    yield stats.update(task.result())
+    finally:
+        for task in tasks:
+            task.cancel()
+        stats.report()
@@ -0,0 +1,182 @@
+import ast
+import functools
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+
+
+THOUGHT_PREFIX = "Thought: Do I need to use a tool?"
+ACTION_PREFIX = "Action:"
+ACTION_INPUT_PREFIX = "Action Input:"
+OBSERVATION_PREFIX = "Observation:"
+FINAL_ANSWER_PREFIX = "AI:"
+# "AI:" only opens the final answer at the start of a line, not inside words such as "OpenAI:"
+FINAL_ANSWER_PATTERN = re.compile(rf"^[ \t]*{FINAL_ANSWER_PREFIX}", re.MULTILINE)
+QUOTES = "\"'"
+ARGUMENT_SEPARATORS = ",;"
+
+
+@dataclass
+class ReactAction:
+    """
+    An Action/Action Input block of a ReAct response.
+
+    Attributes:
+    - name (str): The name of the tool.
+    - input (str): The raw text of the action input, possibly spanning several lines.
+    """
+    name: str
+    input: str = ""
+
+
+@dataclass
+class ReactOutput:
+    """
+    The result of parsing a ReAct response.
+
+    Attributes:
+    - use_tool (bool): Whether the thought answered "Yes" to "Do I need to use a tool?".
+    - actions (List[ReactAction]): The actions of the response, in order.
+    - final_answer (Optional[str]): The text after the first line starting with "AI:", if any.
+    - content (str): The response without any hallucinated observation.
+    """
+    use_tool: bool = False
+    actions: List[ReactAction] = field(default_factory=list)
+    final_answer: Optional[str] = None
+    content: str = ""
+
+
+def _thought_flag(line: str) -> Optional[bool]:
+    # "Thought: Do I need to use a tool? Yes|No" may appear anywhere in the line
+    start = line.find(THOUGHT_PREFIX)
+    while start >= 0:
+        rest = line[start + len(THOUGHT_PREFIX):]
+        if rest.startswith(" Yes"):
+            return True
+        if rest.startswith(" No"):
+            return False
+        start = line.find(THOUGHT_PREFIX, start + 1)
+    return None
+
+
+def parse_react_output(text: str) -> ReactOutput:
+    """
+    Parses a ReAct response in a single linear scan over its lines.
+
+    The response is cut at the first line starting with "Observation:" (after the first line),
+    every "Action:" line opens a new action, and an "Action Input:" collects the following
+    lines until the next action.
+
+    Args:
+    - text (str): The response of the language model.
+
+    Returns:
+    - ReactOutput: The thought flag, the actions and the final answer of the response.
+    """
+    output = ReactOutput()
+    flag = None
+    action = None
+    input_lines = None
+    lines = text.split("\n")
+    end = len(lines)
+    for idx, line in enumerate(lines):
+        stripped = line.lstrip()
+        if idx > 0 and line.startswith(OBSERVATION_PREFIX):
+            end = idx
+            break
+        if flag is None:
+            flag = _thought_flag(line)
+        if stripped.startswith(ACTION_PREFIX):
+            if action is not None and input_lines is not None:
+                action.input = "\n".join(input_lines)
+            action = ReactAction(name=stripped[len(ACTION_PREFIX):].strip())
+            input_lines = None
+            output.actions.append(action)
+        elif stripped.startswith(ACTION_INPUT_PREFIX) and action is not None and input_lines is None:
+            input_lines = [stripped[len(ACTION_INPUT_PREFIX):].lstrip()]
+        elif input_lines is not None:
+            input_lines.append(line)
+    if action is not None and input_lines is not None:
+        action.input = "\n".join(input_lines)
+    output.use_tool = bool(flag)
+    output.content = "\n".join(lines[:end]).strip()
+    match = FINAL_ANSWER_PATTERN.search(output.content)
+    if match is not None:
+        output.final_answer = output.content[match.end():].strip()
+    return output
+
+
+def clean_value(value: str, separators: str = "") -> str:
+    """
+    Removes one pair of outer quotes and trailing newlines followed by special characters,
+    in linear time. The `separators` ending the value (e.g. the comma before the next argument)
+    are removed first, so the quotes before them are removed too.
+    """
+    if separators:
+        value = value.rstrip().rstrip(separators).rstrip()
+    if value and value[0] in QUOTES:
+        value = value[1:]
+    if value and value[-1] in QUOTES:
+        value = value[:-1]
+    # the trailing run of non-alphanumeric characters is cut from its first newline
+    idx = len(value)
+    while idx > 0 and not value[idx - 1].isalnum():
+        idx -= 1
+    newline = value.find("\n", idx)
+    if newline >= 0:
+        value = value[:newline]
+    return value.strip()
+
+
+@functools.lru_cache(maxsize=256)
+def _argument_pattern(input_args: Tuple[str, ...]) -> re.Pattern:
+    names = "|".join(re.escape(arg) for arg in sorted(input_args, key=len, reverse=True))
+    return re.compile(rf"(?P<name>{names})\s*[:=]\s*")
+
+
+def parse_action_input(content: str, input_args: Sequence[str]) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Parses the raw text of an action input into the arguments of a tool.
+
+    A dict literal is used as-is. Otherwise the `name: value` (or `name=value`) pairs are found
+    with a single precompiled pattern, each value running until the next argument name, without
+    the comma or semicolon separating them.
+
+    Args:
+    - content (str): The raw text of the action input.
+    - input_args (Sequence[str]): The argument names of the tool.
+
+    Returns:
+    - Tuple[Dict[str, str], Optional[str]]: The arguments, and an error message for the model if
+      the input has unexpected arguments.
+    """
+    extracted_args = {}
+    output = None
+    content = clean_value(content) if content else content
+    if not content:
+        return extracted_args, output
+    if content.startswith("{"):
+        try:
+            action_input = ast.literal_eval(content)
+            if isinstance(action_input, dict):
+                if any(k not in input_args for k in action_input):
+                    output = "The Action Input has incorrect input, Please check again."
+                return action_input, output
+        except Exception:
+            logger.warning(f"Action input is not a dict.")
+    if input_args:
+        matches = list(_argument_pattern(tuple(input_args)).finditer(content))
+        for match, next_match in zip(matches, matches[1:] + [None]):
+            name = match.group("name")
+            if name in extracted_args:
+                continue
+            if next_match is not None:
+                # the value runs until the next argument, without the separator between them
+                extracted_args[name] = clean_value(content[match.end():next_match.start()], ARGUMENT_SEPARATORS)
+            else:
+                extracted_args[name] = clean_value(content[match.end():].strip())
+    # for the input_args, it may not output the key
+    if not extracted_args and len(input_args) == 1:
+        extracted_args[input_args[0]] = clean_value(content.strip())
+    return extracted_args, output
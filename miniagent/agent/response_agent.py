@@ -65,6 +65,28 @@ class ResponseAgent(BaseAgent):
         
         return action_output
 
+    async def _ainvoke_tool(self, **kwargs) -> str:
+        """
+        Asynchronous version of `_invoke_tool`.
+        
+        Parameters:
+        - kwargs: Additional arguments for the tool.
+        
+        Returns:
+        - str: The output from the tool.
+        """
+        action_input = {k: kwargs.get(k, None) for (k, _) in self.tool.tool_args}
+        action = self.tool.tool_name
+        logger.info(f"Invoking tool: action={action}, action_input={action_input}")
+        
+        try:
+            action_output = await self.tool.ainvoke(**action_input)
+        except Exception as e:
+            logger.error(f"Error invoking tool: {e}")
+            raise e
+        
+        return action_output
+
     def execute(self, **kwargs) -> str:
         """
         Executes the agent by invoking the tool and generating a response from the LLM.
@@ -90,6 +112,32 @@ class ResponseAgent(BaseAgent):
             raise e
         
         return response
+
+    async def aexecute(self, **kwargs) -> str:
+        """
+        Asynchronous version of `execute`, awaiting both the tool and the LLM.
+        
+        Args:
+        - kwargs: Additional arguments for the tool and prompt.
+        
+        Returns:
+        - str: The response from the LLM.
+        """
+        action_output = await self._ainvoke_tool(**kwargs)
+        
+        f_prompt = self.prompt.format(action_output=action_output, **kwargs)
+        logger.info(f"\nPROMPT:\n{f_prompt}\n")
+        
+        messages = [LLMInput(role="user", content=f_prompt)]
+        
+        try:
+            response = await self.llm.ainvoke(messages=messages)
+            response = response.content
+        except Exception as e:
+            logger.error(f"Error invoking LLM: {e}")
+            raise e
+        
+        return response
     
 
 if __name__ == "__main__":
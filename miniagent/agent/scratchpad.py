@@ -0,0 +1,239 @@
+import functools
+from loguru import logger
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from miniagent.llm import LLMInput
+from miniagent.prompt.react import REACT_THOUGHT_PROMPT
+
+
+SUMMARY_PROMPT = \
+"""Summarize the following tool output in at most {max_tokens} tokens. Keep every fact, number, name and url that may be needed to answer the user.
+
+Tool output:
+{text}
+
+Summary:"""
+
+# the number of characters of a token when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(name: str = "cl100k_base"):
+    """
+    Loads a local tiktoken encoding, or returns None if tiktoken is not available.
+    """
+    try:
+        import tiktoken  # optional, only imported once tokens are counted
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"Cannot load the tokenizer {name}, token counts are estimated: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a text with tiktoken, or estimates them from its length.
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Keeps the first `max_tokens` tokens of a text.
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+class LLMSummarizer:
+    """
+    Summarizes old observations with a language model.
+    """
+
+    def __init__(self, llm, prompt: str = SUMMARY_PROMPT) -> None:
+        self.llm = llm
+        self.prompt = prompt
+
+    def __call__(self, text: str, max_tokens: int) -> str:
+        messages = [LLMInput(role="user", content=self.prompt.format(text=text, max_tokens=max_tokens))]
+        return self.llm.invoke(messages=messages).content
+
+
+@dataclass
+class Step:
+    content: str
+    observation: str = ""
+    tokens: int = 0
+    compacted: bool = False
+
+
+class Scratchpad:
+    """
+    Scratchpad keeps the steps of a single agent run. It renders them either as the
+    `agent_scratchpad` text of the prompt or as chat messages appended after a stable
+    prompt prefix. Both renderings are built incrementally as steps are appended.
+
+    With a token budget, the oldest observations are compacted whenever the steps exceed it,
+    while the last `keep_last` steps are kept verbatim as long as possible:
+    1. old observations are summarized (or truncated) to `compact_tokens` tokens,
+    2. old observations are elided,
+    3. old steps are dropped,
+    4. the observations of the kept steps are truncated.
+
+    Attributes:
+    - prefix (List[LLMInput]): The messages sent before the steps, e.g. the system and user prompt.
+    - steps (List[Step]): The content of each step and the observation appended to it.
+    - max_tokens (Optional[int]): The token budget of the steps, None for no limit.
+    - keep_last (int): The number of recent steps kept verbatim.
+    - compact_tokens (int): The size of a compacted observation in tokens.
+    - summarizer (Optional[Callable[[str, int], str]]): Compacts an observation to a number of tokens,
+      e.g. an LLMSummarizer. Observations are truncated when it is None.
+    """
+
+    def __init__(self,
+                 prefix: Optional[List[LLMInput]] = None,
+                 max_tokens: Optional[int] = None,
+                 keep_last: int = 2,
+                 compact_tokens: int = 256,
+                 summarizer: Optional[Callable[[str, int], str]] = None) -> None:
+        self.prefix = prefix if prefix is not None else []
+        self.steps: List[Step] = []
+        self.max_tokens = max_tokens
+        self.keep_last = keep_last
+        self.compact_tokens = compact_tokens
+        self.summarizer = summarizer
+        self.dropped = 0
+        self._text = ""
+        self._messages: List[LLMInput] = []
+
+    @property
+    def tokens(self) -> int:
+        """
+        Returns:
+        - int: The number of tokens of all steps.
+        """
+        return sum(step.tokens for step in self.steps)
+
+    def append(self, content: str, observation: str = "") -> None:
+        """
+        Appends a step to the scratchpad, compacting older steps if the token budget is exceeded.
+
+        Args:
+        - content (str): The output of the language model for the step.
+        - observation (str): The observation appended to the content, e.g. "\\nObservation: ...".
+        """
+        step = Step(content=content, observation=observation)
+        if self.max_tokens is not None:
+            step.tokens = count_tokens(content + observation)
+        self.steps.append(step)
+        if self.max_tokens is not None and self.tokens > self.max_tokens:
+            self._compact()
+            self._render()
+            logger.info(f"Compacted the scratchpad to {self.tokens} tokens.")
+        else:
+            self._render_step(step)
+
+    def _compress(self, observation: str, max_tokens: int) -> str:
+        body = observation.strip()
+        if body.startswith("Observation:"):
+            body = body[len("Observation:"):].strip()
+        if self.summarizer is not None:
+            try:
+                return f"\nObservation (summary): {truncate_tokens(self.summarizer(body, max_tokens), max_tokens)}"
+            except Exception as e:
+                logger.warning(f"Failed to summarize an observation, it is truncated instead: {e}")
+        return f"\nObservation: {truncate_tokens(body, max_tokens)} ...[truncated]"
+
+    def _update(self, step: Step, observation: str) -> None:
+        step.observation = observation
+        step.tokens = count_tokens(step.content + observation)
+
+    def _compact(self) -> None:
+        older = self.steps[:max(len(self.steps) - self.keep_last, 0)]
+        # 1. compress the old observations, oldest first
+        for step in older:
+            if self.tokens <= self.max_tokens:
+                return
+            if step.observation and not step.compacted and count_tokens(step.observation) > self.compact_tokens:
+                self._update(step, self._compress(step.observation, self.compact_tokens))
+                step.compacted = True
+        # 2. elide the old observations
+        for step in older:
+            if self.tokens <= self.max_tokens:
+                return
+            if step.observation:
+                self._update(step, "\nObservation: [elided]")
+        # 3. drop the old steps
+        while older and self.tokens > self.max_tokens:
+            older.pop(0)
+            self.steps.pop(0)
+            self.dropped += 1
+        # 4. truncate the observations of the kept steps
+        for step in self.steps:
+            if self.tokens <= self.max_tokens:
+                return
+            if step.observation:
+                others = self.tokens - step.tokens
+                budget = max(self.max_tokens - others - count_tokens(step.content), 0)
+                observation = ""
+                while budget > 0:
+                    observation = self._compress(step.observation, budget)
+                    # the "Observation: ...[truncated]" wrapper takes a few tokens of the budget too
+                    excess = others + count_tokens(step.content + observation) - self.max_tokens
+                    if excess <= 0:
+                        break
+                    budget -= excess
+                    observation = ""
+                self._update(step, observation)
+
+    def _render_step(self, step: Step) -> None:
+        entry = step.content + step.observation
+        self._text = f"{self._text}\n{entry}" if self._text else entry
+        self._messages.append(LLMInput(role="assistant", content=step.content))
+        self._messages.append(LLMInput(role="user", content=f"{step.observation.strip()}\n{REACT_THOUGHT_PROMPT}".strip()))
+
+    def _render(self) -> None:
+        self._text = ""
+        self._messages = []
+        if self.dropped:
+            note = f"[{self.dropped} earlier steps were removed to save space]"
+            self._text = note
+            self._messages.append(LLMInput(role="user", content=note))
+        for step in self.steps:
+            self._render_step(step)
+
+    def to_text(self) -> str:
+        """
+        Returns:
+        - str: The steps as the `agent_scratchpad` variable of the prompt.
+        """
+        return self._text
+
+    def to_messages(self) -> List[LLMInput]:
+        """
+        Returns:
+        - List[LLMInput]: The prefix followed by one assistant and one user message per step.
+        """
+        return self.prefix + self._messages
+
+    @property
+    def last(self) -> Optional[str]:
+        """
+        Returns:
+        - Optional[str]: The last step with its observation, or None if the scratchpad is empty.
+        """
+        if self.steps:
+            return self.steps[-1].content + self.steps[-1].observation
+
+    def __len__(self) -> int:
+        return len(self.steps)
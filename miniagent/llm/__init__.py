@@ -1,8 +1,29 @@
+import importlib
 from .base import LLMInput, GPTResponse
-from .gpt import ChatGPT
+from .cache import InMemoryCache, SQLiteCache
+
+# ChatGPT imports openai, which takes most of the import time of the package
+_LAZY_IMPORTS = {
+    "ChatGPT": ".gpt",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     "LLMInput",
     "GPTResponse",
     "ChatGPT",
-]
\ No newline at end of file
+    "InMemoryCache",
+    "SQLiteCache",
+]
@@ -1,15 +1,19 @@
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from dataclasses import dataclass, field
-from openai.types.chat import ChatCompletionMessage
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessage
 
 
 @dataclass
 class LLMInput:
     role: str = "user"
     content: str = ""
+    tool_calls: Optional[List[Dict[str, Any]]] = None  # the tool calls requested by an assistant message
+    tool_call_id: Optional[str] = None  # the tool call answered by a tool message
 
     def __post_init__(self):
-        valid_roles = {"user", "assistant", "system"}
+        valid_roles = {"user", "assistant", "system", "tool"}
         if self.role not in valid_roles:
             raise ValueError(f"Invalid role: {self.role}. Valid roles are: {valid_roles}")
 
@@ -17,7 +21,7 @@ class LLMInput:
 @dataclass
 class GPTResponse:
     history: List[LLMInput] = field(default_factory=list)
-    message: Optional[ChatCompletionMessage] = None
+    message: Optional["ChatCompletionMessage"] = None
     role: str = "assistant"
     content: str = ""
 
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from loguru import logger
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class CacheStats:
+    """
+    Hit and miss counters of a response cache.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def make_cache_key(model: str, messages: List[Dict[str, Any]], **params) -> str:
+    """Builds the cache key of a chat completion request.
+
+    Messages are normalized (surrounding whitespace stripped, empty fields dropped) and the
+    sampling params are sorted, so equivalent requests share a key.
+
+    Args:
+        model: The name of the model.
+        messages: The messages in the format of the OpenAI API.
+        params: The sampling params of the request, e.g. temperature, stop, tools.
+
+    Returns:
+        The sha256 hex digest of the request.
+    """
+    normalized = []
+    for message in messages:
+        message = {k: v for k, v in message.items() if v is not None}
+        if isinstance(message.get("content"), str):
+            message["content"] = message["content"].strip()
+        normalized.append(message)
+    payload = json.dumps({"model": model, "messages": normalized, "params": params},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BaseCache(ABC):
+    """
+    The interface of a response cache. Values are strings, e.g. serialized completions.
+    """
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the value stored under `key`, or None if it is missing or expired.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value. `ttl` overrides the lifetime of the cache for this entry.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+        pass
+
+    def _expires(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = ttl if ttl is not None else self.ttl
+        return time.time() + ttl if ttl is not None else None
+
+    def _record(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+
+class InMemoryCache(BaseCache):
+    """
+    A thread-safe LRU cache kept in memory.
+
+    Attributes:
+    - max_size (int): The maximum number of entries (not bytes), the least recently used are evicted first.
+    - ttl (Optional[float]): The lifetime of an entry in seconds, None for no expiry.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None) -> None:
+        super().__init__(ttl=ttl)
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] < time.time():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return self._record(entry[1] if entry is not None else None)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires = self._expires(ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(BaseCache):
+    """
+    A cache persisted in a SQLite database, shared across runs and processes.
+
+    Counting the entries scans the table, so the size is only checked every `evict_every` writes:
+    in between, the table may hold up to `evict_every` entries more than `max_size`.
+
+    Attributes:
+    - path (str): The path of the database file.
+    - max_size (int): The maximum number of entries (not bytes), the least recently used are evicted first.
+    - ttl (Optional[float]): The lifetime of an entry in seconds, None for no expiry.
+    - evict_every (int): The number of writes between two checks of the size.
+    """
+
+    def __init__(self, path: str = ".miniagent_cache/llm.sqlite", max_size: int = 100000, ttl: Optional[float] = None,
+                 evict_every: int = 100) -> None:
+        super().__init__(ttl=ttl)
+        self.path = path
+        self.max_size = max_size
+        self.evict_every = evict_every
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL, accessed REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return self._record(row[0] if row is not None else None)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO responses (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                               (key, value, self._expires(ttl), now))
+            self._writes += 1
+            if self._writes % self.evict_every:
+                return
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_size:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                    (count - self.max_size,))
+                self.stats.evictions += count - self.max_size
+                logger.info(f"Evicted {count - self.max_size} entries from the response cache.")
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
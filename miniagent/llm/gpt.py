@@ -1,7 +1,13 @@
 import openai
 import httpx
-from typing import Optional, List
+import asyncio
+import weakref
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, List
+from openai.types.chat import ChatCompletion
 from .base import LLMInput, GPTResponse
+from .cache import BaseCache, make_cache_key
+from miniagent.utils.transport import drop_closed_loops, get_transport
 
 
 class ChatGPT:
@@ -11,19 +17,51 @@ class ChatGPT:
                  api_key: Optional[str] = None,
                  base_url: Optional[httpx.URL] = None,
                  http_client: Optional[httpx.Client] = None,
+                 async_http_client: Optional[httpx.AsyncClient] = None,
                  model_name: str = "gpt-3.5-turbo",
+                 cache: Optional[BaseCache] = None,
                  **kwargs) -> None:
         """Initializes the ChatGPT instance with the provided parameters.
         
         Args:
             api_key: The API key for authenticating with the OpenAI API.
             base_url: The base URL for the OpenAI API.
-            http_client: An optional httpx.Client instance for making HTTP requests.
+            http_client: An optional httpx.Client instance for making HTTP requests. By default, the
+                client of the shared transport (see miniagent.utils.transport) is used.
+            async_http_client: An optional httpx.AsyncClient instance used by the async methods. By
+                default, the shared client of the running event loop is used.
             model_name: The name of the model to use for chat completions.
+            cache: An optional response cache (e.g. InMemoryCache or SQLiteCache) for deterministic calls.
+                It is bypassed when temperature > 0.
         """
+        http_client = http_client if http_client is not None else get_transport().client()
         client = openai.OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, **kwargs)
         self.model = client.chat.completions
         self.model_name = model_name
+        self.cache = cache
+        # the connections of an async client are bound to an event loop, so without a client of
+        # its own the async methods use an AsyncOpenAI client per loop
+        self._async_kwargs = dict(api_key=api_key, base_url=base_url, **kwargs)
+        self._async_model = None
+        if async_http_client is not None:
+            self._async_model = openai.AsyncOpenAI(http_client=async_http_client, **self._async_kwargs).chat.completions
+        self._async_models = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
+
+    @property
+    def async_model(self):
+        """The chat completions API of the async client used on the running event loop."""
+        if self._async_model is not None:
+            return self._async_model
+        loop = asyncio.get_running_loop()
+        http_client = get_transport().async_client()
+        with self._async_lock:
+            drop_closed_loops(self._async_models)
+            client_and_model = self._async_models.get(loop)
+            if client_and_model is None or client_and_model[0] is not http_client:
+                model = openai.AsyncOpenAI(http_client=http_client, **self._async_kwargs).chat.completions
+                client_and_model = self._async_models[loop] = (http_client, model)
+            return client_and_model[1]
 
     def convert_message(self, messages: List[LLMInput]) -> List[dict]:
         """Converts a list of LLMInput objects to the format expected by the OpenAI API.
@@ -34,7 +72,15 @@ class ChatGPT:
         Returns:
             A list of dictionaries with 'role' and 'content' keys.
         """
-        return [{'role': m.role, 'content': m.content} for m in messages]
+        gpt_messages = []
+        for m in messages:
+            message = {'role': m.role, 'content': m.content}
+            if m.tool_calls:
+                message['tool_calls'] = m.tool_calls
+            if m.tool_call_id is not None:
+                message['tool_call_id'] = m.tool_call_id
+            gpt_messages.append(message)
+        return gpt_messages
 
     def invoke(self, messages: List[LLMInput], temperature: float = 0, **kwargs) -> GPTResponse:
         """Sends messages to the model and returns the model's response.
@@ -47,16 +93,123 @@ class ChatGPT:
             A GPTResponse object containing the model's response.
         """
         gpt_messages = self.convert_message(messages)
+        key = self._cache_key(gpt_messages, temperature, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return self.parse_response(messages, ChatCompletion.model_validate_json(cached))
         output_message = self.model.create(
             model=self.model_name,
             messages=gpt_messages,
             temperature=temperature,
             **kwargs)
-        output_message = output_message.choices[0].message
-        
+        if key is not None:
+            self.cache.set(key, output_message.model_dump_json())
+        return self.parse_response(messages, output_message)
+
+    async def ainvoke(self, messages: List[LLMInput], temperature: float = 0, **kwargs) -> GPTResponse:
+        """Asynchronously sends messages to the model and returns the model's response.
+
+        The request is awaited on the event loop, so many agents can share one loop
+        while they are waiting on the network.
+
+        Args:
+            messages: A list of LLMInput objects representing the conversation history.
+            temperature: Controls the randomness of the response. Lower values mean less random responses.
+
+        Returns:
+            A GPTResponse object containing the model's response.
+        """
+        gpt_messages = self.convert_message(messages)
+        key = self._cache_key(gpt_messages, temperature, kwargs)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return self.parse_response(messages, ChatCompletion.model_validate_json(cached))
+        output_message = await self.async_model.create(
+            model=self.model_name,
+            messages=gpt_messages,
+            temperature=temperature,
+            **kwargs)
+        if key is not None:
+            self.cache.set(key, output_message.model_dump_json())
+        return self.parse_response(messages, output_message)
+
+    def stream(self, messages: List[LLMInput], temperature: float = 0, **kwargs) -> Iterator[str]:
+        """Sends messages to the model and yields the response as it is generated.
+
+        Closing the generator early (e.g. breaking out of the loop) closes the HTTP stream,
+        so the model stops generating tokens that will not be used.
+
+        Args:
+            messages: A list of LLMInput objects representing the conversation history.
+            temperature: Controls the randomness of the response. Lower values mean less random responses.
+
+        Yields:
+            The text deltas of the response.
+        """
+        gpt_messages = self.convert_message(messages)
+        response = self.model.create(
+            model=self.model_name,
+            messages=gpt_messages,
+            temperature=temperature,
+            stream=True,
+            **kwargs)
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            response.close()
+
+    async def astream(self, messages: List[LLMInput], temperature: float = 0, **kwargs) -> AsyncIterator[str]:
+        """Asynchronous version of `stream`.
+
+        Args:
+            messages: A list of LLMInput objects representing the conversation history.
+            temperature: Controls the randomness of the response. Lower values mean less random responses.
+
+        Yields:
+            The text deltas of the response.
+        """
+        gpt_messages = self.convert_message(messages)
+        response = await self.async_model.create(
+            model=self.model_name,
+            messages=gpt_messages,
+            temperature=temperature,
+            stream=True,
+            **kwargs)
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await response.close()
+
+    def _cache_key(self, gpt_messages: List[dict], temperature: float, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Returns the cache key of a request, or None if the request must not be cached.
+
+        Sampled (temperature > 0) and streamed requests always go to the API.
+        """
+        if self.cache is None or temperature > 0 or kwargs.get("stream"):
+            return None
+        return make_cache_key(self.model_name, gpt_messages, temperature=temperature, **kwargs)
+
+    def parse_response(self, messages: List[LLMInput], completion) -> GPTResponse:
+        """Wraps the first choice of a chat completion into a GPTResponse.
+
+        Args:
+            messages: The messages that were sent to the model.
+            completion: The ChatCompletion returned by the API.
+
+        Returns:
+            A GPTResponse object containing the model's response.
+        """
+        output_message = completion.choices[0].message
+
         # Assuming output_message is a ChatCompletionMessage object
         return GPTResponse(
             history=messages,
             message=output_message,
             role=output_message.role,
-            content=output_message.content.strip())
+            content=(output_message.content or "").strip())
@@ -30,6 +30,8 @@ Action Input: the input to the action. (you must include the name of of argument
 Observation:
 ```
 
+If several tools can be used independently of each other, you can repeat the Action and Action Input lines before the Observation, and all of them will be executed at once.
+
 When you have a response to say to the Human, or if you do not need to use a tool, you MUST use the format:
 
 ```
@@ -50,6 +52,16 @@ New input: {input}
 After you have an observation, you should stop. You can't ask questions back. 
 Thought: Do I need to use a tool?"""
 
+# the user content when the tools are described through the function-calling API
+FUNCTION_CALL_PROMPT = \
+"""Previous conversation history:
+{chat_history}
+
+New input: {input}"""
+
+# asks the model for its next thought after an observation
+REACT_THOUGHT_PROMPT = "Thought: Do I need to use a tool?"
+
 
 class ReactPromptTemplate(BasePromptTemplate):
     """
@@ -59,6 +71,8 @@ class ReactPromptTemplate(BasePromptTemplate):
     - sys_prompt (str): The combined system-level prompt consisting of prefix and base prompts.
     - suffix_prompt (str): The suffix prompt used as the user content for GPT.
     - prompt (str): The overall prompt combining sys_prompt and suffix_prompt.
+    - prefix_prompt (str): The system prompt used with the function-calling API.
+    - function_call_prompt (str): The user content used with the function-calling API.
     - input_variables (Set[str]): A set of variable names expected in the prompt.
 
     Examples:
@@ -72,8 +86,11 @@ class ReactPromptTemplate(BasePromptTemplate):
                  prefix_prompt: str = REACT_PREFIX_PROMPT,
                  base_prompt: str = REACT_BASE_PROMPT,
                  suffix_prompt: str = REACT_SUFFIX_PROMPT,
+                 function_call_prompt: str = FUNCTION_CALL_PROMPT,
                  input_variables: List[str] = None) -> None:
         super().__init__()
+        self.prefix_prompt = prefix_prompt.strip()  # the system message when tools are passed by function calling
+        self.function_call_prompt = function_call_prompt.strip()
         self.sys_prompt = "\n".join([prefix_prompt, base_prompt]).strip()  # this can be taken as the system message for the GPT
         self.suffix_prompt = suffix_prompt.strip()  # this is the user content for GPT
         self.prompt = "\n".join([self.sys_prompt, suffix_prompt]).strip()
@@ -111,6 +128,48 @@ class ReactPromptTemplate(BasePromptTemplate):
             logger.error(f"Error formatting prompt: {e}")
             raise
 
+    def _format(self, template: str, **kwargs) -> str:
+        variables = get_variables_from_str(template)
+        return template.format(**{k: kwargs.get(k, "") for k in variables})
+
+    def format_system(self, **kwargs) -> str:
+        """
+        Formats the system part of the template (prefix, tools and format instructions).
+        It does not change between the steps of a run, so it can be cached by the provider.
+        
+        Args:
+        - kwargs: Keyword arguments to format the prompt template.
+        
+        Returns:
+        - str: The formatted system prompt.
+        """
+        return self._format(self.sys_prompt, **kwargs)
+
+    def format_user(self, **kwargs) -> str:
+        """
+        Formats the suffix of the template, which is used as the user content.
+        
+        Args:
+        - kwargs: Keyword arguments to format the prompt template.
+        
+        Returns:
+        - str: The formatted user prompt.
+        """
+        return self._format(self.suffix_prompt, **kwargs)
+
+    def format_function_call(self, **kwargs) -> str:
+        """
+        Formats the user content used with the function-calling API, where the tools
+        and the format instructions are not part of the prompt.
+        
+        Args:
+        - kwargs: Keyword arguments to format the prompt template.
+        
+        Returns:
+        - str: The formatted user prompt.
+        """
+        return self._format(self.function_call_prompt, **kwargs)
+
     def __str__(self) -> str:
         """
         Returns:
@@ -1,16 +1,48 @@
+import importlib
 from .base import BaseTool, ToolList
-from .email_tool import EmailTool
-from .arxiv_tool import ArxivTool
-from .pdf_tool import PDFReaderTool
-from .search_tool import SearchTool
-from .scrap_tool import ScrapTool
+from .cache import ToolCache
+from miniagent.utils.register import TOOL_REGISTER
+
+# The tools and their helpers are imported on first access, so an agent only pays for the
+# dependencies (arxiv, pypdf, yagmail, search_engines...) of the tools it uses.
+_LAZY_IMPORTS = {
+    "EmailTool": ".email_tool",
+    "ArxivTool": ".arxiv_tool",
+    "PDFReaderTool": ".pdf_tool",
+    "SearchTool": ".search_tool",
+    "ScrapTool": ".scrap_tool",
+    "PDFPageCache": ".pdf_cache",
+    "HTTPCache": ".http_cache",
+    "ArxivStore": ".arxiv_store",
+}
+TOOLS = ("EmailTool", "ArxivTool", "PDFReaderTool", "SearchTool", "ScrapTool")
+
+for _name in TOOLS:
+    TOOL_REGISTER.register_lazy(_name, __name__ + _LAZY_IMPORTS[_name])
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     "BaseTool",
     "ToolList",
+    "ToolCache",
     "EmailTool",
     "ArxivTool",
     "PDFReaderTool",
+    "PDFPageCache",
     "SearchTool",
-    "ScrapTool"
+    "ScrapTool",
+    "HTTPCache",
+    "ArxivStore"
 ]
@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from loguru import logger
+from datetime import datetime
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+# arXiv field prefixes and boolean operators, which are not searched in the full-text index
+QUERY_FIELD = re.compile(r"\b(?:ti|au|abs|co|jr|cat|rn|id|all):", re.IGNORECASE)
+QUERY_OPERATORS = {"and", "or", "andnot", "not"}
+
+
+@dataclass
+class ArxivEntry:
+    """
+    The metadata of an arXiv paper.
+
+    Attributes:
+    - entry_id (str): The URL of the paper, e.g. http://arxiv.org/abs/2401.00001v1.
+    - title (str): The title of the paper.
+    - authors (List[str]): The names of the authors.
+    - summary (str): The abstract of the paper.
+    - published (datetime): When the first version was submitted.
+    - updated (datetime): When the last version was submitted.
+    """
+    entry_id: str
+    title: str
+    authors: List[str]
+    summary: str
+    published: datetime
+    updated: datetime
+
+
+def fts_query(query: str) -> str:
+    """
+    Converts an arXiv query into an FTS5 query matching any of its terms, e.g. 'ti:"language agent"'
+    into '"language" OR "agent"'. The results are ranked by BM25, so papers matching more terms come first.
+    """
+    terms = re.findall(r"\w+", QUERY_FIELD.sub(" ", query))
+    terms = [term for term in terms if term.lower() not in QUERY_OPERATORS]
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+class ArxivStore:
+    """
+    ArxivStore keeps the arXiv papers fetched by ArxivTool in SQLite, with an FTS5 full-text index
+    over their titles, authors and abstracts.
+
+    Each query is linked to the papers the API returned for it, with the time of its last sync, so
+    a query synced less than `max_age` seconds ago is answered without the API, and an older one
+    only fetches the papers submitted since its newest one. The full-text index answers queries
+    which have never been synced when the API is unavailable.
+
+    Attributes:
+    - path (str): The path of the SQLite database.
+    - max_age (float): How long the results of a query are used before syncing it again, in seconds.
+    """
+
+    ORDER_COLUMNS = {"published", "updated", "rank"}
+
+    def __init__(self, path: str = ".miniagent_cache/arxiv.sqlite", max_age: float = 3600.0) -> None:
+        self.path = path
+        self.max_age = max_age
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers (entry_id TEXT PRIMARY KEY, title TEXT NOT NULL, "
+                "authors TEXT NOT NULL, summary TEXT NOT NULL, published TEXT NOT NULL, updated TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5("
+                "title, authors, summary, content='papers', content_rowid='rowid')")
+            # keep the full-text index in sync with the papers
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS papers_insert AFTER INSERT ON papers BEGIN "
+                "INSERT INTO papers_fts (rowid, title, authors, summary) "
+                "VALUES (new.rowid, new.title, new.authors, new.summary); END")
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS papers_update AFTER UPDATE ON papers BEGIN "
+                "INSERT INTO papers_fts (papers_fts, rowid, title, authors, summary) "
+                "VALUES ('delete', old.rowid, old.title, old.authors, old.summary); "
+                "INSERT INTO papers_fts (rowid, title, authors, summary) "
+                "VALUES (new.rowid, new.title, new.authors, new.summary); END")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS syncs (query_key TEXT PRIMARY KEY, synced_at REAL NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS links (query_key TEXT NOT NULL, entry_id TEXT NOT NULL, "
+                "rank INTEGER NOT NULL, PRIMARY KEY (query_key, entry_id))")
+
+    def last_sync(self, query_key: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT synced_at FROM syncs WHERE query_key = ?", (query_key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def is_fresh(self, query_key: str) -> bool:
+        synced_at = self.last_sync(query_key)
+        return synced_at is not None and time.time() - synced_at < self.max_age
+
+    def newest(self, query_key: str, column: str = "published") -> Optional[datetime]:
+        """
+        Returns the newest submission date of the papers linked to a query.
+        """
+        if column not in ("published", "updated"):
+            raise ValueError(f"Unknown date column: {column}")
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT MAX(p.{column}) FROM links l JOIN papers p ON p.entry_id = l.entry_id "
+                "WHERE l.query_key = ?", (query_key,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row[0] else None
+
+    def add(self, query_key: str, entries: List[ArxivEntry], replace: bool = False) -> None:
+        """
+        Stores papers, links them to a query and marks the query as synced.
+
+        Args:
+        - query_key (str): The key of the query.
+        - entries (List[ArxivEntry]): The papers returned by the API, in its order.
+        - replace (bool): Whether the papers replace those linked to the query, or are added to them.
+        """
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM links WHERE query_key = ?", (query_key,))
+            offset = self._conn.execute(
+                "SELECT COALESCE(MAX(rank) + 1, 0) FROM links WHERE query_key = ?", (query_key,)).fetchone()[0]
+            for rank, entry in enumerate(entries, start=offset):
+                self._conn.execute(
+                    "INSERT INTO papers (entry_id, title, authors, summary, published, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (entry_id) DO UPDATE SET title = excluded.title, "
+                    "authors = excluded.authors, summary = excluded.summary, published = excluded.published, "
+                    "updated = excluded.updated",
+                    (entry.entry_id, entry.title, json.dumps(entry.authors), entry.summary,
+                     entry.published.isoformat(), entry.updated.isoformat()))
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO links (query_key, entry_id, rank) VALUES (?, ?, ?)",
+                    (query_key, entry.entry_id, rank))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO syncs (query_key, synced_at) VALUES (?, ?)", (query_key, time.time()))
+        logger.info(f"Stored {len(entries)} arXiv papers.")
+
+    def linked(self, query_key: str, order_by: str = "rank", descending: bool = False, limit: int = 3) -> List[ArxivEntry]:
+        """
+        Returns the papers linked to a query, sorted by "rank" (the order of the API), "published" or "updated".
+        """
+        if order_by not in self.ORDER_COLUMNS:
+            raise ValueError(f"Unknown order: {order_by}. Valid orders are: {sorted(self.ORDER_COLUMNS)}")
+        column = "l.rank" if order_by == "rank" else f"p.{order_by}"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.entry_id, p.title, p.authors, p.summary, p.published, p.updated "
+                "FROM links l JOIN papers p ON p.entry_id = l.entry_id WHERE l.query_key = ? "
+                f"ORDER BY {column} {'DESC' if descending else 'ASC'}, l.rank LIMIT ?", (query_key, limit)).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def search(self, query: str, limit: int = 3) -> List[ArxivEntry]:
+        """
+        Searches all the stored papers with the full-text index, best matches first.
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.entry_id, p.title, p.authors, p.summary, p.published, p.updated "
+                "FROM papers_fts f JOIN papers p ON p.rowid = f.rowid WHERE papers_fts MATCH ? "
+                "ORDER BY bm25(papers_fts) LIMIT ?", (match, limit)).fetchall()
+        return [self._entry(row) for row in rows]
+
+    @staticmethod
+    def _entry(row) -> ArxivEntry:
+        return ArxivEntry(entry_id=row[0], title=row[1], authors=json.loads(row[2]), summary=row[3],
+                          published=datetime.fromisoformat(row[4]), updated=datetime.fromisoformat(row[5]))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM links")
+            self._conn.execute("DELETE FROM syncs")
+            self._conn.execute("DELETE FROM papers")
+            self._conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('rebuild')")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,9 +1,15 @@
-import arxiv
-import ftfy
+import json
 from loguru import logger
+from datetime import datetime, timezone
 from miniagent.tools.base import BaseTool
+from miniagent.tools.cache import cached
+from miniagent.tools.arxiv_store import ArxivEntry, ArxivStore
 from miniagent.utils.register import TOOL_REGISTER
-from typing import List
+from miniagent.utils.text import normalize_text
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import arxiv
 
 
 @TOOL_REGISTER
@@ -20,6 +26,8 @@ class ArxivTool(BaseTool):
     - sort_criterion (arxiv.SortCriterion): Criterion to sort the search results.
     - sort_order (arxiv.SortOrder): Order to sort the search results.
     - arxiv_kwargs (dict): Additional keyword arguments for the arXiv search.
+    - store (Optional[ArxivStore]): An optional local store of the fetched papers.
+    - cache_ttl (float): The lifetime of the cached search results in seconds.
     """
     
     tool_name = "ArxivTool"
@@ -27,8 +35,9 @@ class ArxivTool(BaseTool):
     tool_args = [("query", "The search query, topic or keywords")]
     
     DOC_CONTENT_CHARS_MAX = 40000
+    cache_ttl = 24 * 3600
 
-    def __init__(self, top_k_results: int = 3, sort_criterion: str = "submittedDate", sort_order: str = "descending", arxiv_kwargs: dict = {}) -> None:
+    def __init__(self, top_k_results: int = 3, sort_criterion: str = "submittedDate", sort_order: str = "descending", arxiv_kwargs: dict = {}, store: Optional[ArxivStore] = None) -> None:
         """
         Initializes the ArxivTool with the given parameters.
         
@@ -37,8 +46,12 @@ class ArxivTool(BaseTool):
         - sort_criterion (str): Criterion to sort the search results. Default is "submittedDate".
         - sort_order (str): Order to sort the search results. Default is "descending".
         - arxiv_kwargs (dict): Additional keyword arguments for the arXiv search. Default is {}.
+        - store (Optional[ArxivStore]): A local store of the fetched papers. Queries synced recently are
+          answered from it, older ones only fetch the papers submitted since their last sync. Default is None.
         """
         super().__init__()
+        import arxiv
+        from miniagent.utils.transport import get_transport
         self.top_k_results = top_k_results
         
         # Dictionary to map string criteria to arxiv.SortCriterion
@@ -52,6 +65,9 @@ class ArxivTool(BaseTool):
         # Set sort order based on input
         self.sort_order = arxiv.SortOrder.Descending if sort_order == "descending" else arxiv.SortOrder.Ascending
         self.arxiv_kwargs = arxiv_kwargs
+        self.store = store
+        # arxiv uses requests, so its client is shared instead, along with its rate limiting
+        self.client = get_transport().shared("arxiv", arxiv.Client)
 
     def clean_text(self, text: str) -> str:
         """
@@ -63,7 +79,7 @@ class ArxivTool(BaseTool):
         Returns:
         - str: The cleaned text.
         """
-        return ftfy.fix_text(text.replace('\n', ' '))
+        return normalize_text(text.replace('\n', ' '))
 
     def get_authors(self, authors: List) -> str:
         """
@@ -77,6 +93,91 @@ class ArxivTool(BaseTool):
         """
         return ", ".join([str(author) for author in authors])
 
+    def format_result(self, result) -> str:
+        """
+        Formats a paper, either an arxiv.Result or an ArxivEntry.
+        """
+        return (
+            f"Published: {result.published.date()}\n"
+            f"URL: {result.entry_id}\n"
+            f"Title: {result.title}\n"
+            f"Authors: {self.get_authors(result.authors)}\n"
+            f"Summary: {self.clean_text(result.summary)}\n"
+        )
+
+    def _search(self, query: str, sort_by: "arxiv.SortCriterion", sort_order: "arxiv.SortOrder") -> List["arxiv.Result"]:
+        import arxiv
+        arxiv_engine = arxiv.Search(
+            query=query,
+            max_results=self.top_k_results,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            **self.arxiv_kwargs
+        )
+        return list(self.client.results(arxiv_engine))
+
+    def _query_key(self, query: str) -> str:
+        return json.dumps([query, self.sort_criterion.value, self.sort_order.value, self.top_k_results,
+                           self.arxiv_kwargs], sort_keys=True, default=str)
+
+    def _date_column(self) -> Optional[str]:
+        # the stored date the results are sorted by, None when they are sorted by relevance
+        import arxiv
+        if self.sort_criterion == arxiv.SortCriterion.SubmittedDate:
+            return "published"
+        if self.sort_criterion == arxiv.SortCriterion.LastUpdatedDate:
+            return "updated"
+        return None
+
+    def _sync(self, query: str, query_key: str) -> None:
+        """
+        Fetches the results of a query into the store. Results sorted by date are fetched once, then only
+        the papers submitted (or updated) since the newest stored one; results sorted by relevance are replaced.
+        """
+        import arxiv
+        column = self._date_column()
+        newest = self.store.newest(query_key, column) if column is not None else None
+        if newest is None:
+            results = self._search(query, self.sort_criterion, self.sort_order)
+        elif self.sort_order == arxiv.SortOrder.Ascending:
+            results = []  # newer papers cannot be among the oldest ones
+        else:
+            field = "lastUpdatedDate" if column == "updated" else "submittedDate"
+            since = newest.astimezone(timezone.utc).strftime("%Y%m%d%H%M")
+            until = datetime.now(timezone.utc).strftime("%Y%m%d%H%M")
+            results = self._search(f"({query}) AND {field}:[{since} TO {until}]", self.sort_criterion, self.sort_order)
+            logger.info(f"Fetched {len(results)} arXiv papers since {newest}.")
+        entries = [ArxivEntry(entry_id=result.entry_id, title=result.title, authors=[str(a) for a in result.authors],
+                              summary=result.summary, published=result.published, updated=result.updated)
+                   for result in results]
+        self.store.add(query_key, entries, replace=newest is None)
+
+    def _stored_results(self, query: str) -> List[ArxivEntry]:
+        """
+        Returns the results of a query from the store, syncing it first if it is not fresh. When the API
+        fails, the stored results are used, or the full-text index if the query was never synced.
+        """
+        query_key = self._query_key(query)
+        if self.store.is_fresh(query_key):
+            logger.info(f"arXiv results of {query!r} loaded from the store.")
+        else:
+            try:
+                self._sync(query, query_key)
+            except Exception as e:
+                if self.store.last_sync(query_key) is None:
+                    entries = self.store.search(query, self.top_k_results)
+                    if not entries:
+                        raise
+                    logger.warning(f"arXiv search failed, answering from the full-text index: {e}")
+                    return entries
+                logger.warning(f"arXiv search failed, answering from the stored results: {e}")
+        import arxiv
+        column = self._date_column()
+        return self.store.linked(query_key, order_by=column or "rank",
+                                 descending=column is not None and self.sort_order == arxiv.SortOrder.Descending,
+                                 limit=self.top_k_results)
+
+    @cached
     def _invoke(self, query: str) -> str:
         """
         Executes the arXiv search with the given query.
@@ -87,23 +188,11 @@ class ArxivTool(BaseTool):
         Returns:
         - str: Formatted string of search results.
         """
-        arxiv_engine = arxiv.Search(
-            query=query,
-            max_results=self.top_k_results,
-            sort_by=self.sort_criterion,
-            sort_order=self.sort_order,
-            **self.arxiv_kwargs
-        )
-        output = []
-        for result in arxiv_engine.results():
-            content = (
-                f"Published: {result.published.date()}\n"
-                f"URL: {result.entry_id}\n"
-                f"Title: {result.title}\n"
-                f"Authors: {self.get_authors(result.authors)}\n"
-                f"Summary: {self.clean_text(result.summary)}\n"
-            )
-            output.append(content)
+        if self.store is not None:
+            results = self._stored_results(query)
+        else:
+            results = self._search(query, self.sort_criterion, self.sort_order)
+        output = [self.format_result(result) for result in results]
         return "\n".join(output)[:self.DOC_CONTENT_CHARS_MAX]
 
     def invoke(self, query: str) -> str:
@@ -1,11 +1,24 @@
-from typing import Dict, Optional
+import asyncio
+import functools
+from typing import Dict, Optional, Tuple
 from abc import ABC, abstractmethod
+from miniagent.tools.cache import CacheStats, ToolCache
 
 class BaseTool(ABC):
     """
     BaseTool is an abstract base class for tools. It defines the basic interface
     and common attributes that all tool implementations should have.
+
+    Attributes:
+    - cacheable (bool): Whether the outputs of the tool may be cached. Tools with side effects opt out.
+    - cache_ttl (Optional[float]): The lifetime of the cached outputs in seconds, None for the cache default.
+    - cache (Optional[ToolCache]): The cache of the tool, set by `set_cache`.
+    - optional_args (Tuple[str, ...]): The names of the arguments in `tool_args` that may be omitted.
     """
+    optional_args: Tuple[str, ...] = ()
+    cacheable: bool = True
+    cache_ttl: Optional[float] = None
+    cache: Optional[ToolCache] = None
     
     @property
     @abstractmethod
@@ -31,6 +44,52 @@ class BaseTool(ABC):
         """
         pass
 
+    async def ainvoke(self, **kwargs) -> str:
+        """
+        Asynchronous version of `invoke`. Tools without a native async implementation
+        are run in the default thread pool so they never block the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.invoke, **kwargs))
+
+    def set_cache(self, cache: Optional[ToolCache]) -> None:
+        """
+        Sets the cache of the tool, or removes it with None. Ignored if the tool is not cacheable.
+        """
+        if self.cacheable:
+            self.cache = cache
+
+    @property
+    def cache_stats(self) -> Optional[CacheStats]:
+        """
+        The hits and misses of the tool in its cache, None if it has not been looked up.
+        """
+        if self.cache is not None:
+            return self.cache.stats.get(self.tool_name)
+
+    @property
+    def tool_schema(self) -> Dict:
+        """
+        The JSON schema of the tool for the function-calling API, derived from `tool_args`.
+        Every argument is a string described by its description, required unless it is in `optional_args`.
+        """
+        arguments = self.tool_args if isinstance(self.tool_args, (list, tuple)) else []
+        return {
+            "type": "function",
+            "function": {
+                "name": self.tool_name,
+                "description": self.tool_description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        arg_name: {"type": "string", "description": arg_description}
+                        for arg_name, arg_description in arguments
+                    },
+                    "required": [arg_name for arg_name, _ in arguments if arg_name not in self.optional_args],
+                },
+            },
+        }
+
     @property
     def format_tool_info(self):
         # Format the arguments as a bulleted list
@@ -76,10 +135,18 @@ class ToolList(list):
             raise TypeError("Only instances of BaseTool or its subclasses can be added to ToolList")
         super().extend(iterable)
     
+    def set_cache(self, cache: Optional[ToolCache]) -> None:
+        for tool in self:
+            tool.set_cache(cache)
+
     @property
     def tool_names(self):
         return ", ".join([tool.tool_name for tool in self])
     
+    @property
+    def tool_schemas(self):
+        return [tool.tool_schema for tool in self]
+
     @property
     def tool_descriptions(self):
         return "\n".join([f"{idx}. {tool.format_tool_info}" for idx, tool in enumerate(self, start=1)])
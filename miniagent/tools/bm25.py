@@ -0,0 +1,80 @@
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def chunk_words(words: List[str], chunk_size: int = 128, overlap: int = 16) -> List[str]:
+    """
+    Splits a list of words into chunks of `chunk_size` words, consecutive chunks sharing `overlap` words.
+    """
+    step = max(chunk_size - overlap, 1)
+    return [" ".join(words[start:start + chunk_size])
+            for start in range(0, max(len(words) - overlap, 1), step)
+            if words[start:start + chunk_size]]
+
+
+class BM25Index:
+    """
+    A BM25 inverted index over the chunks of a document, in pure Python.
+
+    Attributes:
+    - chunks (List[str]): The text of each chunk.
+    - lengths (List[int]): The number of tokens of each chunk.
+    - postings (Dict[str, List[Tuple[int, int]]]): The (chunk id, term frequency) pairs of each term.
+    - k1 (float), b (float): The BM25 parameters.
+    """
+
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75) -> None:
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.lengths = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for chunk_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk)
+            self.lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((chunk_id, tf))
+        self.avgdl = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """
+        Scores the chunks against a query.
+
+        Returns:
+        - List[Tuple[int, float]]: The (chunk id, score) of the matching chunks, best first.
+        """
+        n = len(self.chunks)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / self.avgdl)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def to_dict(self) -> Dict:
+        return {"chunks": self.chunks, "k1": self.k1, "b": self.b, "lengths": self.lengths,
+                "postings": self.postings, "avgdl": self.avgdl}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BM25Index":
+        index = cls.__new__(cls)
+        index.chunks = data["chunks"]
+        index.k1 = data["k1"]
+        index.b = data["b"]
+        index.lengths = data["lengths"]
+        index.postings = {term: [tuple(p) for p in postings] for term, postings in data["postings"].items()}
+        index.avgdl = data["avgdl"]
+        return index
@@ -0,0 +1,139 @@
+import enum
+import json
+import hashlib
+import inspect
+import functools
+from loguru import logger
+from typing import Any, Callable, Dict, Optional
+from miniagent.llm.cache import CacheStats, InMemoryCache, SQLiteCache
+
+
+class ToolCache:
+    """
+    ToolCache memoizes the outputs of tools. Lookups go to an in-memory LRU first and then
+    to an optional SQLite tier, which keeps the outputs across runs.
+
+    The lifetime of an entry is taken from `ttl_policy[tool_name]`, then from the `cache_ttl`
+    attribute of the tool, then from `default_ttl`.
+
+    Attributes:
+    - memory (InMemoryCache): The in-memory LRU tier.
+    - disk (Optional[SQLiteCache]): The on-disk tier, None if `path` is not given.
+    - default_ttl (Optional[float]): The lifetime of an entry in seconds, None for no expiry.
+    - ttl_policy (Dict[str, float]): The lifetime of the entries of each tool, by tool name.
+    - stats (Dict[str, CacheStats]): The hits and misses of each tool, by tool name.
+    """
+
+    def __init__(self,
+                 max_size: int = 1024,
+                 path: Optional[str] = None,
+                 disk_max_size: int = 100000,
+                 default_ttl: Optional[float] = 3600,
+                 ttl_policy: Optional[Dict[str, float]] = None) -> None:
+        """
+        Args:
+        - max_size (int): The maximum number of entries kept in memory.
+        - path (Optional[str]): The path of the SQLite database, e.g. ".miniagent_cache/tools.sqlite".
+        - disk_max_size (int): The maximum number of entries kept on disk.
+        - default_ttl (Optional[float]): The lifetime of an entry in seconds. Default is one hour.
+        - ttl_policy (Optional[Dict[str, float]]): The lifetime of the entries of each tool, by tool name.
+        """
+        self.memory = InMemoryCache(max_size=max_size)
+        self.disk = SQLiteCache(path, max_size=disk_max_size) if path else None
+        self.default_ttl = default_ttl
+        self.ttl_policy = ttl_policy or {}
+        self.stats: Dict[str, CacheStats] = {}
+
+    def ttl(self, tool) -> Optional[float]:
+        if tool.tool_name in self.ttl_policy:
+            return self.ttl_policy[tool.tool_name]
+        return tool.cache_ttl if tool.cache_ttl is not None else self.default_ttl
+
+    def get(self, tool, key: str) -> Optional[str]:
+        stats = self.stats.setdefault(tool.tool_name, CacheStats())
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                # promote to memory; the disk entry keeps its own expiry
+                self.memory.set(key, value, ttl=self.ttl(tool))
+        if value is None:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return value
+
+    def set(self, tool, key: str, value: str) -> None:
+        ttl = self.ttl(tool)
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl=ttl)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def report(self) -> str:
+        """
+        Returns:
+        - str: One line per tool with its hits, misses and hit rate.
+        """
+        return "\n".join(f"{name}: {s.hits} hits, {s.misses} misses, hit rate {s.hit_rate:.2%}"
+                         for name, s in sorted(self.stats.items()))
+
+
+def _config(tool) -> Dict[str, Any]:
+    # the plain settings of a tool (e.g. top_k, text_length) change its output, so they are part of the key
+    return {k: v.name if isinstance(v, enum.Enum) else v
+            for k, v in sorted(vars(tool).items())
+            if not k.startswith("_") and isinstance(v, (str, int, float, bool, type(None), enum.Enum))}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+def make_tool_key(tool, arguments: Dict[str, Any]) -> str:
+    """
+    Builds the cache key of a tool call from the tool name, its settings and the normalized arguments.
+    """
+    payload = json.dumps({"tool": tool.tool_name, "config": _config(tool), "arguments": _normalize(arguments)},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached(method: Callable[..., str]) -> Callable[..., str]:
+    """
+    Memoizes a tool method with the cache set by `BaseTool.set_cache`. It is a no-op when
+    the tool has no cache or is not `cacheable`. Exceptions and None outputs are not cached,
+    so the decorated method should raise on failure rather than return an error message.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.cache
+        if cache is None or not self.cacheable:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        arguments.pop(next(iter(signature.parameters)))
+        key = make_tool_key(self, arguments)
+        output = cache.get(self, key)
+        if output is not None:
+            logger.info(f"{self.tool_name} output loaded from the cache.")
+            return output
+        output = method(self, *args, **kwargs)
+        if isinstance(output, str):
+            cache.set(self, key, output)
+        return output
+
+    return wrapper
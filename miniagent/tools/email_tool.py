@@ -1,35 +1,280 @@
 import re
-import yagmail
+import time
+import uuid
+import queue
+import atexit
+import smtplib
+import threading
+from collections import deque
+from dataclasses import dataclass
 from miniagent.tools.base import BaseTool
 from miniagent.utils.register import TOOL_REGISTER
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
 from loguru import logger
 
+if TYPE_CHECKING:
+    import yagmail
+
+
+class SMTPConnection:
+    """
+    SMTPConnection keeps a yagmail SMTP session open between emails, so the TCP connection, TLS
+    handshake and authentication are done once. A session idle for more than `max_idle` seconds is
+    checked with a NOOP before use, and a session dropped by the server is reopened once.
+    """
+
+    def __init__(self, user_email: str, password: Optional[str], host: str = "smtp.gmail.com",
+                 port: Optional[int] = None, max_idle: float = 60.0, **smtp_kwargs) -> None:
+        """
+        :param user_email: The email address of the sender.
+        :param password: The password for the sender's email account.
+        :param host: The SMTP server.
+        :param port: The port of the SMTP server, 465 with SSL and 587 otherwise by default.
+        :param max_idle: Seconds after which an idle session is checked before sending.
+        :param smtp_kwargs: Other arguments of yagmail.SMTP, e.g. smtp_ssl=False, smtp_starttls=False and
+            smtp_skip_login=True for a local test server without TLS.
+        """
+        self.user_email = user_email
+        self.password = password
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.smtp_kwargs = smtp_kwargs
+        self.connections = 0
+        self._yag: Optional["yagmail.SMTP"] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> "yagmail.SMTP":
+        import yagmail
+        yag = yagmail.SMTP(self.user_email, self.password, host=self.host, port=self.port, **self.smtp_kwargs)
+        yag.login()
+        self.connections += 1
+        logger.info(f"Connected to SMTP server {self.host}.")
+        return yag
+
+    def _is_alive(self) -> bool:
+        if time.monotonic() - self._last_used < self.max_idle:
+            return True
+        try:
+            return self._yag.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _close(self) -> None:
+        if self._yag is not None:
+            try:
+                self._yag.close()
+            except Exception:
+                pass
+            self._yag = None
+
+    def send(self, to: List[str], subject: str, contents: str) -> None:
+        """
+        Sends an email over the open session, reconnecting if the server closed it.
+        Raises the SMTP error if the email cannot be sent.
+        """
+        with self._lock:
+            for attempt in range(2):
+                if self._yag is None or not self._is_alive():
+                    self._close()
+                    self._yag = self._connect()
+                recipients, message = self._yag.prepare_send(to=to, subject=subject, contents=contents)
+                try:
+                    self._yag.smtp.sendmail(self._yag.user, recipients, message)
+                    self._last_used = time.monotonic()
+                    return
+                except (smtplib.SMTPServerDisconnected, OSError) as e:
+                    if isinstance(e, smtplib.SMTPException) and not isinstance(e, smtplib.SMTPServerDisconnected):
+                        raise  # an error answered by the server, e.g. a refused sender, is not retried here
+                    # the session was dropped, e.g. after a server timeout
+                    self._close()
+                    if attempt:
+                        raise
+                    logger.info(f"The SMTP session was closed ({e}), reconnecting.")
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+@dataclass
+class OutboxMessage:
+    """
+    An email waiting in the outbox.
+
+    Attributes:
+    - message_id (str): The id returned when the email was queued.
+    - to (List[str]): The recipients.
+    - subject (str): The subject.
+    - contents (str): The contents.
+    - attempts (int): The number of failed attempts.
+    - status (str): "queued", "sent" or "failed".
+    - error (Optional[str]): The last error.
+    """
+    message_id: str
+    to: List[str]
+    subject: str
+    contents: str
+    attempts: int = 0
+    status: str = "queued"
+    error: Optional[str] = None
+
+
+class EmailOutbox:
+    """
+    EmailOutbox sends emails from a background thread, so queuing an email returns immediately.
+    The queued emails are sent in batches of up to `batch_size` over the same SMTP session, and a
+    failed email is retried up to `max_retries` times with exponential backoff.
+
+    The outbox is closed at interpreter exit, so the emails still queued are sent even if `close`
+    is never called. Only the last `max_history` sent or failed emails are kept for `status`.
+    """
+
+    def __init__(self, connection: SMTPConnection, batch_size: int = 10, max_retries: int = 3,
+                 backoff: float = 1.0, max_backoff: float = 60.0, max_history: int = 1000) -> None:
+        self.connection = connection
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_history = max_history
+        self.messages: Dict[str, OutboxMessage] = {}
+        self._finished: "deque[str]" = deque()
+        self._queue: "queue.Queue[OutboxMessage]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, to: List[str], subject: str, contents: str) -> str:
+        """
+        Queues an email.
+
+        :return: The id of the queued email.
+        """
+        message = OutboxMessage(message_id=uuid.uuid4().hex[:12], to=to, subject=subject, contents=contents)
+        with self._lock:
+            self.messages[message.message_id] = message
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="EmailOutbox", daemon=True)
+                self._thread.start()
+                # the thread is a daemon, so the queue is flushed before the interpreter exits
+                atexit.register(self.close)
+        self._queue.put(message)
+        return message.message_id
+
+    def status(self, message_id: str) -> Optional[OutboxMessage]:
+        """
+        Returns a queued email, or one of the last `max_history` sent or failed emails.
+        """
+        with self._lock:
+            return self.messages.get(message_id)
+
+    def _finish(self, message: OutboxMessage, status: str) -> None:
+        # the finished emails are kept for `status` until `max_history` newer ones have finished
+        message.status = status
+        with self._lock:
+            self._finished.append(message.message_id)
+            while len(self._finished) > self.max_history:
+                self.messages.pop(self._finished.popleft(), None)
+
+    def _next_batch(self) -> List[OutboxMessage]:
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._next_batch()
+            retries = []
+            for message in batch:
+                try:
+                    self.connection.send(message.to, message.subject, message.contents)
+                    self._finish(message, "sent")
+                    logger.info(f"Sent email {message.message_id} to {message.to}")
+                except Exception as e:
+                    message.attempts += 1
+                    message.error = str(e)
+                    if message.attempts < self.max_retries:
+                        retries.append(message)
+                    else:
+                        self._finish(message, "failed")
+                        logger.error(f"Failed to send email {message.message_id} after {message.attempts} attempts: {e}")
+            if retries:
+                attempts = max(message.attempts for message in retries)
+                delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+                logger.info(f"Retrying {len(retries)} emails in {delay}s.")
+                self._stop.wait(delay)
+                for message in retries:
+                    self._queue.put(message)
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """
+        Blocks until every queued email has been sent or has failed.
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Sends the queued emails, then stops the background thread.
+        """
+        atexit.unregister(self.close)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.connection.close()
+
 
 @TOOL_REGISTER
 class EmailTool(BaseTool):
     """
     EmailTool is a tool for sending emails. It uses yagmail to send emails to a specified recipient.
+    The SMTP session is kept open between emails, and with `outbox=True` the emails are sent from a
+    background queue so the agent does not wait for the server.
     """
     tool_name = "EmailTool"
     tool_description = "This tool is useful when you want to send an email to someone."
     tool_args = [
         ("email", "The email address of the recipient, it's a list"),
-        ("subject", "The subject of the email"), 
+        ("subject", "The subject of the email"),
         ("contents", "The contents of the email"),
         ]
+    cacheable = False  # sending an email is a side effect
 
-    def __init__(self, user_email: str, password: str, recipient: List) -> None:
+    def __init__(self, user_email: str, password: str, recipient: List, host: str = "smtp.gmail.com",
+                 port: Optional[int] = None, outbox: bool = False, batch_size: int = 10, max_retries: int = 3,
+                 backoff: float = 1.0, **smtp_kwargs) -> None:
         """
         :param user_email: The email address of the sender.
         :param password: The password for the sender's email account.
         :param recipient: The email address of the recipient.
+        :param host: The SMTP server.
+        :param port: The port of the SMTP server, 465 with SSL and 587 otherwise by default.
+        :param outbox: Whether to send the emails from a background queue and return immediately.
+        :param batch_size: The maximum number of queued emails sent together.
+        :param max_retries: The number of attempts of a queued email.
+        :param backoff: The initial delay before retrying a queued email, doubled after each failure.
+        :param smtp_kwargs: Other arguments of yagmail.SMTP, e.g. smtp_ssl=False, smtp_starttls=False and
+            smtp_skip_login=True for a local test server without TLS.
         """
         super().__init__()
         self.user_email = user_email
         self.password = password
         self.recipient = recipient
-        
+        self.connection = SMTPConnection(user_email, password, host=host, port=port, **smtp_kwargs)
+        self.outbox = EmailOutbox(self.connection, batch_size=batch_size, max_retries=max_retries,
+                                  backoff=backoff) if outbox else None
+
     def _get_email_list(self, input_string: str) -> List:
         # Regular expression pattern for matching email addresses
         email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
@@ -37,22 +282,34 @@ class EmailTool(BaseTool):
         # Find all matches of the email pattern in the input string
         email_list = re.findall(email_pattern, input_string)
         return email_list
-            
-    def invoke(self, email: List | str = [], subject: str = "", contents: str = "") -> None:
+
+    def invoke(self, email: List | str = [], subject: str = "", contents: str = "") -> str:
         """
         Sends an email with the given subject and contents to the recipient.
-        
+
         :param subject: The subject of the email.
         :param contents: The contents of the email.
         """
         if isinstance(email, str):
             email = self._get_email_list(email)
-        email.extend(self.recipient + [self.user_email])
+        email = list(dict.fromkeys(list(email) + self.recipient + [self.user_email]))
         try:
-            with yagmail.SMTP(self.user_email, self.password) as yag:
-                yag.send(to=email, subject=subject, contents=contents)
-                logger.info(f"Send email to {email}")
+            if self.outbox is not None:
+                message_id = self.outbox.put(email, subject, contents)
+                logger.info(f"Queued email {message_id} to {email}")
+                return f"The email has been queued with id {message_id}. You can execute the next step."
+            self.connection.send(email, subject, contents)
+            logger.info(f"Send email to {email}")
             return "The email has been sent. You can execute the next step."
         except Exception as e:
             logger.info(f"An error occurred while sending the email: {e}")
+            return f"An error occurred while sending the email: {e}"
 
+    def close(self) -> None:
+        """
+        Sends the queued emails and closes the SMTP session.
+        """
+        if self.outbox is not None:
+            self.outbox.close()
+        else:
+            self.connection.close()
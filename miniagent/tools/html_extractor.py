@@ -0,0 +1,396 @@
+import re
+import importlib.util
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Union
+
+
+# the text of these elements is never visible
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "object"}
+# these elements start a new line of text
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav",
+    "ol", "p", "pre", "section", "table", "td", "th", "title", "tr", "ul",
+}
+SPACES = re.compile(r"\s+")
+
+
+class HTMLTextExtractor(HTMLParser):
+    """
+    HTMLTextExtractor collects the visible text of an HTML document fed in chunks, so a page can be
+    parsed while it is downloaded. Whitespace is collapsed and block elements start new lines.
+
+    Attributes:
+    - max_chars (Optional[int]): The number of characters after which `done` becomes True.
+    - length (int): The number of characters collected so far.
+    """
+
+    def __init__(self, max_chars: Optional[int] = None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.length = 0
+        self._parts: List[str] = []
+        self._skip = 0
+
+    @property
+    def done(self) -> bool:
+        return self.max_chars is not None and self.length >= self.max_chars
+
+    def _append(self, text: str) -> None:
+        self._parts.append(text)
+        self.length += len(text)
+
+    def _newline(self) -> None:
+        if self._parts and not self._parts[-1].endswith("\n"):
+            self._append("\n")
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in BLOCK_TAGS:
+            self._newline()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._newline()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(self._skip - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self._newline()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        text = SPACES.sub(" ", data)
+        if text == " " and (not self._parts or self._parts[-1].endswith((" ", "\n"))):
+            return
+        self._append(text)
+
+    @property
+    def text(self) -> str:
+        """
+        Returns:
+        - str: The text collected so far, one non-empty line per block.
+        """
+        lines = (line.strip() for line in "".join(self._parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+def extract_text(html: str) -> str:
+    """
+    Extracts the visible text of an HTML document.
+    """
+    extractor = HTMLTextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.text
+
+
+# elements removed before scoring the main content
+BOILERPLATE_TAGS = SKIP_TAGS | {"nav", "header", "footer", "aside", "form", "button", "select", "input", "label", "menu"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+# the class and id names of boilerplate and of content, after readability
+NEGATIVE_PATTERN = re.compile(
+    r"comment|meta|footer|footnote|sidebar|sponsor|share|social|cookie|consent|banner|promo|related|"
+    r"breadcrumb|menu|navbar|popup|modal|subscribe|newsletter|advert|\bads?\b|masthead|widget|toolbar", re.I)
+POSITIVE_PATTERN = re.compile(r"article|body|content|entry|main|post|text|blog|story|docs?\b", re.I)
+PARAGRAPH_TAGS = {"p", "pre", "td", "blockquote"}
+TAG_WEIGHTS = {
+    "article": 10, "main": 10, "div": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3,
+    "address": -3, "ol": -3, "ul": -3, "dl": -3, "dd": -3, "dt": -3, "li": -3, "form": -3,
+    "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+}
+
+
+class Node:
+    """
+    A light element tree shared by the parser backends. Children are Nodes or text.
+    """
+    __slots__ = ("tag", "attrs", "children", "parent", "score")
+
+    def __init__(self, tag: str, attrs: Optional[Dict[str, str]] = None, parent: Optional["Node"] = None) -> None:
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: List[Union["Node", str]] = []
+        self.parent = parent
+        self.score = None
+
+    def iter(self):
+        # pre-order, without recursion
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(node.children) if isinstance(child, Node))
+
+    def find(self, tag: str) -> Optional["Node"]:
+        return next((node for node in self.iter() if node.tag == tag), None)
+
+
+class _TreeBuilder(HTMLParser):
+    # builds a Node tree with html.parser, without the elements that are never visible
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#root")
+        self._stack = [self.root]
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        if self._skip:
+            return
+        node = Node(tag, {k: v or "" for k, v in attrs}, self._stack[-1])
+        self._stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._skip and tag not in SKIP_TAGS:
+            self._stack[-1].children.append(Node(tag, {k: v or "" for k, v in attrs}, self._stack[-1]))
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(self._skip - 1, 0)
+            return
+        if self._skip:
+            return
+        # close the element and any element left open inside it
+        for idx in range(len(self._stack) - 1, 0, -1):
+            if self._stack[idx].tag == tag:
+                del self._stack[idx:]
+                break
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._stack[-1].children.append(data)
+
+
+def _parse_python(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _parse_lxml(html: str) -> Node:
+    import lxml.html
+
+    def convert(element, parent):
+        node = Node(element.tag, dict(element.attrib), parent)
+        if element.text:
+            node.children.append(element.text)
+        for child in element:
+            if isinstance(child.tag, str) and child.tag not in SKIP_TAGS:
+                node.children.append(convert(child, node))
+            if child.tail:
+                node.children.append(child.tail)
+        return node
+
+    root = Node("#root")
+    document = lxml.html.document_fromstring(html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+    root.children.append(convert(document, root))
+    return root
+
+
+def _parse_selectolax(html: str) -> Node:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+
+    def convert(element, parent):
+        node = Node(element.tag, {k: v or "" for k, v in element.attributes.items()}, parent)
+        for child in element.iter(include_text=True):
+            if child.tag == "-text":
+                node.children.append(child.text(deep=False))
+            elif not child.tag.startswith(("_", "!")) and child.tag not in SKIP_TAGS:
+                node.children.append(convert(child, node))
+        return node
+
+    root = Node("#root")
+    tree = SelectolaxParser(html)
+    if tree.root is not None:
+        root.children.append(convert(tree.root, root))
+    return root
+
+
+PARSERS = {
+    "selectolax": ("selectolax", _parse_selectolax),
+    "lxml": ("lxml", _parse_lxml),
+    "python": (None, _parse_python),
+}
+
+
+def available_backends() -> List[str]:
+    """
+    Returns the installed parser backends, fastest first.
+    """
+    return [name for name, (module, _) in PARSERS.items() if module is None or importlib.util.find_spec(module) is not None]
+
+
+def parse_html(html: str, backend: str = "auto") -> Node:
+    """
+    Parses an HTML document into a Node tree with the given backend: "selectolax" or "lxml" when
+    they are installed, "python" for html.parser, or "auto" for the fastest installed one.
+    """
+    if backend == "auto":
+        backend = available_backends()[0]
+    if backend not in PARSERS:
+        raise ValueError(f"Unknown HTML parser backend: {backend}. Valid backends are: {list(PARSERS)}")
+    return PARSERS[backend][1](html)
+
+
+def _render(node: Union[Node, str], parts: List[str]) -> None:
+    if isinstance(node, str):
+        text = SPACES.sub(" ", node)
+        if text != " " or (parts and not parts[-1].endswith((" ", "\n"))):
+            parts.append(text)
+        return
+    block = node.tag in BLOCK_TAGS
+    if block:
+        parts.append("\n")
+    for child in node.children:
+        _render(child, parts)
+    if block:
+        parts.append("\n")
+
+
+def node_text(*nodes: Union[Node, str]) -> str:
+    """
+    Renders nodes as text, one non-empty line per block.
+    """
+    parts = []
+    for node in nodes:
+        _render(node, parts)
+    lines = (line.strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _class_weight(node: Node) -> int:
+    weight = 0
+    for name in (node.attrs.get("class", ""), node.attrs.get("id", "")):
+        if name:
+            if NEGATIVE_PATTERN.search(name):
+                weight -= 25
+            if POSITIVE_PATTERN.search(name):
+                weight += 25
+    return weight
+
+
+def _is_boilerplate(node: Node) -> bool:
+    if node.tag in BOILERPLATE_TAGS:
+        return True
+    if node.tag in ("html", "body", "article", "main"):
+        return False
+    names = f"{node.attrs.get('class', '')} {node.attrs.get('id', '')}"
+    return bool(NEGATIVE_PATTERN.search(names)) and not POSITIVE_PATTERN.search(names)
+
+
+def _strip_boilerplate(node: Node) -> None:
+    node.children = [child for child in node.children if isinstance(child, str) or not _is_boilerplate(child)]
+    for child in node.children:
+        if isinstance(child, Node):
+            _strip_boilerplate(child)
+
+
+def _lengths(node: Node, lengths: Dict[int, tuple]) -> tuple:
+    # (text length, link text length) of every node, computed bottom-up once
+    text = link = 0
+    for child in node.children:
+        if isinstance(child, str):
+            text += len(child.strip())
+        else:
+            child_text, child_link = _lengths(child, lengths)
+            text += child_text
+            link += child_text if child.tag == "a" else child_link
+    lengths[id(node)] = (text, link)
+    return text, link
+
+
+def _is_paragraph(node: Node) -> bool:
+    # a div without block children is scored like a paragraph, as in readability
+    if node.tag in PARAGRAPH_TAGS:
+        return True
+    return node.tag == "div" and not any(isinstance(c, Node) and c.tag in BLOCK_TAGS for c in node.children)
+
+
+def extract_main_text(html: str, backend: str = "auto", min_length: int = 250) -> str:
+    """
+    Extracts the main content of an HTML document, readability-style: boilerplate elements
+    (scripts, navigation, headers, footers, sidebars...) are removed, paragraphs score their
+    parent and grandparent by length and commas, scores are discounted by link density, and
+    the best element is returned with its siblings of similar score. The title of the page
+    comes first. Falls back to all the visible text when no element stands out.
+
+    Args:
+        html: The HTML document.
+        backend: The parser backend, see `parse_html`.
+        min_length: The minimum length of the main content, below it all the visible text is used.
+
+    Returns:
+        The text of the main content.
+    """
+    try:
+        return _extract_main_text(html, backend, min_length)
+    except RecursionError:
+        # pathologically nested documents are rendered flat
+        return extract_text(html)
+
+
+def _extract_main_text(html: str, backend: str, min_length: int) -> str:
+    root = parse_html(html, backend)
+    title = root.find("title")
+    title_text = node_text(title) if title is not None else ""
+    body = root.find("body") or root
+    _strip_boilerplate(body)
+    # the grandparent of a paragraph may be above the body, so every node gets its lengths
+    lengths = {}
+    _lengths(root, lengths)
+
+    candidates = []
+    for node in body.iter():
+        if not _is_paragraph(node) or node.parent is None:
+            continue
+        text = node_text(node)
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for ancestor, share in ((node.parent, 1.0), (node.parent.parent, 0.5)):
+            if ancestor is None or ancestor.tag == "#root":
+                continue
+            if ancestor.score is None:
+                ancestor.score = TAG_WEIGHTS.get(ancestor.tag, 0) + _class_weight(ancestor)
+                candidates.append(ancestor)
+            ancestor.score += score * share
+
+    best, best_score = None, 0.0
+    for node in candidates:
+        text_length, link_length = lengths[id(node)]
+        node.score *= 1 - (link_length / text_length if text_length else 0)
+        if best is None or node.score > best_score:
+            best, best_score = node, node.score
+
+    content = ""
+    if best is not None:
+        siblings = best.parent.children if best.parent is not None else [best]
+        threshold = max(10, best_score * 0.2)
+        selected = []
+        for sibling in siblings:
+            if sibling is best:
+                selected.append(sibling)
+            elif isinstance(sibling, Node):
+                text_length, link_length = lengths[id(sibling)]
+                density = link_length / text_length if text_length else 1
+                if (sibling.score is not None and sibling.score >= threshold) or \
+                        (sibling.tag == "p" and text_length > 80 and density < 0.25):
+                    selected.append(sibling)
+        content = node_text(*selected)
+    if len(content) < min_length:
+        content = node_text(body)
+    return f"{title_text}\n{content}" if title_text and not content.startswith(title_text) else content
+
+
+EXTRACTORS: Dict[str, Callable[[str], str]] = {
+    "text": extract_text,
+    "main": extract_main_text,
+}
@@ -0,0 +1,206 @@
+import os
+import time
+import sqlite3
+import threading
+from loguru import logger
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """
+    Parses a Cache-Control header into its directives, e.g. {"max-age": "60", "no-cache": None}.
+    """
+    directives = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Returns how long a response stays fresh in seconds, from its Cache-Control, Age, Expires and
+    Date headers: 0 if it must be revalidated before every use, None if it must not be stored.
+    """
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in directives:
+        return None
+    # the cache is keyed on the URL alone, so a response negotiated on request headers is not
+    # stored; bodies are stored decoded, so Accept-Encoding makes no difference
+    vary = {name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()}
+    if vary - {"accept-encoding"}:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    if "max-age" in directives:
+        try:
+            age = float(headers.get("age", 0))
+            return max(float(directives["max-age"]) - age, 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        date = _http_date(headers.get("date")) or time.time()
+        return max(expires - date, 0.0)
+    return 0.0
+
+
+@dataclass
+class CachedResponse:
+    """
+    The metadata of a cached response.
+
+    Attributes:
+    - url (str): The URL of the response.
+    - etag (Optional[str]): The ETag header, sent back in If-None-Match.
+    - last_modified (Optional[str]): The Last-Modified header, sent back in If-Modified-Since.
+    - fresh_until (float): The time until which the response can be used without revalidation.
+    - complete (bool): Whether the whole body was downloaded, or only its beginning.
+    """
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh_until: float
+    complete: bool
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+    def validators(self) -> Dict[str, str]:
+        """
+        Returns the headers of a conditional request revalidating the response.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    HTTPCache is a disk-backed HTTP cache for scraped pages. It stores the body of each response
+    with its validators and freshness lifetime, and the text extracted from it by each extractor,
+    so a fresh hit or a 304 Not Modified answer skips both the download and the parsing.
+
+    Entries are evicted, least recently used first, once the cache exceeds `max_bytes`. Responses
+    carrying a Vary header (other than Accept-Encoding) are not stored.
+
+    Attributes:
+    - path (str): The path of the SQLite database.
+    - max_bytes (int): The maximum size of the cached bodies and texts in bytes, encoded as UTF-8.
+    """
+
+    def __init__(self, path: str = ".miniagent_cache/http.sqlite", max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "fresh_until REAL NOT NULL, complete INTEGER NOT NULL, body TEXT NOT NULL, size INTEGER NOT NULL, "
+                "accessed REAL NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS texts (url TEXT NOT NULL, extractor TEXT NOT NULL, text TEXT NOT NULL, "
+                "PRIMARY KEY (url, extractor))")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, fresh_until, complete FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE url = ?", (time.time(), url))
+        return CachedResponse(url=url, etag=row[0], last_modified=row[1], fresh_until=row[2], complete=bool(row[3]))
+
+    def get_body(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM responses WHERE url = ?", (url,)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_text(self, url: str, extractor: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM texts WHERE url = ? AND extractor = ?", (url, extractor)).fetchone()
+        return row[0] if row is not None else None
+
+    def set_text(self, url: str, extractor: str, text: str) -> None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT length(CAST(text AS BLOB)) FROM texts WHERE url = ? AND extractor = ?", (url, extractor)).fetchone()
+            replaced = row[0] if row is not None else 0
+            self._conn.execute("INSERT OR REPLACE INTO texts (url, extractor, text) VALUES (?, ?, ?)", (url, extractor, text))
+            self._conn.execute("UPDATE responses SET size = size + ? WHERE url = ?", (len(text.encode()) - replaced, url))
+            self._evict()
+
+    def store(self, url: str, headers: Mapping[str, str], body: str, complete: bool) -> bool:
+        """
+        Stores a response, replacing the previous one and its extracted texts.
+
+        Returns:
+        - bool: False if the headers forbid storing the response.
+        """
+        lifetime = freshness_lifetime(headers)
+        if lifetime is None:
+            return False
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM texts WHERE url = ?", (url,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, fresh_until, complete, body, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, headers.get("etag"), headers.get("last-modified"), now + lifetime, int(complete), body, len(body.encode()), now))
+            self._evict()
+        return True
+
+    def revalidated(self, url: str, headers: Mapping[str, str]) -> None:
+        """
+        Updates the freshness and validators of a response after a 304 Not Modified answer.
+        """
+        lifetime = freshness_lifetime(headers)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET fresh_until = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified), accessed = ? WHERE url = ?",
+                (now + (lifetime or 0.0), headers.get("etag"), headers.get("last-modified"), now, url))
+
+    def _evict(self) -> None:
+        size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if size <= self.max_bytes:
+            return
+        evicted = 0
+        for url, entry_size in self._conn.execute("SELECT url, size FROM responses ORDER BY accessed").fetchall():
+            if size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._conn.execute("DELETE FROM texts WHERE url = ?", (url,))
+            size -= entry_size
+            evicted += 1
+        logger.info(f"Evicted {evicted} pages from the HTTP cache.")
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM texts")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,172 @@
+import os
+import json
+import mmap
+import shutil
+import hashlib
+import threading
+from loguru import logger
+from typing import Dict, Optional
+
+
+class PDFPageCache:
+    """
+    PDFPageCache keeps the extracted text of PDF pages on disk, addressed by the sha256 of the
+    file content, so a document is parsed once whatever its path or name.
+
+    Hashing is skipped when the size and mtime of a path match the index. Each page is stored
+    in its own file, so partial reads hit the cache too, and is read back with a memory map.
+    Whole documents are evicted, least recently used first, once the cache exceeds `max_bytes`.
+
+    Layout:
+    - <root>/index.json: path -> {"size", "mtime_ns", "sha256"}
+    - <root>/<sha256>/pages: the number of pages of the document
+    - <root>/<sha256>/<page_id>.txt: the text of a page
+    - <root>/<sha256>/<name>: other data derived from the document, e.g. a search index
+
+    Attributes:
+    - root (str): The directory of the cache.
+    - max_bytes (int): The maximum size of the cached pages in bytes.
+    """
+
+    def __init__(self, root: str = ".miniagent_cache/pdf", max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._index_path = os.path.join(root, "index.json")
+        self._index = self._load_index()
+        self._size = sum(self._document_size(sha) for sha in self._documents())
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _documents(self):
+        return [name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name))]
+
+    def _document_size(self, sha: str) -> int:
+        directory = os.path.join(self.root, sha)
+        return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    def digest(self, filepath: str) -> str:
+        """
+        Returns the sha256 of a file, hashing it only if its size or mtime changed.
+        """
+        path = os.path.abspath(filepath)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._index.get(path)
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                return entry["sha256"]
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        with self._lock:
+            self._index[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+            self._save_index()
+        return digest
+
+    def _page_path(self, digest: str, page_id: int) -> str:
+        return os.path.join(self.root, digest, f"{page_id}.txt")
+
+    def page_count(self, digest: str) -> Optional[int]:
+        """
+        Returns the number of pages of a cached document, or None if it is unknown.
+        """
+        try:
+            with open(os.path.join(self.root, digest, "pages"), "r") as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def set_page_count(self, digest: str, pages: int) -> None:
+        self._write(digest, "pages", str(pages).encode())
+
+    def has(self, digest: str, page_id: int) -> bool:
+        return os.path.exists(self._page_path(digest, page_id))
+
+    def get(self, digest: str, page_id: int) -> Optional[str]:
+        """
+        Reads the text of a cached page with a memory map, or returns None on a miss.
+        """
+        return self._read(digest, f"{page_id}.txt")
+
+    def set(self, digest: str, page_id: int, text: str) -> None:
+        self._write(digest, f"{page_id}.txt", text.encode("utf-8"))
+
+    def get_blob(self, digest: str, name: str) -> Optional[str]:
+        """
+        Reads data stored alongside the pages of a document, or returns None on a miss.
+        """
+        return self._read(digest, name)
+
+    def set_blob(self, digest: str, name: str, text: str) -> None:
+        self._write(digest, name, text.encode("utf-8"))
+
+    def _read(self, digest: str, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, digest, name), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    text = ""
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                        text = m[:].decode("utf-8")
+            # the mtime of the directory tracks the last use of the document for eviction
+            os.utime(os.path.join(self.root, digest))
+        except FileNotFoundError:
+            # the document may be evicted by another process at any time
+            return None
+        return text
+
+    def _write(self, digest: str, name: str, data: bytes) -> None:
+        directory = os.path.join(self.root, digest)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            # an overwritten file only adds the difference of size
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            os.utime(directory)
+            self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict(keep=digest)
+
+    def _evict(self, keep: str) -> None:
+        documents = sorted((os.stat(os.path.join(self.root, sha)).st_mtime_ns, sha)
+                           for sha in self._documents() if sha != keep)
+        for _, sha in documents:
+            if self._size <= self.max_bytes:
+                break
+            size = self._document_size(sha)
+            shutil.rmtree(os.path.join(self.root, sha), ignore_errors=True)
+            self._size -= size
+            logger.info(f"Evicted the cached pages of {sha} ({size} bytes).")
+        evicted = {sha for _, sha in documents} - set(self._documents())
+        if evicted:
+            self._index = {path: entry for path, entry in self._index.items() if entry["sha256"] not in evicted}
+            self._save_index()
+
+    def clear(self) -> None:
+        with self._lock:
+            for sha in self._documents():
+                shutil.rmtree(os.path.join(self.root, sha), ignore_errors=True)
+            self._index = {}
+            self._save_index()
+            self._size = 0
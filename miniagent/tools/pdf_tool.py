@@ -1,12 +1,31 @@
 import re
 import os
-import ftfy
+import json
+import threading
+import multiprocessing
 from loguru import logger
-from typing import List, Union
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
 from pathlib import Path
-from pypdf import PdfReader
 from miniagent.tools.base import BaseTool
+from miniagent.tools.bm25 import BM25Index, chunk_words
+from miniagent.tools.pdf_cache import PDFPageCache
 from miniagent.utils.register import TOOL_REGISTER
+from miniagent.utils.text import normalize_many, normalize_text
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+
+def _extract_range(filepath: str, start: int, stop: int) -> List[str]:
+    """
+    Extracts and fixes the text of the pages [start, stop) of a PDF file. It runs in a worker
+    process, which opens the file itself so the bytes of the document are never pickled.
+    """
+    from pypdf import PdfReader
+    reader = PdfReader(filepath)
+    return normalize_many(reader.pages[page_id].extract_text() or "" for page_id in range(start, stop))
 
 
 @TOOL_REGISTER
@@ -16,22 +35,79 @@ class PDFReaderTool(BaseTool):
     tool_args = [
         ("filepath", "A valid path of a pdf file.")
     ]
+    optional_args = ("query",)
+    QUERY_ARG = ("query", "Optional. What you are looking for in the file, only the most relevant passages are returned.")
+    MAX_INDEXES = 16
 
-    def __init__(self, max_length: int = 1024, number_of_pages: Union[str, int] = "all") -> None:
+    def __init__(self,
+                 max_length: int = 1024,
+                 number_of_pages: Union[str, int] = "all",
+                 workers: int = 1,
+                 pages_per_task: int = 8,
+                 min_parallel_pages: int = 32,
+                 page_cache: Optional[PDFPageCache] = None,
+                 retrieval: bool = False,
+                 chunk_size: int = 128) -> None:
         """
         :param max_length: the max words of parsed file.
         :param number_of_pages: the number of pages to parse. Can be 'all' for all pages or an integer.
+        :param workers: the number of processes extracting pages. 1 extracts them in this process.
+        :param pages_per_task: the number of consecutive pages extracted by a worker at a time.
+        :param min_parallel_pages: documents with fewer pages are extracted in this process, where
+            the start-up of the pool would dominate.
+        :param page_cache: an optional on-disk cache of the extracted text of each page.
+        :param retrieval: adds an optional `query` argument. With a query, the whole file is split into
+            chunks and the chunks matching the query best (BM25) are returned within `max_length` words.
+        :param chunk_size: the number of words of a chunk in retrieval mode.
         """
         super().__init__()
         self.max_length = max_length
         self.number_of_pages = number_of_pages
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.min_parallel_pages = min_parallel_pages
+        self.page_cache = page_cache
+        self.retrieval = retrieval
+        self.chunk_size = chunk_size
+        if retrieval:
+            self.tool_args = self.tool_args + [self.QUERY_ARG]
+        # BM25 indexes of recent files, used when there is no page cache to store them in
+        self._indexes = OrderedDict()
+        # created on the first parallel extraction and reused by the next ones
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
 
-    def _invoke(self, filepath: str) -> str:
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # tools run in threads, and forking a multi-threaded process is unsafe, so the workers are
+        # started by a fork server (or spawned where there is none)
+        with self._lock:
+            if self._executor is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(method))
+            return self._executor
+
+    def close(self) -> None:
+        """
+        Stops the worker processes. The tool can still be used afterwards, with a new pool.
         """
-        Internal method to read and extract text from a PDF file.
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
 
-        :param file_path: Path to the PDF file.
-        :return: Extracted text from the PDF file.
+    def __del__(self) -> None:
+        if getattr(self, "_executor", None) is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_pages(self, filepath: str) -> Iterator[str]:
+        """
+        Lazily extracts the text of the pages of a PDF file, one page at a time. With several
+        `workers`, ranges of pages are extracted ahead in a process pool and yielded in page order.
+        Pages found in the `page_cache` are read from it, and extracted pages are added to it.
+
+        :param filepath: Path to the PDF file.
+        :return: A generator of the fixed text of each non-empty page.
         """
         if Path(filepath).suffix.lower() != ".pdf":
             raise RuntimeError(f"Please input a valid PDF file. Now the input is {filepath}")
@@ -39,8 +115,15 @@ class PDFReaderTool(BaseTool):
             raise RuntimeError("Please input the direct path of a valid PDF file.")
         
         logger.info(f"\nReading a pdf from {filepath}")
-        reader = PdfReader(filepath)
-        total_pages = len(reader.pages)
+        digest = self.page_cache.digest(filepath) if self.page_cache is not None else None
+        total_pages = self.page_cache.page_count(digest) if digest is not None else None
+        from pypdf import PdfReader
+        reader = None
+        if total_pages is None:
+            reader = PdfReader(filepath)
+            total_pages = len(reader.pages)
+            if digest is not None:
+                self.page_cache.set_page_count(digest, total_pages)
 
         if self.number_of_pages == "all":
             pages_to_read = total_pages
@@ -49,33 +132,143 @@ class PDFReaderTool(BaseTool):
         else:
             raise ValueError("The number_of_pages should be 'all' or an integer.")
         
-        output = []
-        for page_id in range(pages_to_read):
+        page_id = 0
+        while page_id < pages_to_read:
+            text = self.page_cache.get(digest, page_id) if digest is not None else None
+            if text is not None:
+                page_id += 1
+                if text:
+                    yield text
+                continue
+            # extract the run of pages missing from the cache
+            stop = pages_to_read
+            if digest is not None:
+                stop = next((p for p in range(page_id + 1, pages_to_read) if self.page_cache.has(digest, p)), stop)
+            if self.workers > 1 and stop - page_id >= self.min_parallel_pages:
+                texts = self._iter_pages_parallel(filepath, page_id, stop)
+            else:
+                reader = reader if reader is not None else PdfReader(filepath)
+                texts = self._iter_pages_serial(reader, page_id, stop)
+            try:
+                for text in texts:
+                    if digest is not None:
+                        self.page_cache.set(digest, page_id, text)
+                    page_id += 1
+                    if text:
+                        yield text
+            finally:
+                texts.close()
+
+    def _iter_pages_serial(self, reader: "PdfReader", start: int, stop: int) -> Iterator[str]:
+        for page_id in range(start, stop):
             text = reader.pages[page_id].extract_text()
-            if text:
-                output.append(ftfy.fix_text(text))
-        return "\n".join(output)
-    
-    def truncate_string(self, input_string: str) -> str:
+            yield normalize_text(text)
+
+    def _iter_pages_parallel(self, filepath: str, start: int, stop: int) -> Iterator[str]:
+        ranges = iter([(first, min(first + self.pages_per_task, stop))
+                       for first in range(start, stop, self.pages_per_task)])
+        executor = self._get_executor()
+        queue = deque()
+
+        def submit():
+            for first, last in ranges:
+                queue.append(executor.submit(_extract_range, filepath, first, last))
+                return
+
+        try:
+            # keep two ranges per worker in flight, so workers never wait for the consumer
+            for _ in range(2 * self.workers):
+                submit()
+            while queue:
+                texts = queue.popleft().result()
+                submit()
+                yield from texts
+        finally:
+            # drops the ranges not started yet when the consumer is done, e.g. once the word budget is full
+            for future in queue:
+                future.cancel()
+
+    def _invoke(self, filepath: str) -> str:
         """
-        Truncate the input string to a specified number of words.
+        Internal method to read and extract text from a PDF file. Pages are read until
+        `max_length` words are collected, so the rest of the document is never parsed.
 
-        :param input_string: The string to be truncated.
-        :return: Truncated string.
+        :param file_path: Path to the PDF file.
+        :return: Extracted text from the PDF file, truncated to `max_length` words.
         """
-        words = input_string.split()
+        words = []
+        for page_id, text in enumerate(self.iter_pages(filepath), start=1):
+            words.extend(text.split())
+            if len(words) >= self.max_length:
+                logger.info(f"Stopped reading after {page_id} pages with text, the word budget is full.")
+                break
         return " ".join(words[:self.max_length])
     
-    def invoke(self, filepath: str) -> str:
+    def _build_index(self, filepath: str) -> BM25Index:
+        words = [word for text in self.iter_pages(filepath) for word in text.split()]
+        return BM25Index(chunk_words(words, self.chunk_size))
+
+    def get_index(self, filepath: str) -> BM25Index:
+        """
+        Returns the BM25 index of the chunks of a PDF file. The index is stored next to the pages in
+        the page cache if there is one, otherwise it is kept in memory for the most recent files.
+
+        :param filepath: Path to the PDF file.
+        :return: The index of the file.
+        """
+        name = f"bm25_{self.chunk_size}_{self.number_of_pages}.json"
+        if self.page_cache is not None:
+            digest = self.page_cache.digest(filepath)
+            data = self.page_cache.get_blob(digest, name)
+            if data is not None:
+                return BM25Index.from_dict(json.loads(data))
+            index = self._build_index(filepath)
+            self.page_cache.set_blob(digest, name, json.dumps(index.to_dict()))
+            return index
+        stat = os.stat(filepath)
+        key = (os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns, name)
+        if key in self._indexes:
+            self._indexes.move_to_end(key)
+            return self._indexes[key]
+        index = self._indexes[key] = self._build_index(filepath)
+        if len(self._indexes) > self.MAX_INDEXES:
+            self._indexes.popitem(last=False)
+        return index
+
+    def _retrieve(self, filepath: str, query: str) -> str:
+        """
+        Internal method to return the chunks of a PDF file that match a query best.
+
+        :param filepath: Path to the PDF file.
+        :param query: What to look for in the file.
+        :return: The best chunks in document order, within `max_length` words.
+        """
+        index = self.get_index(filepath)
+        selected, budget = [], self.max_length
+        for chunk_id, _ in index.search(query):
+            words = len(index.chunks[chunk_id].split())
+            if words > budget:
+                continue
+            selected.append(chunk_id)
+            budget -= words
+        if not selected:
+            logger.info(f"No passage matches the query, the beginning of the file is returned.")
+            return self._invoke(filepath)
+        return "\n\n".join(index.chunks[chunk_id] for chunk_id in sorted(selected))
+
+    def invoke(self, filepath: str, query: Optional[str] = None) -> str:
         """
         Public method to invoke the PDF reading and text extraction.
 
         :param filepath: Path to the PDF file.
+        :param query: Optional. In retrieval mode, the passages of the file matching it best are returned.
         :return: Extracted and truncated text from the PDF file.
         """
         try:
-            output = self._invoke(filepath)
-            output = self.truncate_string(output)  # Truncate the text according to a defined length
+            if self.retrieval and query:
+                output = self._retrieve(filepath, query)
+            else:
+                output = self._invoke(filepath)
         except Exception as e:
             logger.info(f"An error occurred: {e}")
             output = str(e)
@@ -1,9 +1,17 @@
-import ftfy
-from typing import Optional
+import re
+import httpx
+import threading
+import functools
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from miniagent.tools.base import BaseTool
+from miniagent.tools.cache import cached
+from miniagent.tools.html_extractor import EXTRACTORS, HTMLTextExtractor, extract_main_text
+from miniagent.tools.http_cache import CachedResponse, HTTPCache
 from miniagent.utils.register import TOOL_REGISTER
-from bs4 import BeautifulSoup
-from langchain_community.utilities.requests import TextRequestsWrapper
+from miniagent.utils.text import normalize_text
+from miniagent.utils.transport import get_transport
 from loguru import logger
 
 
@@ -11,21 +19,174 @@ DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Safari/537.36"
 }
 
+# URLs may contain commas (e.g. in their query string), so a comma only separates two URLs
+# when the next one starts with a scheme
+URL_SEPARATOR = re.compile(r"\s+|,(?=\s*[\"']?https?://)")
+
+
+def share_budget(lengths: List[int], budget: int) -> List[int]:
+    """
+    Shares a budget of characters between texts: short texts keep their length and what
+    they leave is shared equally between the longer ones.
+    """
+    shares = [0] * len(lengths)
+    remaining = budget
+    order = sorted(range(len(lengths)), key=lambda idx: lengths[idx])
+    for position, idx in enumerate(order):
+        shares[idx] = min(lengths[idx], remaining // (len(order) - position))
+        remaining -= shares[idx]
+    return shares
+
 
 @TOOL_REGISTER
 class ScrapTool(BaseTool):
     """
-    ScrapTool is designed to extract and return textual content from a given URL.
+    ScrapTool is designed to extract and return textual content from one or several URLs.
+    Several URLs are fetched concurrently over a shared pool of connections. By default the main
+    content of each page is extracted and boilerplate (navigation, headers, footers...) is dropped.
+    The main content can only be scored once the page is read, so at most 512 KB are downloaded.
+    With the "text" extractor, pages are parsed while they are downloaded, and the download stops
+    once enough text has been collected.
     """
     tool_name = "ScrapTool"
     tool_description = "Useful when you want to get detailed textual content from an url."
-    tool_args = [("url", "The url desired to search.")]
+    tool_args = [("url", "The url desired to search. Several urls can be separated by commas.")]
+    cache_ttl = 6 * 3600
 
-    def __init__(self, text_length: int = 8000):
+    def __init__(self,
+                 text_length: int = 8000,
+                 client: Optional[httpx.Client] = None,
+                 timeout: float = 10.0,
+                 max_workers: int = 8,
+                 max_per_host: int = 2,
+                 max_bytes: Optional[int] = None,
+                 extractor: Union[str, Callable[[str], str]] = "main",
+                 backend: str = "auto",
+                 http_cache: Optional[HTTPCache] = None):
+        """
+        Args:
+        - text_length (int): The maximum number of characters of the output, shared by all URLs.
+        - client (Optional[httpx.Client]): The HTTP client. The client of the shared transport is used if None.
+        - timeout (float): The timeout of each request in seconds.
+        - max_workers (int): The maximum number of URLs fetched at the same time.
+        - max_per_host (int): The maximum number of concurrent requests to the same host.
+        - max_bytes (Optional[int]): The maximum number of bytes downloaded from a URL. By default 2 MB with
+          the "text" extractor, which usually stops much earlier, and 512 KB with the other extractors,
+          which read the page to its end: they are faster, but ignore the end of longer pages.
+        - extractor (Union[str, Callable[[str], str]]): "main" for the main content, "text" for all the
+          visible text, or a function from HTML to text.
+        - backend (str): The HTML parser of the "main" extractor: "auto", "selectolax", "lxml" or "python".
+        - http_cache (Optional[HTTPCache]): An optional disk cache of the pages, revalidated with conditional requests.
+        """
         super().__init__()
         self.text_length = text_length
-        self.requests_wrapper = TextRequestsWrapper(headers=DEFAULT_HEADERS)
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        if max_bytes is None:
+            max_bytes = 2 * 1024 * 1024 if extractor == "text" else 512 * 1024
+        self.max_bytes = max_bytes
+        if isinstance(extractor, str) and extractor not in EXTRACTORS:
+            raise ValueError(f"Unknown extractor: {extractor}. Valid extractors are: {list(EXTRACTORS)}")
+        self.extractor = extractor
+        self.backend = backend
+        self.http_cache = http_cache
+        self._client = client if client is not None else get_transport().client()
+        self._host_limits: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.Semaphore(self.max_per_host)
+            return self._host_limits[host]
+
+    def _extract_function(self) -> Callable[[str], str]:
+        if callable(self.extractor):
+            return self.extractor
+        if self.extractor == "main":
+            return functools.partial(extract_main_text, backend=self.backend)
+        return EXTRACTORS[self.extractor]
+
+    def _extractor_key(self) -> Optional[str]:
+        # the name of the extraction under which its text is kept in the HTTP cache
+        if callable(self.extractor):
+            name = getattr(self.extractor, "__qualname__", None)
+            return f"{self.extractor.__module__}.{name}" if name and "<lambda>" not in name else None
+        if self.extractor == "text":
+            return f"text:{self.text_length}"
+        return f"{self.extractor}:{self.backend}"
+
+    def _read(self, response: httpx.Response, url: str):
+        """
+        Reads a streamed response, at most `max_bytes` bytes. With the "text" extractor, the page is
+        parsed while it is downloaded and the download stops once `text_length` characters are collected.
+
+        Returns:
+        - Tuple[str, bool, str]: The body read, whether it is the whole body, and the extracted text.
+        """
+        chunks = []
+        stream_extractor = HTMLTextExtractor(max_chars=self.text_length) if self.extractor == "text" else None
+        complete = True
+        for chunk in response.iter_text():
+            chunks.append(chunk)
+            if stream_extractor is not None:
+                stream_extractor.feed(chunk)
+            if (stream_extractor is not None and stream_extractor.done) or response.num_bytes_downloaded >= self.max_bytes:
+                logger.info(f"Stopped reading {url} after {response.num_bytes_downloaded} bytes.")
+                complete = False
+                break
+        body = "".join(chunks)
+        if stream_extractor is not None:
+            stream_extractor.close()
+            return body, complete, stream_extractor.text
+        return body, complete, self._extract_function()(body)
+
+    def _cached_text(self, url: str, entry: CachedResponse, key: Optional[str]) -> Optional[str]:
+        # the text of a cached response, extracted again from the cached body if needed
+        text = self.http_cache.get_text(url, key) if key is not None else None
+        if text is None and entry.complete:
+            body = self.http_cache.get_body(url)
+            if body is not None:
+                text = self._extract_function()(body)
+                if key is not None:
+                    self.http_cache.set_text(url, key, text)
+        return text
 
+    def _fetch_text(self, url: str) -> str:
+        """
+        Downloads a page and extracts its text. With an HTTP cache, a fresh cached page is used as is
+        and a stale one is revalidated with a conditional request; a 304 answer skips the parsing.
+        """
+        key = self._extractor_key()
+        entry = self.http_cache.lookup(url) if self.http_cache is not None else None
+        headers = dict(DEFAULT_HEADERS)
+        if entry is not None:
+            if entry.fresh:
+                text = self._cached_text(url, entry, key)
+                if text is not None:
+                    logger.info(f"{url} loaded from the HTTP cache.")
+                    return text
+            # only revalidate when a 304 answer can be served from the cache
+            if entry.complete or (key is not None and self.http_cache.get_text(url, key) is not None):
+                headers.update(entry.validators())
+        with self._host_limit(url):
+            with self._client.stream("GET", url, headers=headers, timeout=self.timeout, follow_redirects=True) as response:
+                if response.status_code == 304 and entry is not None:
+                    self.http_cache.revalidated(url, response.headers)
+                    text = self._cached_text(url, entry, key)
+                    if text is not None:
+                        logger.info(f"{url} was not modified, loaded from the HTTP cache.")
+                        return text
+                    raise RuntimeError(f"{url} was not modified but is missing from the HTTP cache.")
+                response.raise_for_status()
+                body, complete, text = self._read(response, url)
+        if self.http_cache is not None and self.http_cache.store(url, response.headers, body, complete) and key is not None:
+            self.http_cache.set_text(url, key, text)
+        return text
+
+    @cached
     def _invoke(self, url: str = None):
         """
         Internal method to fetch and process the content from the given URL.
@@ -38,29 +199,64 @@ class ScrapTool(BaseTool):
         """
         if not url:
             raise ValueError("URL must be provided")
-        res = self.requests_wrapper.get(url)
-        soup = BeautifulSoup(res, "html.parser") # extract text
-        content = ftfy.fix_text(soup.get_text())
+        content = normalize_text(self._fetch_text(url))
         content = content[: self.text_length]
         return content
 
-    def invoke(self, url):
+    def _invoke_many(self, urls: List[str]) -> str:
+        """
+        Internal method to fetch several URLs concurrently and combine their contents.
+
+        Args:
+        - urls (List[str]): The URLs to scrape.
+
+        Returns:
+        - str: The content of each URL under its URL, `text_length` characters in total.
+        """
+        def fetch(url):
+            try:
+                return self._invoke(url=url)
+            except Exception as e:
+                logger.info(f"An error occurred while scraping {url}: {e}")
+                return f"Error: {e}"
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            contents = list(executor.map(fetch, urls))
+        # the URL headers and the blank lines between the pages are part of the budget
+        headers = [f"URL: {url}\n" for url in urls]
+        budget = max(self.text_length - sum(len(header) for header in headers) - 2 * (len(urls) - 1), 0)
+        shares = share_budget([len(content) for content in contents], budget)
+        return "\n\n".join(header + content[:share] for header, content, share in zip(headers, contents, shares))
+
+    def parse_urls(self, url: Union[str, List[str]]) -> List[str]:
+        """
+        Splits the URL argument into a list of unique URLs, keeping their order.
+        """
+        urls = url if isinstance(url, (list, tuple)) else URL_SEPARATOR.split(url or "")
+        urls = [u.strip().strip("\"'[],") for u in urls]
+        return list(dict.fromkeys(u for u in urls if u))
+
+    def invoke(self, url: Union[str, List[str]]):
         """
         Public method to invoke the scraping tool with error handling.
 
         Args:
-        - url (str): The URL to scrape.
+        - url (Union[str, List[str]]): The URL to scrape, or several URLs as a list or separated by commas.
 
         Returns:
         - str: Extracted text content or an error message if an exception occurs.
         """
         try:
-            output = self._invoke(url=url)
+            urls = self.parse_urls(url)
+            if len(urls) > 1:
+                output = self._invoke_many(urls)
+            else:
+                output = self._invoke(url=urls[0] if urls else None)
         except Exception as e:
             logger.info(f"An error occurred: {e}")
             output = str(e)
         return output
-    
+
 
 if __name__ == "__main__":
     scraptool = ScrapTool()
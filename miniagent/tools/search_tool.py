@@ -1,34 +1,171 @@
 import json
-from typing import List
+import time
+import random
+import inspect
+import functools
+import threading
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from miniagent.tools.base import BaseTool
+from miniagent.tools.cache import cached
 from miniagent.utils.register import TOOL_REGISTER
-from search_engines import Duckduckgo, Google, Bing
 from loguru import logger
 
 
+STRATEGIES = ("race", "hedge", "merge", "sequential")
+
+
+@functools.lru_cache(maxsize=None)
+def accepts_timeout(engine_class: type) -> bool:
+    """
+    Whether an engine class takes a `timeout` argument, as the engines of search_engines do.
+    """
+    try:
+        return "timeout" in inspect.signature(engine_class).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+class CircuitBreaker:
+    """
+    CircuitBreaker skips a failing search engine. After `failure_threshold` consecutive failures
+    the circuit opens and the engine is skipped for `reset_timeout` seconds; then a single trial
+    request is let through, which closes the circuit on success or opens it again on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
 @TOOL_REGISTER
 class SearchTool(BaseTool):
     """
     SearchTool facilitates internet searches using multiple search engines.
-    It is designed to retry searches and parse results into a JSON format.
+    The engines are queried concurrently and the first non-empty result is used (or the results
+    are merged), each engine retrying with exponential backoff behind a circuit breaker.
+    The worker threads are stopped by `close`, which is also called when the tool is collected.
     """
     tool_name = "SearchTool"
     tool_description = "Useful for searching the internet when unsure about a concept or question."
     tool_args = [("query", "The content to search")]
+    cache_ttl = 3600
 
-    def __init__(self, pages: int = 1, top_k: int = 5, retry: int = 5) -> None:
+    def __init__(self,
+                 pages: int = 1,
+                 top_k: int = 5,
+                 retry: int = 5,
+                 strategy: str = "race",
+                 hedge_delay: float = 1.0,
+                 timeout: float = 30.0,
+                 backoff: float = 0.5,
+                 max_backoff: float = 8.0,
+                 failure_threshold: int = 3,
+                 reset_timeout: float = 60.0,
+                 engines: Optional[Sequence[type]] = None) -> None:
         """
         Initializes the SearchTool with specified settings for pages, top results, and retries.
 
         :param pages: Number of pages to search through.
         :param top_k: Number of top results to return.
-        :param retry: Number of retries if a search fails.
+        :param retry: Number of attempts per search engine.
+        :param strategy: "race" queries all engines at once and takes the first non-empty result,
+            "hedge" starts the next engine when the previous one failed or has not answered within
+            `hedge_delay` seconds, "merge" waits for all engines and merges their results by url,
+            "sequential" tries the engines one after the other.
+        :param hedge_delay: Seconds to wait for an engine before starting the next one with "hedge".
+        :param timeout: Overall time limit of a search in seconds.
+        :param backoff: Initial delay between the attempts of an engine, doubled after each failure.
+        :param max_backoff: Maximum delay between the attempts of an engine.
+        :param failure_threshold: Consecutive failures after which an engine is skipped.
+        :param reset_timeout: Seconds during which a failing engine is skipped.
+        :param engines: The search engine classes, Duckduckgo, Google and Bing by default. An engine
+            taking a `timeout` argument gets the search timeout.
         """
         super().__init__()
-        self.search_engine_list = [Duckduckgo(), Google(), Bing()]  # List of search engines
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}. Valid strategies are: {STRATEGIES}")
+        if engines is None:
+            from search_engines import Duckduckgo, Google, Bing
+            engines = [Duckduckgo, Google, Bing]
+        self.search_engine_list = list(engines)
         self.pages = pages
         self.top_k = top_k
         self.retry = retry
+        self.strategy = strategy
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breakers: Dict[str, CircuitBreaker] = {
+            engine.__name__: CircuitBreaker(failure_threshold, reset_timeout) for engine in self.search_engine_list}
+        # created on the first concurrent search; abandoned searches may still be running in it,
+        # so it is shared by the searches and never waited for
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # an engine keeps per-search state, so each one serves a single search at a time; idle
+        # engines are reused, so their sessions keep their connections alive between searches
+        self._idle_engines: Dict[str, List] = {engine.__name__: [] for engine in self.search_engine_list}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=4 * len(self.search_engine_list),
+                                                    thread_name_prefix="SearchTool")
+            return self._executor
+
+    def _acquire_engine(self, engine_class: type):
+        with self._lock:
+            idle = self._idle_engines[engine_class.__name__]
+            if idle:
+                return idle.pop()
+        # each request ends within the search timeout, so an abandoned engine releases its thread
+        return engine_class(timeout=self.timeout) if accepts_timeout(engine_class) else engine_class()
+
+    def _release_engine(self, engine_class: type, engine) -> None:
+        with self._lock:
+            self._idle_engines[engine_class.__name__].append(engine)
+
+    def close(self) -> None:
+        """
+        Stops the worker threads without waiting for the engines still running. Their requests are
+        bounded by the search timeout, so they do not hold the interpreter at exit. The tool can
+        still be used afterwards, with new threads.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __del__(self) -> None:
+        if getattr(self, "_executor", None) is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
 
     def parse(self, results: List[dict]) -> str:
         """
@@ -41,24 +178,133 @@ class SearchTool(BaseTool):
         output = output[:self.top_k]  # Limit output to top_k
         return json.dumps(output, indent=1)  # Convert to JSON with indentation
 
+    def merge(self, results_list: List[List[dict]]) -> List[dict]:
+        """
+        Interleaves the results of several engines, dropping duplicated urls.
+
+        :param results_list: The results of each engine, in order of preference.
+        :return: The merged results.
+        """
+        merged, seen = [], set()
+        for rank in range(max((len(results) for results in results_list), default=0)):
+            for results in results_list:
+                if rank < len(results):
+                    link = urlsplit(str(results[rank].get("link", "")))
+                    key = (link.netloc.lower().removeprefix("www."), link.path.rstrip("/"), link.query)
+                    if key not in seen:
+                        seen.add(key)
+                        merged.append(results[rank])
+        return merged
+
+    def _search_engine(self, engine_class: type, query: str, cancel: threading.Event, deadline: float) -> List[dict]:
+        """
+        Searches with one engine, retrying with exponential backoff and jitter until it returns results,
+        its circuit opens, the search is cancelled or the deadline is reached.
+
+        :return: The results, empty if the engine failed.
+        """
+        name = engine_class.__name__
+        breaker = self.breakers[name]
+        for attempt in range(self.retry):
+            if cancel.is_set() or time.monotonic() >= deadline:
+                break
+            if not breaker.allow():
+                logger.info(f"Skipping {name}, its circuit is open after repeated failures.")
+                break
+            try:
+                engine = self._acquire_engine(engine_class)
+                results = list(engine.search(query, pages=self.pages))
+                if results:
+                    self._release_engine(engine_class, engine)
+                    breaker.record_success()
+                    return results
+                logger.info(f"{name} returned no result.")
+            except Exception as e:
+                logger.error(f"Error during search with {name}: {e}")
+            # a failed engine is not reused, as it may have been banned or its session broken
+            breaker.record_failure()
+            if attempt + 1 < self.retry:
+                delay = min(self.backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1.0)
+                cancel.wait(min(delay, max(deadline - time.monotonic(), 0)))
+        else:
+            logger.error(f"All retries failed for {name}")
+        return []
+
+    def _search_concurrently(self, query: str) -> List[List[dict]]:
+        engines = self.search_engine_list
+        cancel = threading.Event()
+        deadline = time.monotonic() + self.timeout
+        pending, collected, launched = {}, [None] * len(engines), 0
+        executor = self._get_executor()
+
+        def launch():
+            nonlocal launched
+            future = executor.submit(self._search_engine, engines[launched], query, cancel, deadline)
+            pending[future] = launched
+            launched += 1
+
+        try:
+            launch()
+            while self.strategy != "hedge" and launched < len(engines):
+                launch()
+            while pending or launched < len(engines):
+                if not pending:
+                    launch()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.error(f"The search timed out after {self.timeout}s.")
+                    break
+                hedging = self.strategy == "hedge" and launched < len(engines)
+                done, _ = wait(list(pending), timeout=min(self.hedge_delay, remaining) if hedging else remaining,
+                               return_when=FIRST_COMPLETED)
+                if not done and hedging:
+                    launch()  # the engine is slow, start the next one alongside it
+                for future in done:
+                    index = pending.pop(future)
+                    results = future.result()
+                    if results and self.strategy != "merge":
+                        return [results]
+                    collected[index] = results
+                    # several engines may fail in the same round, but each one starts a single engine
+                    if not results and self.strategy == "hedge" and launched < len(engines):
+                        launch()
+        finally:
+            # the remaining engines stop before their next attempt
+            cancel.set()
+        return [results for results in collected if results]
+
+    @cached
+    def _invoke(self, query: str) -> str:
+        """
+        Performs the search using the specified query across multiple search engines.
+
+        :param query: The search query.
+        :return: JSON formatted string of search results.
+        """
+        if self.strategy == "sequential":
+            deadline = time.monotonic() + self.timeout
+            for engine in self.search_engine_list:
+                results = self._search_engine(engine, query, threading.Event(), deadline)
+                if results:
+                    return self.parse(results)
+        else:
+            results_list = self._search_concurrently(query)
+            if results_list:
+                return self.parse(self.merge(results_list))
+        raise RuntimeError("The search result is empty.")
+
     def invoke(self, query: str) -> str:
         """
-        Performs the search using the specified query across multiple search engines with retries.
+        Public method to invoke the search with error handling.
 
         :param query: The search query.
         :return: JSON formatted string of search results or an error message.
         """
-        for engine in self.search_engine_list:
-            for attempt in range(self.retry):
-                try:
-                    results = engine.search(query, pages=self.pages)
-                    if results:
-                        return self.parse(results)
-                except Exception as e:
-                    logger.error(f"Error during search with {engine.__class__.__name__}: {e}")
-                    if attempt == self.retry - 1:
-                        logger.error(f"All retries failed for {engine.__class__.__name__}")
-        return "The search result is empty."
+        try:
+            return self._invoke(query)
+        except Exception as e:
+            return str(e)
 
 # Example usage
 if __name__ == "__main__":
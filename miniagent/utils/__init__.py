@@ -1 +1,2 @@
-from .logger import setup_logging
\ No newline at end of file
+from .logger import setup_logging
+from .text import normalize_text, normalize_many
\ No newline at end of file
@@ -1,3 +1,4 @@
+import importlib
 from loguru import logger
 
 
@@ -13,7 +14,8 @@ class Register(dict):
         def add_item(key, value):
             if not callable(value):
                 raise Exception(f"Error:{value} must be callable!")
-            if key in self._dict:
+            # a lazy entry is replaced by its class once its module is imported
+            if key in self._dict and not isinstance(self._dict[key], str):
                 logger.warning(f"\033[31mWarning:\033[0m {value.__name__} already exists and will be overwritten!")
             self[key] = value
             return value
@@ -23,11 +25,25 @@ class Register(dict):
         else:              
             return lambda x : add_item(target, x)
 
+    def register_lazy(self, key, module):
+        """
+        Registers `key` without importing it: `module` is imported, and registers the real
+        target, the first time the entry is looked up.
+        """
+        if key not in self._dict:
+            self._dict[key] = module
+
     def __setitem__(self, key, value):
         self._dict[key] = value
 
     def __getitem__(self, key):
-        return self._dict[key]
+        value = self._dict[key]
+        if isinstance(value, str):
+            importlib.import_module(value)
+            value = self._dict[key]
+            if isinstance(value, str):
+                raise KeyError(f"{value} does not register {key}")
+        return value
 
     def __contains__(self, key):
         return key in self._dict
@@ -39,10 +55,10 @@ class Register(dict):
         return self._dict.keys()
 
     def values(self):
-        return self._dict.values()
+        return [self[key] for key in list(self._dict)]
 
     def items(self):
-        return self._dict.items()
+        return [(key, self[key]) for key in list(self._dict)]
     
     
 TOOL_REGISTER = Register()
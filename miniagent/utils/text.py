@@ -0,0 +1,86 @@
+import re
+from typing import Dict, Iterable, List
+
+
+# Lines made only of these characters are left unchanged by ftfy.fix_text: printable ASCII
+# without "&" (HTML entities), tabs, and CJK ideographs, kana and hangul, which no fixer touches
+# and which cannot be part of mojibake. Any other character sends its line through ftfy.
+SUSPICIOUS_CHAR = re.compile(r"[^\t\n\x20-\x25\x27-\x7e\u3041-\u3096\u309b-\u30ff\u4e00-\u9fff\uac00-\ud7a3]")
+
+HORIZONTAL_SPACES = re.compile(r"[ \t\xa0\u3000]+")
+TRAILING_SPACES = re.compile(r" +\n")
+BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def fix_text(text: str) -> str:
+    """
+    Returns the same text as ftfy.fix_text, running ftfy only on the lines which may need fixing.
+
+    ftfy fixes a text line by line, and stops unescaping HTML entities once it has seen a "<".
+    Clean lines are kept as is, and the other ones are fixed with the configuration ftfy would
+    use at that point of the text, so the result is identical.
+    """
+    match = SUSPICIOUS_CHAR.search(text)
+    if match is None:
+        return text
+    import ftfy  # only imported once a text needs fixing
+    no_html = ftfy.TextFixerConfig(unescape_html=False)
+    first_tag = text.find("<")
+    output, pos = [], 0
+    while match is not None:
+        start = text.rfind("\n", 0, match.start()) + 1
+        end = text.find("\n", match.start()) + 1 or len(text)
+        output.append(text[pos:start])
+        output.append(ftfy.fix_text(text[start:end], no_html if -1 < first_tag < start else None))
+        pos = end
+        match = SUSPICIOUS_CHAR.search(text, pos)
+    output.append(text[pos:])
+    return "".join(output)
+
+
+def collapse_whitespace(text: str) -> str:
+    """
+    Collapses runs of spaces and tabs into a single space, removes the spaces at the end of
+    lines and keeps at most one blank line between paragraphs.
+    """
+    text = HORIZONTAL_SPACES.sub(" ", text)
+    text = TRAILING_SPACES.sub("\n", text)
+    return BLANK_LINES.sub("\n\n", text).strip()
+
+
+def normalize_text(text: str, collapse: bool = False) -> str:
+    """
+    Fixes the encoding errors of a text (see `fix_text`) and optionally collapses its whitespace.
+
+    Args:
+    - text (str): The text to normalize.
+    - collapse (bool): Whether to collapse the whitespace.
+
+    Returns:
+    - str: The normalized text.
+    """
+    if not text:
+        return ""
+    text = fix_text(text)
+    return collapse_whitespace(text) if collapse else text
+
+
+def normalize_many(texts: Iterable[str], collapse: bool = False) -> List[str]:
+    """
+    Normalizes several texts, e.g. the pages of a document or the summaries of search results.
+    Duplicated texts, such as empty pages or repeated boilerplate, are normalized once.
+
+    Args:
+    - texts (Iterable[str]): The texts to normalize.
+    - collapse (bool): Whether to collapse the whitespace.
+
+    Returns:
+    - List[str]: The normalized texts, in the same order.
+    """
+    normalized: Dict[str, str] = {}
+    output = []
+    for text in texts:
+        if text not in normalized:
+            normalized[text] = normalize_text(text, collapse=collapse)
+        output.append(normalized[text])
+    return output
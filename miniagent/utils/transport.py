@@ -0,0 +1,266 @@
+import time
+import httpx
+import asyncio
+import weakref
+import threading
+import importlib.util
+from loguru import logger
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+@dataclass
+class PoolMetrics:
+    """
+    The connection pool metrics of a TransportManager.
+
+    Attributes:
+    - requests (int): The number of requests sent.
+    - connections_opened (int): The number of connections opened.
+    - reuse_ratio (float): The share of requests sent over an already open connection.
+    - open_connections (int): The number of connections currently open.
+    - idle_connections (int): The number of open connections kept alive for the next requests.
+    - avg_wait (float): The average time in seconds a request waited for a connection (including connecting).
+    - max_wait (float): The longest time in seconds a request waited for a connection.
+    """
+    requests: int = 0
+    connections_opened: int = 0
+    reuse_ratio: float = 0.0
+    open_connections: int = 0
+    idle_connections: int = 0
+    avg_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class _PoolRecorder:
+    """
+    Records the requests of a transport with the httpcore `trace` extension: a request which does
+    not open a TCP connection reuses one, and the time until its headers are sent is its wait time.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_opened = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def start(self, request: httpx.Request) -> Tuple[Callable[[str, Dict], None], Optional[Callable]]:
+        started = time.perf_counter()
+        previous = request.extensions.get("trace")
+        state = {"connected": False, "waited": False}
+
+        def record(name: str, info: Dict) -> None:
+            if name == "connection.connect_tcp.started":
+                state["connected"] = True
+            elif name.endswith("send_request_headers.started") and not state["waited"]:
+                state["waited"] = True
+                wait = time.perf_counter() - started
+                with self._lock:
+                    self.requests += 1
+                    self.connections_opened += state["connected"]
+                    self.total_wait += wait
+                    self.max_wait = max(self.max_wait, wait)
+        return record, previous
+
+    def trace(self, request: httpx.Request) -> None:
+        record, previous = self.start(request)
+
+        def trace(name: str, info: Dict) -> None:
+            record(name, info)
+            if previous is not None:
+                previous(name, info)
+        request.extensions["trace"] = trace
+
+    def atrace(self, request: httpx.Request) -> None:
+        record, previous = self.start(request)
+
+        async def trace(name: str, info: Dict) -> None:
+            record(name, info)
+            if previous is not None:
+                await previous(name, info)
+        request.extensions["trace"] = trace
+
+
+class _TracedTransport(httpx.HTTPTransport):
+    def __init__(self, recorder: _PoolRecorder, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._recorder = recorder
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._recorder.trace(request)
+        return super().handle_request(request)
+
+
+class _AsyncTracedTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, recorder: _PoolRecorder, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._recorder = recorder
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._recorder.atrace(request)
+        return await super().handle_async_request(request)
+
+
+class TransportManager:
+    """
+    TransportManager owns the HTTP clients shared by the LLM client and the network tools, so they
+    reuse the same pool of keep-alive connections (HTTP/2 when the `h2` package is installed) and
+    the pool limits bound the concurrency of the whole process.
+
+    The clients have no default headers, timeout or redirect policy of their own: each user sets
+    them per request. The connections of an asynchronous client are bound to the event loop which
+    opened them, so each running loop (e.g. each `asyncio.run`) gets its own asynchronous client,
+    which is dropped once the loop is closed. Libraries which do not use httpx (e.g. arxiv) share a single session object
+    through `shared`.
+
+    Attributes:
+    - http2 (bool): Whether the clients negotiate HTTP/2.
+    - limits (httpx.Limits): The limits of each connection pool.
+    - timeout (Optional[float]): The default timeout of a request in seconds, httpx's one if None.
+    """
+
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 timeout: Optional[float] = None,
+                 http2: Optional[bool] = None) -> None:
+        """
+        Args:
+        - max_connections (int): The maximum number of connections of each pool (sync and async).
+        - max_keepalive_connections (int): The maximum number of idle connections kept alive.
+        - keepalive_expiry (float): How long an idle connection is kept alive in seconds.
+        - timeout (Optional[float]): The default timeout of a request in seconds. It is left to httpx's
+          default by default, so the OpenAI client keeps its own longer timeout.
+        - http2 (Optional[bool]): Whether to use HTTP/2. By default, when `h2` is installed.
+        """
+        self.http2 = importlib.util.find_spec("h2") is not None if http2 is None else http2
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.timeout = timeout
+        self._recorder = _PoolRecorder()
+        self._client: Optional[httpx.Client] = None
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self._shared: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _client_kwargs(self) -> Dict[str, Any]:
+        return {"timeout": self.timeout} if self.timeout is not None else {}
+
+    def client(self) -> httpx.Client:
+        """
+        Returns the shared synchronous client, created on first use.
+        """
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                transport = _TracedTransport(self._recorder, http2=self.http2, limits=self.limits)
+                self._client = httpx.Client(transport=transport, **self._client_kwargs())
+                logger.info(f"Created the shared HTTP client (http2={self.http2}).")
+            return self._client
+
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Returns the shared asynchronous client of the running event loop, created on first use.
+        It must be called from a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            drop_closed_loops(self._async_clients)
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                transport = _AsyncTracedTransport(self._recorder, http2=self.http2, limits=self.limits)
+                client = self._async_clients[loop] = httpx.AsyncClient(transport=transport, **self._client_kwargs())
+            return client
+
+    def shared(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Returns the object shared under `name`, created with `factory` on first use, e.g. the
+        session of a library which does not use httpx.
+        """
+        with self._lock:
+            if name not in self._shared:
+                self._shared[name] = factory()
+            return self._shared[name]
+
+    def _pool_connections(self):
+        with self._lock:
+            drop_closed_loops(self._async_clients)
+            clients = [self._client, *self._async_clients.values()]
+        for client in clients:
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            if pool is not None and not client.is_closed:
+                yield from pool.connections
+
+    def metrics(self) -> PoolMetrics:
+        """
+        Returns the current metrics of the connection pools.
+        """
+        recorder = self._recorder
+        with recorder._lock:
+            requests, opened = recorder.requests, recorder.connections_opened
+            total_wait, max_wait = recorder.total_wait, recorder.max_wait
+        connections = [connection for connection in self._pool_connections() if not connection.is_closed()]
+        return PoolMetrics(
+            requests=requests,
+            connections_opened=opened,
+            reuse_ratio=(requests - opened) / requests if requests else 0.0,
+            open_connections=len(connections),
+            idle_connections=sum(connection.is_idle() for connection in connections),
+            avg_wait=total_wait / requests if requests else 0.0,
+            max_wait=max_wait)
+
+    def close(self) -> None:
+        """
+        Closes the synchronous client. The asynchronous ones are closed by `aclose`, or dropped
+        with their event loop.
+        """
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self) -> None:
+        """
+        Closes the asynchronous client of the running event loop.
+        """
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+def drop_closed_loops(per_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]") -> None:
+    """
+    Removes the entries of the closed event loops from a per-loop mapping. The entries usually
+    reference their loop through their connections, so they would never be collected otherwise.
+    """
+    for loop in [loop for loop in per_loop if loop.is_closed()]:
+        del per_loop[loop]
+
+
+_transport: Optional[TransportManager] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> TransportManager:
+    """
+    Returns the transport manager of the package, created with the default limits on first use.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = TransportManager()
+        return _transport
+
+
+def set_transport(transport: TransportManager) -> None:
+    """
+    Replaces the transport manager of the package, e.g. to change its limits. It must be called
+    before the clients and tools using the shared transport are created.
+    """
+    global _transport
+    with _transport_lock:
+        _transport = transport
@@ -0,0 +1,68 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+
+class LocalServer:
+    """
+    A local keep-alive HTTP server. Each route maps a path to a function of the request headers
+    returning the status, headers and body of the response.
+    """
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, Callable[[Dict[str, str]], Tuple[int, Dict[str, str], bytes]]] = {}
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+        self.connections = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle(self):
+                server.connections += 1
+                super().handle()
+
+            def respond(self):
+                headers = {name.lower(): value for name, value in self.headers.items()}
+                body = self.rfile.read(int(headers.get("content-length", 0)))
+                server.requests.append((self.command, self.path, headers))
+                route = server.routes.get(self.path.split("?")[0])
+                if route is None:
+                    status, response_headers, content = 404, {}, b"not found"
+                else:
+                    status, response_headers, content = route(headers, body)
+                self.send_response(status)
+                for name, value in response_headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = respond
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def route(self, path: str, status: int = 200, headers: Dict[str, str] = None, body=b"") -> None:
+        if not isinstance(body, bytes):
+            body = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.routes[path] = lambda request_headers, request_body: (status, dict(headers or {}), body)
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def http_server():
+    server = LocalServer()
+    yield server
+    server.close()
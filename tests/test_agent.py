@@ -0,0 +1,23 @@
+from miniagent.agent import Agent
+from miniagent.agent.scratchpad import Scratchpad
+
+
+def final_output(*steps):
+    scratchpad = Scratchpad()
+    for content, observation in steps:
+        scratchpad.append(content, observation)
+    return Agent._final_output(scratchpad)
+
+
+def test_final_output_ignores_ai_inside_words():
+    answer = final_output(
+        ("Thought: Do I need to use a tool? Yes\nAction: SearchTool\nAction Input: {'query': 'GPT-4'}",
+         "\nObservation: OpenAI: GPT-4 is a large multimodal model."),
+        ("Thought: Do I need to use a tool? No\nAI: GPT-4 was released by OpenAI: a research lab.", ""))
+    assert answer == "GPT-4 was released by OpenAI: a research lab."
+
+
+def test_final_output_without_answer_returns_the_last_step():
+    step = "Thought: Do I need to use a tool? Yes\nAction: SearchTool\nAction Input: {'query': 'OpenAI: news'}"
+    assert final_output((step, "")) == step
+    assert final_output() is None
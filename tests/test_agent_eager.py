@@ -0,0 +1,112 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+from miniagent.agent import Agent
+from miniagent.agent.parser import ReactAction
+from miniagent.tools import BaseTool, ToolList
+
+
+class FakeStreamingLLM:
+    """Streams a fixed response in chunks and records when the last chunk has been sent."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.finished = threading.Event()
+
+    def stream(self, messages, **kwargs):
+        for idx, chunk in enumerate(self.chunks):
+            if idx == len(self.chunks) - 1:
+                self.finished.set()
+            else:
+                time.sleep(0.05)  # leaves time to the tools dispatched during the stream
+            yield chunk
+
+    async def astream(self, messages, **kwargs):
+        for chunk in self.stream(messages, **kwargs):
+            yield chunk
+
+
+class RecordingTool(BaseTool):
+    tool_name = "Lookup"
+    tool_description = "Looks something up."
+    tool_args = [("query", "The query")]
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def invoke(self, query: str = "") -> str:
+        with self._lock:
+            self.calls.append((query, self.llm.finished.is_set()))
+        return f"result of {query}"
+
+
+class SideEffectTool(RecordingTool):
+    tool_name = "Send"
+    cacheable = False
+
+
+RESPONSE = [
+    "Thought: Do I need to use a tool? Yes\n",
+    "Action: Lookup\nAction Input: {'query':",
+    " 'first'}\nAct",
+    "ion: Send\nAction Input: {'query': 'mail'}\n",
+    "Action: Lookup\nAction Input: {'query': 'second'}\n",
+    "Thought: wait for the results",
+]
+
+
+def make_agent(chunks=RESPONSE):
+    llm = FakeStreamingLLM(chunks)
+    lookup, send = RecordingTool(llm), SideEffectTool(llm)
+    agent = Agent(llm=llm, tools=ToolList([lookup, send]), eager_tools=True)
+    return agent, lookup, send
+
+
+def test_eager_step_runs_each_action_once():
+    agent, lookup, send = make_agent()
+    _, observation, final = agent._eager_step([])
+    assert not final
+    assert sorted(query for query, _ in lookup.calls) == ["first", "second"]
+    # the first lookup started while the response was still streaming
+    assert ("first", False) in lookup.calls
+    assert [query for query, _ in send.calls] == ["mail"]
+    assert "[2] Send: result of mail" in observation
+
+
+def test_eager_step_waits_for_the_closing_brace():
+    agent, _, _ = make_agent()
+    truncated = "Thought: Do I need to use a tool? Yes\nAction: Lookup\nAction Input: {'query': 'a\nAction: Lookup\n"
+    # the dict of the first action is still open when a line starting with "Action:" is generated
+    assert agent._completed_actions(truncated, finished=False) == []
+    assert agent._completed_actions("".join(RESPONSE[:3]), finished=False) == []
+    assert len(agent._completed_actions("".join(RESPONSE[:4]), finished=False)) == 1
+
+
+def test_side_effect_tool_waits_for_the_final_response():
+    agent, _, send = make_agent()
+    agent._eager_step([])
+    assert send.calls == [("mail", True)]
+
+
+def test_dispatched_action_is_never_resubmitted():
+    agent, _, _ = make_agent()
+    future = Future()
+    future.set_result("dispatched output")
+    submitted = []
+    dispatched = {0: (ReactAction(name="Send", input="{'query': 'a'}"), future)}
+    actions, futures = agent._collect_actions(
+        [ReactAction(name="Send", input="{'query': 'a', 'extra': 1}")], dispatched, submitted.append)
+    assert submitted == []
+    assert actions == [dispatched[0][0]]
+    assert futures == [future]
+
+
+def test_async_eager_step_runs_each_action_once():
+    agent, lookup, send = make_agent()
+    _, observation, final = asyncio.run(agent._aeager_step([]))
+    assert not final
+    assert len(lookup.calls) == 2
+    assert send.calls == [("mail", True)]
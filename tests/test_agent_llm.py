@@ -0,0 +1,165 @@
+import json
+import asyncio
+from miniagent.agent import Agent
+from miniagent.llm import ChatGPT, LLMInput
+from miniagent.tools import BaseTool, ToolList
+
+ACTION = "Thought: Do I need to use a tool? Yes\nAction: Lookup\nAction Input: {'query': 'GPT-4'}"
+ANSWER = "Thought: Do I need to use a tool? No\nAI: GPT-4 was released in 2023."
+
+
+def completion(reply):
+    # a reply is the content of the message, or the message itself (e.g. with tool calls)
+    message = reply if isinstance(reply, dict) else {"role": "assistant", "content": reply}
+    return {
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo",
+        "choices": [{"index": 0, "finish_reason": "tool_calls" if "tool_calls" in message else "stop",
+                     "message": message}],
+    }
+
+
+def tool_call(call_id, name, arguments):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+
+def completion_stream(content, chunk_size=8):
+    chunks = []
+    for start in range(0, len(content), chunk_size):
+        chunk = {
+            "id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": "gpt-3.5-turbo",
+            "choices": [{"index": 0, "finish_reason": None, "delta": {"content": content[start:start + chunk_size]}}],
+        }
+        chunks.append(f"data: {json.dumps(chunk)}\n\n")
+    return ("".join(chunks) + "data: [DONE]\n\n").encode()
+
+
+class ChatServer:
+    """
+    Serves the chat completions API of a local server, answering the requests with `replies` in
+    order, and records the body of each request.
+    """
+
+    def __init__(self, http_server, replies):
+        self.replies = list(replies)
+        self.bodies = []
+        http_server.routes["/v1/chat/completions"] = self.respond
+        self.llm = ChatGPT(api_key="test", base_url=f"{http_server.url}/v1", max_retries=0)
+
+    def respond(self, headers, body):
+        self.bodies.append(json.loads(body))
+        if self.bodies[-1].get("stream"):
+            return 200, {"Content-Type": "text/event-stream"}, completion_stream(self.replies.pop(0))
+        return 200, {"Content-Type": "application/json"}, json.dumps(completion(self.replies.pop(0))).encode()
+
+
+class Lookup(BaseTool):
+    tool_name = "Lookup"
+    tool_description = "Looks something up."
+    tool_args = [("query", "The query")]
+
+    def invoke(self, query: str = "") -> str:
+        return f"{query} was released on March 14, 2023."
+
+
+def test_chatgpt_ainvoke(http_server):
+    chat = ChatServer(http_server, ["Hello!"])
+    response = asyncio.run(chat.llm.ainvoke([LLMInput(role="user", content="Hi")]))
+    assert response.content == "Hello!"
+    assert chat.bodies[0]["messages"] == [{"role": "user", "content": "Hi"}]
+
+
+def test_aexecute_runs_the_tools_and_returns_the_answer(http_server):
+    chat = ChatServer(http_server, [ACTION, ANSWER])
+    agent = Agent(llm=chat.llm, tools=ToolList([Lookup()]))
+    assert asyncio.run(agent.aexecute(input="When was GPT-4 released?")) == "GPT-4 was released in 2023."
+    prompt = chat.bodies[1]["messages"][-1]["content"]
+    assert "Observation: GPT-4 was released on March 14, 2023." in prompt
+
+
+def test_aexecute_runs_several_agents_on_one_loop(http_server):
+    chat = ChatServer(http_server, [ANSWER] * 3)
+    agent = Agent(llm=chat.llm, tools=ToolList([Lookup()]))
+
+    async def run():
+        return await asyncio.gather(*[agent.aexecute(input=f"Question {idx}") for idx in range(3)])
+
+    assert asyncio.run(run()) == ["GPT-4 was released in 2023."] * 3
+    assert sorted(body["messages"][-1]["content"].split("New input: ")[1][:10] for body in chat.bodies) == [
+        "Question 0", "Question 1", "Question 2"]
+
+
+def test_chatgpt_stream_sends_the_stop_sequences(http_server):
+    chat = ChatServer(http_server, ["Hello! How can I help you today?"])
+    chunks = list(chat.llm.stream([LLMInput(role="user", content="Hi")], stop=["\nObservation:"]))
+    assert len(chunks) > 1 and "".join(chunks) == "Hello! How can I help you today?"
+    assert chat.bodies[0]["stream"] is True and chat.bodies[0]["stop"] == ["\nObservation:"]
+
+
+def test_agent_sends_the_observation_stop_sequence(http_server):
+    chat = ChatServer(http_server, [ACTION, ANSWER])
+    agent = Agent(llm=chat.llm, tools=ToolList([Lookup()]))
+    assert agent.execute(input="When was GPT-4 released?") == "GPT-4 was released in 2023."
+    assert [body["stop"] for body in chat.bodies] == [["\nObservation:"]] * 2
+
+
+def test_streaming_agent_drops_the_hallucinated_observation(http_server):
+    chat = ChatServer(http_server, [ACTION + "\nObservation: GPT-4 was released in 1999.", ANSWER])
+    agent = Agent(llm=chat.llm, tools=ToolList([Lookup()]), stop=None, stream=True)
+    assert agent.execute(input="When was GPT-4 released?") == "GPT-4 was released in 2023."
+    prompt = chat.bodies[1]["messages"][-1]["content"]
+    assert "Observation: GPT-4 was released on March 14, 2023." in prompt and "1999" not in prompt
+    assert all(body["stream"] is True and "stop" not in body for body in chat.bodies)
+
+
+def test_message_mode_keeps_a_stable_prefix(http_server):
+    chat = ChatServer(http_server, [ACTION, ACTION, ANSWER])
+    agent = Agent(llm=chat.llm, tools=ToolList([Lookup()]), use_messages=True)
+    assert agent.execute(input="When was GPT-4 released?") == "GPT-4 was released in 2023."
+    first, second, third = [body["messages"] for body in chat.bodies]
+    assert [message["role"] for message in first] == ["system", "user"]
+    assert "Lookup" in first[0]["content"] and "When was GPT-4 released?" in first[1]["content"]
+    # every request extends the previous one, so the provider can reuse its cached prefix
+    assert second[:len(first)] == first and third[:len(second)] == second
+    assert [message["role"] for message in third[2:]] == ["assistant", "user"] * 2
+    assert third[2]["content"] == ACTION
+    assert "Observation: GPT-4 was released on March 14, 2023." in third[3]["content"]
+
+
+def test_tool_schema_requires_every_argument():
+    assert Lookup().tool_schema == {
+        "type": "function",
+        "function": {
+            "name": "Lookup",
+            "description": "Looks something up.",
+            "parameters": {
+                "type": "object",
+                "properties": {"query": {"type": "string", "description": "The query"}},
+                "required": ["query"],
+            },
+        },
+    }
+
+
+def test_function_calling_sends_the_tools_and_their_results(http_server):
+    calls = {"role": "assistant", "content": None, "tool_calls": [
+        tool_call("call_1", "Lookup", {"query": "GPT-4"}), tool_call("call_2", "Lookup", {"query": "GPT-3"})]}
+    chat = ChatServer(http_server, [calls, "GPT-4 was released in 2023."])
+    agent = Agent(llm=chat.llm, tools=ToolList([Lookup()]), function_calling=True)
+    assert agent.execute(input="When was GPT-4 released?") == "GPT-4 was released in 2023."
+    first, second = chat.bodies
+    assert first["tools"] == [Lookup().tool_schema] and "stop" not in first
+    assert [message["role"] for message in first["messages"]] == ["system", "user"]
+    assert "Action Input" not in first["messages"][0]["content"]
+    assert second["messages"][2]["tool_calls"] == calls["tool_calls"]
+    assert second["messages"][3:] == [
+        {"role": "tool", "tool_call_id": "call_1", "content": "GPT-4 was released on March 14, 2023."},
+        {"role": "tool", "tool_call_id": "call_2", "content": "GPT-3 was released on March 14, 2023."},
+    ]
+
+
+def test_function_calling_with_aexecute(http_server):
+    calls = {"role": "assistant", "content": None, "tool_calls": [tool_call("call_1", "Lookup", {"query": "GPT-4"})]}
+    chat = ChatServer(http_server, [calls, "GPT-4 was released in 2023."])
+    agent = Agent(llm=chat.llm, tools=ToolList([Lookup()]), function_calling=True)
+    assert asyncio.run(agent.aexecute(input="When was GPT-4 released?")) == "GPT-4 was released in 2023."
+    assert chat.bodies[1]["messages"][-1]["content"] == "GPT-4 was released on March 14, 2023."
@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime, timezone
+from miniagent.tools import ArxivTool
+from miniagent.tools.arxiv_store import ArxivEntry, ArxivStore, fts_query
+
+
+def paper(number, title, day):
+    date = datetime(2024, 1, day, tzinfo=timezone.utc)
+    return ArxivEntry(entry_id=f"http://arxiv.org/abs/2401.{number:05d}v1", title=title, authors=["Ada Lovelace"],
+                      summary=f"A paper about {title.lower()}.", published=date, updated=date)
+
+
+class FakeAPI:
+    """
+    Answers the searches of an ArxivTool with the papers of `papers`, newest first, recording the queries.
+    """
+
+    def __init__(self, papers):
+        self.papers = papers
+        self.queries = []
+        self.fail = False
+
+    def __call__(self, query, sort_by, sort_order):
+        self.queries.append(query)
+        if self.fail:
+            raise ConnectionError("arXiv is unavailable")
+        return sorted(self.papers, key=lambda entry: entry.published, reverse=True)[:3]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArxivStore(path=str(tmp_path / "arxiv.sqlite"))
+    yield store
+    store.close()
+
+
+def make_tool(store, papers):
+    tool = ArxivTool(store=store)
+    tool._search = FakeAPI(papers)
+    return tool
+
+
+def test_fts_query_keeps_the_terms():
+    assert fts_query('ti:"language agent" AND au:Yao') == '"language" OR "agent" OR "Yao"'
+    assert fts_query("AND OR") == ""
+
+
+def test_fresh_query_is_answered_from_the_store(store):
+    tool = make_tool(store, [paper(1, "Language agents", 1), paper(2, "Tool use", 2)])
+    first = tool.invoke("language agents")
+    assert first.startswith("Published: 2024-01-02\nURL: http://arxiv.org/abs/2401.00002v1\nTitle: Tool use")
+    assert tool.invoke("language agents") == first
+    assert tool._search.queries == ["language agents"]
+
+
+def test_stale_query_only_fetches_the_newer_papers(store):
+    store.max_age = 0
+    tool = make_tool(store, [paper(1, "Language agents", 1), paper(2, "Tool use", 2)])
+    tool.invoke("language agents")
+    tool._search.papers = [paper(3, "Agent benchmarks", 3)]
+    output = tool.invoke("language agents")
+    since, until = tool._search.queries[1].split("[")[1].rstrip("]").split(" TO ")
+    assert tool._search.queries[1].startswith("(language agents) AND submittedDate:[")
+    assert since == "202401020000" and until >= since
+    # the new paper comes first, followed by the stored ones
+    assert [line for line in output.splitlines() if line.startswith("Title")] == [
+        "Title: Agent benchmarks", "Title: Tool use", "Title: Language agents"]
+
+
+def test_stored_results_are_used_when_the_api_fails(store):
+    store.max_age = 0
+    tool = make_tool(store, [paper(1, "Language agents", 1)])
+    first = tool.invoke("language agents")
+    tool._search.fail = True
+    assert tool.invoke("language agents") == first
+
+
+def test_full_text_index_answers_queries_never_synced(store):
+    tool = make_tool(store, [paper(1, "Language agents", 1), paper(2, "Protein folding", 2)])
+    tool.invoke("cat:cs.AI")
+    tool._search.fail = True
+    output = tool.invoke('ti:"protein structure"')
+    assert "Title: Protein folding" in output and "Language agents" not in output
+    assert tool.invoke("quantum gravity") == "arXiv is unavailable"
@@ -0,0 +1,87 @@
+import time
+import random
+import asyncio
+import pytest
+from miniagent.agent.batch import run_batch, arun_batch
+
+
+def slow_echo(input: str, suffix: str = "") -> str:
+    time.sleep(random.uniform(0, 0.02))
+    if input == "boom":
+        raise RuntimeError("failed")
+    return input + suffix
+
+
+async def aslow_echo(input: str, suffix: str = "") -> str:
+    await asyncio.sleep(random.uniform(0, 0.02))
+    if input == "boom":
+        raise RuntimeError("failed")
+    return input + suffix
+
+
+INPUTS = [str(idx) for idx in range(20)]
+
+
+def test_ordered_batch_keeps_the_input_order():
+    results = list(run_batch(slow_echo, INPUTS, max_concurrency=4, suffix="!"))
+    assert [result.index for result in results] == list(range(20))
+    assert [result.output for result in results] == [f"{idx}!" for idx in range(20)]
+
+
+def test_unordered_batch_yields_every_result_once():
+    results = list(run_batch(slow_echo, INPUTS, max_concurrency=4, ordered=False))
+    assert sorted(result.index for result in results) == list(range(20))
+    assert all(result.output == INPUTS[result.index] for result in results)
+
+
+def test_failures_are_reported_in_the_results():
+    results = list(run_batch(slow_echo, ["a", "boom", {"input": "c", "suffix": "?"}], max_concurrency=2))
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, RuntimeError)
+    assert results[2].output == "c?"
+
+
+def test_concurrency_is_bounded():
+    running, peak = 0, 0
+
+    def track(input: str) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        time.sleep(0.01)
+        running -= 1
+        return input
+
+    list(run_batch(track, INPUTS, max_concurrency=3))
+    assert peak <= 3
+
+
+def test_inputs_are_consumed_lazily():
+    consumed = []
+
+    def inputs():
+        for item in INPUTS:
+            consumed.append(item)
+            yield item
+
+    results = run_batch(slow_echo, inputs(), max_concurrency=2)
+    next(results)
+    assert len(consumed) <= 3
+    results.close()
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_async_batch(ordered):
+    async def collect():
+        return [result async for result in arun_batch(aslow_echo, INPUTS + ["boom"], max_concurrency=4, ordered=ordered)]
+
+    results = asyncio.run(collect())
+    indexes = [result.index for result in results]
+    assert (indexes if ordered else sorted(indexes)) == list(range(21))
+    assert [result.ok for result in sorted(results, key=lambda result: result.index)] == [True] * 20 + [False]
+
+
+@pytest.mark.parametrize("batch", [run_batch, arun_batch])
+def test_invalid_concurrency_raises_at_the_call_site(batch):
+    with pytest.raises(ValueError):
+        batch(slow_echo, INPUTS, max_concurrency=0)
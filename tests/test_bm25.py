@@ -0,0 +1,66 @@
+import os
+from miniagent.tools import PDFReaderTool
+from miniagent.tools.bm25 import BM25Index, chunk_words
+
+
+CV_PDF = os.path.join(os.path.dirname(__file__), os.pardir, "examples", "cv.pdf")
+CHUNKS = [
+    "the agent calls a search tool and reads the results",
+    "kubernetes clusters run the pods of the agent",
+    "the agent writes an email with the results of the search",
+    "kubernetes kubernetes kubernetes manifests are deployed with argocd",
+]
+
+
+def test_chunks_share_their_overlap():
+    words = [str(idx) for idx in range(10)]
+    assert chunk_words(words, chunk_size=4, overlap=1) == ["0 1 2 3", "3 4 5 6", "6 7 8 9"]
+    assert chunk_words(words[:3], chunk_size=4, overlap=1) == ["0 1 2"]
+    assert chunk_words([], chunk_size=4) == []
+
+
+def test_rare_terms_rank_first():
+    index = BM25Index(CHUNKS)
+    ranking = [chunk_id for chunk_id, _ in index.search("Kubernetes pods")]
+    assert ranking[:2] == [1, 3]
+    # "the" appears in most chunks, so it barely changes the ranking
+    assert [chunk_id for chunk_id, _ in index.search("search email")][0] == 2
+    assert [chunk_id for chunk_id, _ in index.search("the search email")][0] == 2
+
+
+def test_term_frequency_saturates():
+    scores = dict(BM25Index(CHUNKS).search("kubernetes"))
+    assert scores[3] > scores[1]
+    assert scores[3] < 3 * scores[1]
+
+
+def test_unknown_terms_match_nothing():
+    assert BM25Index(CHUNKS).search("quantum") == []
+    assert BM25Index([]).search("agent") == []
+
+
+def test_index_round_trips_through_a_dict():
+    index = BM25Index(CHUNKS)
+    assert BM25Index.from_dict(index.to_dict()).search("agent search") == index.search("agent search")
+
+
+def test_query_argument_only_in_retrieval_mode():
+    assert [name for name, _ in PDFReaderTool().tool_args] == ["filepath"]
+    assert [name for name, _ in PDFReaderTool(retrieval=True).tool_args] == ["filepath", "query"]
+
+
+def test_optional_query_is_not_required_by_the_tool_schema():
+    parameters = PDFReaderTool(retrieval=True).tool_schema["function"]["parameters"]
+    assert list(parameters["properties"]) == ["filepath", "query"]
+    assert parameters["required"] == ["filepath"]
+
+
+def test_query_returns_the_matching_passages():
+    tool = PDFReaderTool(retrieval=True, max_length=60, chunk_size=30)
+    output = tool.invoke(CV_PDF, query="Kubernetes clusters")
+    assert "Kubernetes clusters" in output
+    assert len(output.split()) <= 60
+    # without a query, or when nothing matches, the beginning of the file is returned
+    beginning = tool.invoke(CV_PDF)
+    assert beginning.startswith("Claud D. Park")
+    assert tool.invoke(CV_PDF, query="zzzz") == beginning
@@ -0,0 +1,149 @@
+import os
+import sys
+import socketserver
+import subprocess
+import threading
+import pytest
+from miniagent.tools.email_tool import EmailOutbox, EmailTool, SMTPConnection
+
+
+class SMTPStandIn:
+    """
+    A minimal local SMTP server without TLS nor authentication. It counts the connections, keeps
+    the received messages and refuses the next `fail_next` senders with a temporary error.
+    """
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.messages = []
+        self.fail_next = 0
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self) -> None:
+                server.connections += 1
+                self.reply("220 localhost SMTP stand-in")
+                recipients = []
+                for line in self.rfile:
+                    verb = line.decode().strip().split(" ")[0].upper()
+                    if verb == "EHLO":
+                        self.reply("250-localhost")
+                        self.reply("250 8BITMIME")
+                    elif verb == "MAIL" and server.fail_next:
+                        server.fail_next -= 1
+                        self.reply("451 Try again later")
+                    elif verb == "MAIL":
+                        recipients = []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        recipients.append(line.decode().split(":", 1)[1].strip().strip("<>"))
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                        server.messages.append((recipients, data))
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("250 OK")
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def smtp_kwargs(self):
+        return dict(host="127.0.0.1", port=self.port, smtp_ssl=False, smtp_starttls=False, smtp_skip_login=True)
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStandIn()
+    yield server
+    server.close()
+
+
+def test_smtp_session_is_reused(smtp_server):
+    tool = EmailTool("agent@example.com", "unused", ["boss@example.com"], **smtp_server.smtp_kwargs)
+    assert tool.invoke("alice@example.com", "first", "hello") == "The email has been sent. You can execute the next step."
+    assert tool.invoke(["bob@example.com"], "second", "hello").startswith("The email has been sent")
+    tool.close()
+    assert tool.connection.connections == 1
+    assert smtp_server.connections == 1
+    assert [sorted(recipients) for recipients, _ in smtp_server.messages] == [
+        ["agent@example.com", "alice@example.com", "boss@example.com"],
+        ["agent@example.com", "bob@example.com", "boss@example.com"],
+    ]
+
+
+def test_smtp_session_is_reopened_after_a_drop(smtp_server):
+    tool = EmailTool("agent@example.com", "unused", [], **smtp_server.smtp_kwargs)
+    tool.invoke("alice@example.com", "first", "hello")
+    tool.connection._yag.smtp.close()
+    assert tool.invoke("alice@example.com", "second", "hello").startswith("The email has been sent")
+    tool.close()
+    assert tool.connection.connections == 2
+    assert len(smtp_server.messages) == 2
+
+
+def test_outbox_delivers_queued_emails(smtp_server):
+    tool = EmailTool("agent@example.com", "unused", [], outbox=True, batch_size=3, **smtp_server.smtp_kwargs)
+    replies = [tool.invoke(f"user{idx}@example.com", f"subject {idx}", "hello") for idx in range(5)]
+    assert all(reply.startswith("The email has been queued with id") for reply in replies)
+    tool.outbox.flush()
+    assert {message.status for message in tool.outbox.messages.values()} == {"sent"}
+    tool.close()
+    assert len(smtp_server.messages) == 5
+    assert tool.connection.connections == 1
+
+
+def test_outbox_retries_failed_emails(smtp_server):
+    connection = SMTPConnection("agent@example.com", "unused", **smtp_server.smtp_kwargs)
+    outbox = EmailOutbox(connection, max_retries=3, backoff=0.01)
+    smtp_server.fail_next = 2
+    sent = outbox.put(["alice@example.com"], "retried", "hello")
+    outbox.flush()
+    assert outbox.status(sent).status == "sent"
+    assert outbox.status(sent).attempts == 2
+    assert connection.connections == 1
+
+    smtp_server.fail_next = 3
+    failed = outbox.put(["bob@example.com"], "dropped", "hello")
+    outbox.flush()
+    outbox.close()
+    assert outbox.status(failed).status == "failed"
+    assert outbox.status(failed).attempts == 3
+    assert "Try again later" in outbox.status(failed).error
+    assert len(smtp_server.messages) == 1
+
+
+def test_outbox_keeps_a_bounded_history(smtp_server):
+    connection = SMTPConnection("agent@example.com", "unused", **smtp_server.smtp_kwargs)
+    outbox = EmailOutbox(connection, max_history=3)
+    ids = [outbox.put(["alice@example.com"], f"subject {idx}", "hello") for idx in range(6)]
+    outbox.flush()
+    outbox.close()
+    assert list(outbox.messages) == ids[3:]
+    assert outbox.status(ids[0]) is None
+
+
+def test_outbox_is_flushed_at_exit(smtp_server):
+    # the process exits without closing the tool, the queued email must still be sent
+    code = (
+        "from miniagent.tools.email_tool import EmailTool\n"
+        f"tool = EmailTool('agent@example.com', 'unused', [], outbox=True, **{smtp_server.smtp_kwargs!r})\n"
+        "tool.invoke('alice@example.com', 'at exit', 'hello')\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True, timeout=60)
+    assert len(smtp_server.messages) == 1
@@ -0,0 +1,104 @@
+import httpx
+import pytest
+import os
+from miniagent.tools.html_extractor import HTMLTextExtractor, available_backends, extract_main_text, extract_text
+from miniagent.tools.scrap_tool import ScrapTool
+
+
+PAGE = ("<html><head><title>Agents</title><style>p { color: red }</style></head><body>"
+        "<h1>Language agents</h1><p>They use <b>tools</b>,&nbsp;such as search &amp; scraping.</p>"
+        "<script>var hidden = 'never shown';</script><ul><li>ReAct</li><li>Toolformer</li></ul></body></html>")
+
+
+def test_extract_text_keeps_the_visible_text_one_line_per_block():
+    assert extract_text(PAGE) == "Agents\nLanguage agents\nThey use tools, such as search & scraping.\nReAct\nToolformer"
+
+
+@pytest.mark.parametrize("size", [1, 7, 64])
+def test_chunked_feed_matches_a_single_feed(size):
+    extractor = HTMLTextExtractor()
+    for start in range(0, len(PAGE), size):
+        extractor.feed(PAGE[start:start + size])
+    extractor.close()
+    assert extractor.text == extract_text(PAGE)
+
+
+def test_extractor_is_done_once_max_chars_are_collected():
+    extractor = HTMLTextExtractor(max_chars=20)
+    extractor.feed("<p>" + "word " * 3 + "</p>")
+    assert not extractor.done
+    extractor.feed("<p>" + "word " * 10 + "</p>")
+    assert extractor.done and extractor.length >= 20
+
+
+def chunked_client(chunks, sent):
+    def stream():
+        for chunk in chunks:
+            sent.append(chunk)
+            yield chunk
+
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"}, content=stream())
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_download_stops_once_enough_text_is_collected():
+    chunks = [b"<html><body>"] + [b"<p>" + b"agents use tools " * 60 + b"</p>"] * 500
+    sent = []
+    tool = ScrapTool(text_length=2000, client=chunked_client(chunks, sent), extractor="text")
+    output = tool.invoke("https://example.com/long")
+    assert len(output) == 2000
+    assert len(sent) < 10
+
+
+def test_download_stops_after_max_bytes():
+    chunks = [b"<html><body>"] + [b"<p>" + b"x" * 1000 + b"</p>"] * 100 + [b"<p>END</p>"]
+    sent = []
+    tool = ScrapTool(text_length=10 ** 6, max_bytes=20000, client=chunked_client(chunks, sent), extractor="text")
+    assert "END" not in tool.invoke("https://example.com/long")
+    assert len(sent) <= 22
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "fixtures", "html")
+ARTICLE = ("<html><head><title>Agents</title></head><body>"
+           "<nav class='navbar'><a href='/'>Home</a> <a href='/blog'>Blog</a></nav>"
+           "<div class='sidebar'><p>Subscribe to our newsletter, get updates, offers, and more news every week.</p></div>"
+           "<article class='post'>" + "<p>Language agents call tools, such as search engines, scrapers, and calculators.</p>" * 6
+           + "</article><footer>Copyright 2024, all rights reserved, terms and privacy.</footer></body></html>")
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_main_text_drops_the_boilerplate(backend):
+    text = extract_main_text(ARTICLE, backend=backend)
+    assert text.startswith("Agents\n")
+    assert text.count("Language agents call tools") == 6
+    assert "Home" not in text and "newsletter" not in text and "Copyright" not in text
+
+
+def test_backends_agree():
+    html = open(os.path.join(FIXTURES, "news_article.html"), encoding="utf-8").read()
+    texts = {backend: extract_main_text(html, backend=backend) for backend in available_backends()}
+    assert len(set(texts.values())) == 1
+
+
+@pytest.mark.parametrize("name", ["blog_post", "documentation", "news_article", "plain_divs"])
+def test_main_text_of_saved_pages(name):
+    html = open(os.path.join(FIXTURES, f"{name}.html"), encoding="utf-8").read()
+    gold = open(os.path.join(FIXTURES, f"{name}.txt"), encoding="utf-8").read()
+    text = extract_main_text(html)
+    lines = [line for line in gold.splitlines() if line]
+    assert sum(line in text for line in lines) >= 0.9 * len(lines)
+    assert len(text) < 1.5 * len(gold)
+
+
+def test_short_page_directly_in_the_body():
+    assert extract_main_text("<p>" + "a" * 500 + "</p>") == "a" * 500
+
+
+def test_main_extractor_reads_at_most_512_kb_by_default():
+    chunks = [b"<html><body><p>" + b"agents use tools, " * 50 + b"</p>"] + [b"<p>" + b"x" * 1000 + b"</p>"] * 1000
+    sent = []
+    tool = ScrapTool(text_length=10 ** 7, client=chunked_client(chunks, sent))
+    assert tool.max_bytes == 512 * 1024
+    assert "agents use tools" in tool.invoke("https://example.com/long")
+    assert len(sent) < 530
@@ -0,0 +1,142 @@
+import pytest
+from email.utils import formatdate
+from miniagent.tools.http_cache import HTTPCache, freshness_lifetime, parse_cache_control
+from miniagent.tools.scrap_tool import ScrapTool
+
+
+CACHEABLE = {"cache-control": "max-age=60"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPCache(path=str(tmp_path / "http.sqlite"), max_bytes=1000)
+    yield cache
+    cache.close()
+
+
+def stored_size(cache, url):
+    return cache._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()[0]
+
+
+def test_rewriting_a_text_does_not_inflate_the_size(cache):
+    cache.store("https://example.com/a", CACHEABLE, "x" * 100, complete=True)
+    for _ in range(5):
+        cache.set_text("https://example.com/a", "main:auto", "y" * 50)
+    cache.set_text("https://example.com/a", "text:8000", "z" * 20)
+    assert stored_size(cache, "https://example.com/a") == 170
+    cache.set_text("https://example.com/a", "main:auto", "y" * 10)
+    assert stored_size(cache, "https://example.com/a") == 130
+
+
+def test_size_is_counted_in_bytes(cache):
+    cache.store("https://example.com/a", CACHEABLE, "é" * 100, complete=True)
+    assert stored_size(cache, "https://example.com/a") == 200
+    cache.set_text("https://example.com/a", "main:auto", "文" * 10)
+    cache.set_text("https://example.com/a", "main:auto", "文" * 20)
+    assert stored_size(cache, "https://example.com/a") == 260
+
+
+def test_texts_are_evicted_with_their_page(cache):
+    cache.store("https://example.com/old", CACHEABLE, "x" * 400, complete=True)
+    cache.store("https://example.com/new", CACHEABLE, "x" * 400, complete=True)
+    cache.lookup("https://example.com/new")
+    # the texts push the cache over max_bytes, so the least recently used page goes
+    cache.set_text("https://example.com/new", "main:auto", "y" * 300)
+    assert cache.lookup("https://example.com/old") is None
+    assert cache.get_text("https://example.com/new", "main:auto") == "y" * 300
+    total = cache._conn.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+    assert total <= cache.max_bytes
+
+
+PAGE = b"<html><body><p>Cached page about agents.</p></body></html>"
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('public, max-age=60, no-cache="set-cookie"') == {
+        "public": None, "max-age": "60", "no-cache": "set-cookie"}
+
+
+@pytest.mark.parametrize("headers, lifetime", [
+    ({"cache-control": "max-age=60"}, 60.0),
+    ({"cache-control": "max-age=60", "age": "20"}, 40.0),
+    ({"cache-control": "max-age=60", "age": "90"}, 0.0),
+    ({"cache-control": "no-cache, max-age=60"}, 0.0),
+    ({"cache-control": "no-store"}, None),
+    ({"cache-control": "max-age=60", "vary": "Accept-Encoding"}, 60.0),
+    ({"cache-control": "max-age=60", "vary": "accept-encoding, Cookie"}, None),
+    ({"cache-control": "max-age=60", "vary": "*"}, None),
+    ({"cache-control": "max-age=oops"}, 0.0),
+    ({"expires": formatdate(1000 + 120, usegmt=True), "date": formatdate(1000, usegmt=True)}, 120.0),
+    ({"expires": "0"}, 0.0),
+    ({}, 0.0),
+])
+def test_freshness_lifetime(headers, lifetime):
+    assert freshness_lifetime(headers) == lifetime
+
+
+@pytest.fixture
+def scrap(cache):
+    tool = ScrapTool(extractor="text", http_cache=cache)
+    yield tool
+
+
+def test_fresh_page_is_served_without_a_request(scrap, http_server):
+    http_server.route("/fresh", headers={"Cache-Control": "max-age=60"}, body=PAGE)
+    url = f"{http_server.url}/fresh"
+    assert "Cached page about agents." in scrap.invoke(url)
+    assert "Cached page about agents." in scrap.invoke(url)
+    assert len(http_server.requests) == 1
+
+
+def test_stale_page_is_revalidated_with_its_etag(scrap, http_server):
+    def page(headers, body):
+        if headers.get("if-none-match") == '"v1"':
+            return 304, {"ETag": '"v1"', "Cache-Control": "no-cache"}, b""
+        return 200, {"ETag": '"v1"', "Cache-Control": "no-cache"}, PAGE
+    http_server.routes["/etag"] = page
+    url = f"{http_server.url}/etag"
+    first = scrap.invoke(url)
+    assert scrap.invoke(url) == first
+    assert len(http_server.requests) == 2
+    assert "if-none-match" not in http_server.requests[0][2]
+    assert http_server.requests[1][2]["if-none-match"] == '"v1"'
+
+
+def test_stale_page_is_revalidated_with_last_modified(scrap, http_server):
+    modified = formatdate(1000, usegmt=True)
+
+    def page(headers, body):
+        if headers.get("if-modified-since") == modified:
+            return 304, {}, b""
+        return 200, {"Last-Modified": modified, "Cache-Control": "max-age=0"}, PAGE
+    http_server.routes["/modified"] = page
+    url = f"{http_server.url}/modified"
+    assert scrap.invoke(url) == scrap.invoke(url)
+    assert http_server.requests[1][2]["if-modified-since"] == modified
+
+
+def test_modified_page_replaces_the_cached_one(scrap, http_server, cache):
+    versions = iter([b"<p>First version.</p>", b"<p>Second version.</p>"])
+    http_server.routes["/changing"] = lambda headers, body: (200, {"ETag": '"v"', "Cache-Control": "no-cache"}, next(versions))
+    url = f"{http_server.url}/changing"
+    assert "First version." in scrap.invoke(url)
+    assert "Second version." in scrap.invoke(url)
+    assert "Second version." in cache.get_body(url)
+
+
+def test_no_store_page_is_not_cached(scrap, http_server, cache):
+    http_server.route("/private", headers={"Cache-Control": "no-store"}, body=PAGE)
+    url = f"{http_server.url}/private"
+    scrap.invoke(url)
+    scrap.invoke(url)
+    assert len(http_server.requests) == 2
+    assert cache.lookup(url) is None
+
+
+def test_negotiated_page_is_not_cached(scrap, http_server, cache):
+    http_server.route("/negotiated", headers={"Cache-Control": "max-age=60", "Vary": "Accept-Language"}, body=PAGE)
+    url = f"{http_server.url}/negotiated"
+    scrap.invoke(url)
+    scrap.invoke(url)
+    assert len(http_server.requests) == 2
+    assert cache.lookup(url) is None
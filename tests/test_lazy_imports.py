@@ -0,0 +1,84 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from miniagent.utils.register import Register
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ["openai", "arxiv", "yagmail", "pypdf", "search_engines", "bs4", "ftfy", "lxml", "tiktoken"]
+
+
+def imported_modules(statement):
+    """
+    Runs `statement` in a fresh interpreter and returns the heavy modules it imported.
+    """
+    code = f"{statement}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    assert process.returncode == 0, process.stderr
+    return [m for m in process.stdout.strip().split(",") if m]
+
+
+@pytest.mark.parametrize("statement", [
+    "import miniagent.llm",
+    "import miniagent.tools",
+    "import miniagent.agent",
+    "from miniagent.tools import TOOL_REGISTER; assert 'ArxivTool' in TOOL_REGISTER",
+])
+def test_packages_do_not_import_heavy_dependencies(statement):
+    assert imported_modules(statement) == []
+
+
+def test_tools_import_their_own_dependencies_only():
+    assert imported_modules("from miniagent.tools import TOOL_REGISTER; TOOL_REGISTER['PDFReaderTool']()") == []
+    assert "arxiv" in imported_modules("from miniagent.tools import ArxivTool; ArxivTool()")
+
+
+def test_lazy_attributes_are_resolved_once():
+    import miniagent.tools as tools
+    assert "PDFReaderTool" in dir(tools)
+    assert tools.PDFReaderTool is tools.TOOL_REGISTER["PDFReaderTool"]
+    assert "PDFReaderTool" in vars(tools)
+    with pytest.raises(AttributeError):
+        tools.MissingTool
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    """
+    A module registering `PluginTool` in `register` when it is imported.
+    """
+    register = Register()
+    (tmp_path / "lazy_plugin.py").write_text(
+        "import sys\n"
+        "register = sys.modules['lazy_plugin_register']\n"
+        "@register\n"
+        "class PluginTool:\n"
+        "    pass\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(sys.modules, "lazy_plugin_register", register)
+    yield register
+    sys.modules.pop("lazy_plugin", None)
+
+
+def test_register_lazy_imports_the_module_on_lookup(plugin):
+    plugin.register_lazy("PluginTool", "lazy_plugin")
+    assert "PluginTool" in plugin and "lazy_plugin" not in sys.modules
+    assert plugin["PluginTool"].__name__ == "PluginTool"
+    assert "lazy_plugin" in sys.modules
+    assert plugin.items() == [("PluginTool", sys.modules["lazy_plugin"].PluginTool)]
+
+
+def test_register_lazy_does_not_replace_a_registered_target(plugin):
+    class PluginTool:
+        pass
+    plugin.register(PluginTool)
+    plugin.register_lazy("PluginTool", "lazy_plugin")
+    assert plugin["PluginTool"] is PluginTool
+    assert "lazy_plugin" not in sys.modules
+
+
+def test_module_which_does_not_register_the_key(plugin):
+    plugin.register_lazy("OtherTool", "lazy_plugin")
+    with pytest.raises(KeyError, match="does not register OtherTool"):
+        plugin["OtherTool"]
@@ -0,0 +1,103 @@
+import time
+import pytest
+from miniagent.llm import ChatGPT
+from miniagent.llm.base import LLMInput
+from miniagent.llm.cache import BaseCache, InMemoryCache, SQLiteCache, make_cache_key
+
+
+COMPLETION = {
+    "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Hello!"}}],
+}
+
+
+def test_cache_key_normalizes_equivalent_requests():
+    key = make_cache_key("gpt", [{"role": "user", "content": " hi \n", "name": None}], temperature=0, stop=["\n"])
+    assert key == make_cache_key("gpt", [{"role": "user", "content": "hi"}], stop=["\n"], temperature=0)
+    assert key != make_cache_key("gpt", [{"role": "user", "content": "hi"}], temperature=0)
+    assert key != make_cache_key("gpt-4", [{"role": "user", "content": "hi"}], temperature=0, stop=["\n"])
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def response_cache(request, tmp_path):
+    if request.param == "memory":
+        yield lambda **kwargs: InMemoryCache(**kwargs)
+    else:
+        caches = []
+
+        def make(**kwargs):
+            caches.append(SQLiteCache(path=str(tmp_path / "llm.sqlite"), evict_every=1, **kwargs))
+            return caches[-1]
+        yield make
+        for cache in caches:
+            cache.close()
+
+
+def test_hit_and_miss(response_cache):
+    cache = response_cache()
+    assert cache.get("key") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert cache.stats.hit_rate == 0.5
+
+
+def test_ttl_expiry(response_cache):
+    cache = response_cache(ttl=0.05)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted(response_cache):
+    cache = response_cache(max_size=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.stats.evictions == 1
+
+
+def test_sqlite_cache_checks_its_size_every_few_writes(tmp_path):
+    cache = SQLiteCache(path=str(tmp_path / "llm.sqlite"), max_size=2, evict_every=3)
+    for key in "abc":
+        time.sleep(0.01)
+        cache.set(key, key)
+    assert len(cache) == 2 and cache.get("a") is None
+    cache.set("d", "d")
+    cache.set("e", "e")
+    assert len(cache) == 4
+    cache.close()
+
+
+def test_base_cache_is_abstract():
+    with pytest.raises(TypeError):
+        BaseCache()
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    cache = SQLiteCache(path=path)
+    cache.set("key", "value")
+    cache.close()
+    cache = SQLiteCache(path=path)
+    assert cache.get("key") == "value"
+    cache.close()
+
+
+def test_chatgpt_serves_deterministic_requests_from_the_cache(http_server):
+    http_server.route("/v1/chat/completions", headers={"Content-Type": "application/json"}, body=COMPLETION)
+    llm = ChatGPT(api_key="test", base_url=f"{http_server.url}/v1", max_retries=0, cache=InMemoryCache())
+    messages = [LLMInput(role="user", content="Hi")]
+    assert llm.invoke(messages).content == "Hello!"
+    assert llm.invoke(messages).content == "Hello!"
+    assert len(http_server.requests) == 1
+    # sampled requests always go to the API
+    assert llm.invoke(messages, temperature=0.7).content == "Hello!"
+    assert len(http_server.requests) == 2
+    assert llm.cache.stats.hits == 1
@@ -0,0 +1,129 @@
+import time
+import pytest
+from miniagent.agent.parser import clean_value, parse_action_input, parse_react_output
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("filepath: ./examples/cv.pdf, query: work experience", {"filepath": "./examples/cv.pdf", "query": "work experience"}),
+    ("filepath: './examples/cv.pdf', query: 'work experience'", {"filepath": "./examples/cv.pdf", "query": "work experience"}),
+    ("filepath=\"cv.pdf\" ; query=skills", {"filepath": "cv.pdf", "query": "skills"}),
+    ("filepath: cv.pdf,\nquery: skills", {"filepath": "cv.pdf", "query": "skills"}),
+])
+def test_separator_between_arguments_is_removed(content, expected):
+    assert parse_action_input(content, ["filepath", "query"]) == (expected, None)
+
+
+def test_separator_inside_the_last_value_is_kept():
+    args, _ = parse_action_input("email: a@b.c, subject: Hi, contents: Thanks, Ray,", ["email", "subject", "contents"])
+    assert args == {"email": "a@b.c", "subject": "Hi", "contents": "Thanks, Ray,"}
+
+
+def test_clean_value_removes_separators_before_quotes():
+    assert clean_value("'a.pdf' ,\n", ",;") == "a.pdf"
+
+
+def test_final_answer_starts_at_a_line_starting_with_ai():
+    output = parse_react_output("Thought: Do I need to use a tool? No\nAI: OpenAI: the company behind GPT-4.")
+    assert output.final_answer == "OpenAI: the company behind GPT-4."
+    assert parse_react_output("Thought: Do I need to use a tool? No\nThe answer, per OpenAI: 42").final_answer is None
+
+
+def test_final_answer_keeps_its_following_lines():
+    text = "Thought: Do I need to use a tool? No\n  AI: Two papers:\n1. ReAct\nAI: a field of study\n2. Toolformer"
+    assert parse_react_output(text).final_answer == "Two papers:\n1. ReAct\nAI: a field of study\n2. Toolformer"
+
+
+EMAIL_ARGS = ["email", "subject", "contents"]
+
+
+def parse(text, input_args):
+    output = parse_react_output(text)
+    return output, [parse_action_input(action.input, input_args)[0] for action in output.actions]
+
+
+@pytest.mark.parametrize("text, input_args, name, expected", [
+    ("Thought: Do I need to use a tool? Yes\nAction: ArxivTool\nAction Input: {'query': 'language agent'}",
+     ["query"], "ArxivTool", {"query": "language agent"}),
+    ("Thought: Do I need to use a tool? Yes\nAction: PDFReaderTool\nAction Input: filepath: './examples/cv.pdf'",
+     ["filepath"], "PDFReaderTool", {"filepath": "./examples/cv.pdf"}),
+    ("Thought: Do I need to use a tool? Yes\nAction: ScrapTool\nAction Input: \"https://www.langchain.com\"\n",
+     ["url"], "ScrapTool", {"url": "https://www.langchain.com"}),
+    ("Thought: Do I need to use a tool? Yes\nAction: EmailTool\nAction Input: email: rayyang0116@gmail.com\n"
+     "subject: Papers about language agents\ncontents: 1. ReAct: Synergizing Reasoning and Acting in Language Models\n"
+     "2. Toolformer: Language Models Can Teach Themselves to Use Tools\n", EMAIL_ARGS, "EmailTool",
+     {"email": "rayyang0116@gmail.com", "subject": "Papers about language agents",
+      "contents": "1. ReAct: Synergizing Reasoning and Acting in Language Models\n"
+                  "2. Toolformer: Language Models Can Teach Themselves to Use Tools"}),
+    ("Thought: Do I need to use a tool? Yes\nAction: SearchTool\nAction Input: {'query': 'python asyncio'}\n"
+     "Observation: [{'link': 'https://docs.python.org/3/library/asyncio.html'}]", ["query"], "SearchTool",
+     {"query": "python asyncio"}),
+])
+def test_real_model_outputs(text, input_args, name, expected):
+    output, arguments = parse(text, input_args)
+    assert output.use_tool
+    assert [action.name for action in output.actions] == [name]
+    assert arguments == [expected]
+    assert "Observation:" not in output.content
+
+
+def test_final_answer_output():
+    output = parse_react_output(
+        "Thought: Do I need to use a tool? No\nAI: The candidate has six years of experience as a site reliability engineer.")
+    assert not output.use_tool and output.actions == []
+    assert output.final_answer == "The candidate has six years of experience as a site reliability engineer."
+
+
+def test_several_actions_in_one_step():
+    output, arguments = parse(
+        "Thought: Do I need to use a tool? Yes\nAction: SearchTool\nAction Input: {'query': 'ReAct'}\n"
+        "Action: SearchTool\nAction Input: {'query': 'Toolformer'}", ["query"])
+    assert [action.name for action in output.actions] == ["SearchTool", "SearchTool"]
+    assert arguments == [{"query": "ReAct"}, {"query": "Toolformer"}]
+
+
+def test_unexpected_dict_keys_are_reported():
+    arguments, error = parse_action_input("{'query': 'agents', 'limit': 3}", ["query"])
+    assert arguments == {"query": "agents", "limit": 3}
+    assert error == "The Action Input has incorrect input, Please check again."
+
+
+ADVERSARIAL = {
+    "hallucinated observation": (lambda n: "Thought: Do I need to use a tool? Yes\nAction: ArxivTool\nAction Input: "
+                                 "{'query': 'agents'}\nObservation: Published: 2024-01-01\nTitle: A paper\nSummary: "
+                                 + "lorem ipsum dolor sit amet " * n, ["query"]),
+    "punctuation lines": (lambda n: "Thought: Do I need to use a tool? Yes\nAction: EmailTool\nAction Input: "
+                          "email: a@b.c\ncontents: x" + "\n!" * n + "x", EMAIL_ARGS),
+    "long contents": (lambda n: "Thought: Do I need to use a tool? Yes\nAction: EmailTool\nAction Input: "
+                      "email: a@b.c\nsubject: report\ncontents: " + "line of the report,\n" * n, EMAIL_ARGS),
+    "no separators": (lambda n: "Thought: Do I need to use a tool? Yes\nAction: EmailTool\nAction Input: "
+                      "email: a@b.c subject " + "contents " * n, EMAIL_ARGS),
+}
+
+
+def test_adversarial_outputs():
+    outputs = {name: parse(build(5000), input_args) for name, (build, input_args) in ADVERSARIAL.items()}
+    output, arguments = outputs["hallucinated observation"]
+    # the hallucinated observation is cut
+    assert output.content.endswith("Action Input: {'query': 'agents'}")
+    assert arguments == [{"query": "agents"}]
+    arguments = outputs["punctuation lines"][1][0]
+    assert arguments["email"] == "a@b.c"
+    assert arguments["contents"].startswith("x\n!")
+    assert outputs["long contents"][1][0]["contents"].count("line of the report,") == 5000
+    assert outputs["no separators"][1] == [{"email": "a@b.c subject " + "contents " * 4999 + "contents"}]
+
+
+@pytest.mark.parametrize("name", list(ADVERSARIAL))
+def test_adversarial_outputs_are_parsed_in_linear_time(name):
+    build, input_args = ADVERSARIAL[name]
+
+    def duration(n):
+        text = build(n)
+        samples = []
+        for _ in range(3):
+            start = time.perf_counter()
+            parse(text, input_args)
+            samples.append(time.perf_counter() - start)
+        return min(samples)
+    # an input 8 times longer takes about 8 times longer to parse, 64 times if the parser were quadratic
+    assert duration(8000) < 24 * duration(1000)
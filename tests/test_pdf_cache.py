@@ -0,0 +1,47 @@
+import os
+import shutil
+from miniagent.tools.pdf_cache import PDFPageCache
+
+
+def disk_size(root):
+    return sum(os.path.getsize(os.path.join(directory, name))
+               for directory, _, names in os.walk(root) for name in names if name != "index.json")
+
+
+def test_overwriting_a_page_does_not_inflate_the_size(tmp_path):
+    cache = PDFPageCache(root=str(tmp_path), max_bytes=1000)
+    for text in ["a" * 300, "b" * 300, "c" * 100, "d" * 300]:
+        cache.set("doc", 0, text)
+    cache.set_page_count("doc", 1)
+    cache.set_page_count("doc", 1)
+    assert cache._size == disk_size(tmp_path) == 301
+    assert cache.get("doc", 0) == "d" * 300
+
+
+def test_least_recently_used_document_is_evicted(tmp_path):
+    cache = PDFPageCache(root=str(tmp_path), max_bytes=1000)
+    cache.set("old", 0, "a" * 400)
+    os.utime(tmp_path / "old", ns=(0, 0))
+    cache.set("new", 0, "b" * 400)
+    # rewriting the same pages stays under the limit
+    cache.set("new", 0, "b" * 400)
+    assert cache.has("old", 0)
+    cache.set("other", 0, "c" * 400)
+    assert not cache.has("old", 0)
+    assert cache.has("new", 0) and cache.has("other", 0)
+    assert cache._size == disk_size(tmp_path) == 800
+    # a new instance counts the same size from the disk
+    assert PDFPageCache(root=str(tmp_path), max_bytes=1000)._size == 800
+
+
+def test_document_evicted_during_a_read_is_a_miss(tmp_path, monkeypatch):
+    cache = PDFPageCache(root=str(tmp_path), max_bytes=1000)
+    cache.set("doc", 0, "text")
+    utime = os.utime
+
+    def evict_then_utime(path, *args, **kwargs):
+        # another process evicts the document right after the page is read
+        shutil.rmtree(path, ignore_errors=True)
+        utime(path, *args, **kwargs)
+    monkeypatch.setattr(os, "utime", evict_then_utime)
+    assert cache.get("doc", 0) is None
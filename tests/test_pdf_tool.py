@@ -0,0 +1,78 @@
+import os
+import pytest
+from pypdf import PageObject, PdfReader, PdfWriter
+from miniagent.tools import PDFReaderTool
+
+
+EXAMPLE_PDF = os.path.join(os.path.dirname(__file__), os.pardir, "examples", "example.pdf")
+
+
+@pytest.fixture
+def extracted_pages(monkeypatch):
+    pages = []
+    extract_text = PageObject.extract_text
+
+    def counting(self, *args, **kwargs):
+        pages.append(self)
+        return extract_text(self, *args, **kwargs)
+    monkeypatch.setattr(PageObject, "extract_text", counting)
+    return pages
+
+
+def test_reading_stops_once_max_length_words_are_read(extracted_pages):
+    # the first page has 446 words and the second one 668
+    output = PDFReaderTool(max_length=500).invoke(EXAMPLE_PDF)
+    assert len(output.split()) == 500
+    assert len(extracted_pages) == 2
+
+
+def test_pages_are_extracted_on_demand(extracted_pages):
+    pages = PDFReaderTool().iter_pages(EXAMPLE_PDF)
+    assert extracted_pages == []
+    first = next(pages)
+    assert len(extracted_pages) == 1
+    pages.close()
+    assert first.split() == PdfReader(EXAMPLE_PDF).pages[0].extract_text().split()
+
+
+def test_whole_document_within_max_length(extracted_pages):
+    output = PDFReaderTool(max_length=10 ** 6).invoke(EXAMPLE_PDF)
+    assert len(extracted_pages) == 13
+    assert len(output.split()) == sum(len(page.extract_text().split()) for page in PdfReader(EXAMPLE_PDF).pages)
+
+
+@pytest.fixture(scope="module")
+def long_pdf(tmp_path_factory):
+    # 16 pages, made by repeating the pages of the example
+    reader = PdfReader(EXAMPLE_PDF)
+    writer = PdfWriter()
+    for idx in range(16):
+        writer.add_page(reader.pages[idx % len(reader.pages)])
+    path = str(tmp_path_factory.mktemp("pdf") / "long.pdf")
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path, list(PDFReaderTool().iter_pages(path))
+
+
+def test_process_pool_output_matches_serial_output(long_pdf):
+    path, pages = long_pdf
+    tool = PDFReaderTool(max_length=10 ** 6, workers=2, pages_per_task=2, min_parallel_pages=4)
+    try:
+        assert list(tool.iter_pages(path)) == pages
+        # the pool is kept for the next documents, and its workers are not forked from the threaded process
+        executor = tool._executor
+        assert executor is not None and executor._mp_context.get_start_method() != "fork"
+        assert tool.invoke(path) == " ".join(" ".join(pages).split())
+        assert tool._executor is executor
+    finally:
+        tool.close()
+    assert tool._executor is None
+
+
+def test_process_pool_stops_early_with_the_word_budget(long_pdf):
+    path, pages = long_pdf
+    tool = PDFReaderTool(max_length=500, workers=2, pages_per_task=2, min_parallel_pages=4)
+    try:
+        assert tool.invoke(path) == " ".join(" ".join(pages).split()[:500])
+    finally:
+        tool.close()
@@ -0,0 +1,38 @@
+import pytest
+from miniagent.tools.scrap_tool import ScrapTool
+
+
+@pytest.fixture
+def tool():
+    return ScrapTool()
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://example.com/a", ["https://example.com/a"]),
+    ("https://example.com/a, https://example.com/b", ["https://example.com/a", "https://example.com/b"]),
+    ("https://example.com/a,https://example.com/b", ["https://example.com/a", "https://example.com/b"]),
+    ("https://example.com/a https://example.com/b\nhttps://example.com/a", ["https://example.com/a", "https://example.com/b"]),
+    ("['https://example.com/a', 'https://example.com/b']", ["https://example.com/a", "https://example.com/b"]),
+    ("https://example.com/search?q=a,b&tags=x,y", ["https://example.com/search?q=a,b&tags=x,y"]),
+    ("https://example.com/p/1,2,3, https://example.com/q?x=1,2",
+     ["https://example.com/p/1,2,3", "https://example.com/q?x=1,2"]),
+    ("https://example.com/a,", ["https://example.com/a"]),
+])
+def test_parse_urls_keeps_commas_inside_urls(tool, url, expected):
+    assert tool.parse_urls(url) == expected
+
+
+def test_parse_urls_accepts_a_list(tool):
+    assert tool.parse_urls(["https://example.com/x?a=1,2", "https://example.com/y"]) == [
+        "https://example.com/x?a=1,2", "https://example.com/y"]
+
+
+def test_combined_output_stays_within_text_length(http_server):
+    for path in ["/a", "/b", "/c"]:
+        http_server.route(path, headers={"Content-Type": "text/html"}, body=f"<p>{path[1] * 500}</p>")
+    tool = ScrapTool(text_length=300)
+    urls = [f"{http_server.url}{path}" for path in ["/a", "/b", "/c"]]
+    output = tool.invoke(", ".join(urls))
+    assert len(output) <= 300
+    assert all(f"URL: {url}\n" in output for url in urls)
+    assert "a" * 50 in output and "c" * 50 in output
@@ -0,0 +1,83 @@
+import random
+import pytest
+from miniagent.agent import scratchpad as scratchpad_module
+from miniagent.agent.scratchpad import Scratchpad
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # 4 characters per token, whether tiktoken is installed or not
+    monkeypatch.setattr(scratchpad_module, "get_encoding", lambda name="cl100k_base": None)
+
+
+def fill(max_tokens, steps=3, **kwargs):
+    scratchpad = Scratchpad(max_tokens=max_tokens, keep_last=1, compact_tokens=10, **kwargs)
+    for idx in range(steps):
+        scratchpad.append(f"step {idx} " + "c" * 32, "\nObservation: " + str(idx) * 400)
+    return scratchpad
+
+
+def test_no_compaction_within_budget():
+    scratchpad = fill(max_tokens=None)
+    assert all(step.observation == "\nObservation: " + str(idx) * 400 for idx, step in enumerate(scratchpad.steps))
+    assert scratchpad.to_text().count("\nObservation: ") == 3
+
+
+def test_stage_1_compresses_old_observations():
+    scratchpad = fill(max_tokens=200)
+    first, second, last = scratchpad.steps
+    assert first.compacted and second.compacted
+    assert first.observation.endswith("...[truncated]")
+    assert last.observation == "\nObservation: " + "2" * 400
+    assert scratchpad.tokens <= 200 and scratchpad.dropped == 0
+
+
+def test_stage_1_uses_the_summarizer():
+    scratchpad = fill(max_tokens=200, summarizer=lambda text, max_tokens: f"{len(text)} characters")
+    assert scratchpad.steps[0].observation == "\nObservation (summary): 400 characters"
+
+
+def test_failing_summarizer_falls_back_to_truncation():
+    def summarizer(text, max_tokens):
+        raise RuntimeError("the summary model is down")
+
+    scratchpad = fill(max_tokens=200, summarizer=summarizer)
+    assert scratchpad.steps[0].observation.endswith("...[truncated]")
+
+
+def test_stage_2_elides_old_observations():
+    scratchpad = fill(max_tokens=150)
+    assert [step.observation for step in scratchpad.steps[:2]] == ["\nObservation: [elided]"] * 2
+    assert scratchpad.tokens <= 150 and scratchpad.dropped == 0
+
+
+def test_stage_3_drops_old_steps():
+    scratchpad = fill(max_tokens=120)
+    assert scratchpad.dropped == 2 and len(scratchpad) == 1
+    assert scratchpad.steps[0].observation == "\nObservation: " + "2" * 400
+    assert scratchpad.to_text().startswith("[2 earlier steps were removed to save space]")
+    assert scratchpad.to_messages()[0].content == "[2 earlier steps were removed to save space]"
+
+
+def test_stage_4_truncates_the_kept_steps_within_budget():
+    scratchpad = fill(max_tokens=60)
+    assert scratchpad.steps[0].observation.endswith("...[truncated]")
+    assert scratchpad.tokens <= 60
+
+
+def test_budget_is_kept_at_every_step():
+    random.seed(0)
+    scratchpad = Scratchpad(max_tokens=300, keep_last=2, compact_tokens=20)
+    for idx in range(30):
+        content = f"Thought: Do I need to use a tool? Yes\nAction: Tool{idx}\nAction Input: {idx}"
+        scratchpad.append(content, "\nObservation: " + "x" * random.randint(0, 2000))
+        assert scratchpad.tokens <= 300
+    assert scratchpad.last.startswith(content)
+
+
+def test_rendering_matches_the_steps():
+    scratchpad = fill(max_tokens=150)
+    assert scratchpad.to_text() == "\n".join(step.content + step.observation for step in scratchpad.steps)
+    messages = scratchpad.to_messages()
+    assert [message.role for message in messages] == ["assistant", "user"] * 3
+    assert messages[1].content.startswith("Observation: [elided]")
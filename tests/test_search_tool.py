@@ -0,0 +1,100 @@
+import time
+import threading
+from miniagent.tools.search_tool import SearchTool
+
+
+def make_engine(name, delay=0.0, results=True, calls=None, timeouts=None, barrier=None):
+    class Engine:
+        def __init__(self, timeout=None):
+            if timeouts is not None:
+                timeouts.append(timeout)
+
+        def search(self, query, pages=1):
+            if calls is not None:
+                calls.append(name)
+            time.sleep(delay)
+            if barrier is not None:
+                barrier.wait(timeout=5)
+            return [{"link": f"https://{name}.com/{query}", "title": query}] if results else []
+    Engine.__name__ = name
+    return Engine
+
+
+def search_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("SearchTool")]
+
+
+def test_race_returns_the_first_result():
+    tool = SearchTool(engines=[make_engine("slow", delay=0.5), make_engine("fast")], backoff=0.0)
+    start = time.monotonic()
+    assert "https://fast.com/python" in tool.invoke("python")
+    assert time.monotonic() - start < 0.4
+    tool.close()
+
+
+def test_merge_drops_duplicated_urls():
+    same = {"link": "https://www.example.com/a/", "title": "a"}
+    tool = SearchTool(strategy="merge", engines=[make_engine("engine")])
+    merged = tool.merge([[same, {"link": "https://b.com"}], [{"link": "https://example.com/a"}, {"link": "https://c.com"}]])
+    assert [result["link"] for result in merged] == ["https://www.example.com/a/", "https://b.com", "https://c.com"]
+    tool.close()
+
+
+def test_engines_are_reused_between_searches():
+    timeouts = []
+    tool = SearchTool(engines=[make_engine("engine", timeouts=timeouts)], timeout=5.0)
+    tool.invoke("python")
+    tool.invoke("java")
+    assert timeouts == [5.0]
+    tool.close()
+
+
+def test_failed_engines_are_not_reused_nor_waited_for_after_the_last_retry():
+    timeouts = []
+    tool = SearchTool(engines=[make_engine("broken", results=False, timeouts=timeouts)], retry=2, backoff=0.5,
+                      strategy="sequential")
+    start = time.monotonic()
+    assert tool.invoke("python") == "The search result is empty."
+    assert time.monotonic() - start < 0.5
+    assert timeouts == [30.0, 30.0]
+
+
+def test_hedge_starts_one_engine_when_several_fail_together(monkeypatch):
+    import concurrent.futures
+    from miniagent.tools import search_tool
+
+    # the failed engines are returned by the same wait
+    def wait_all(fs, timeout=None, return_when=None):
+        return concurrent.futures.wait(fs, timeout=timeout, return_when=concurrent.futures.ALL_COMPLETED)
+    monkeypatch.setattr(search_tool, "wait", wait_all)
+    barrier, calls = threading.Barrier(2), []
+    engines = [make_engine("a", results=False, calls=calls, barrier=barrier),
+               make_engine("b", results=False, calls=calls, barrier=barrier),
+               make_engine("c", calls=calls)]
+    tool = SearchTool(engines=engines, strategy="hedge", hedge_delay=0.05, retry=1, backoff=0.0)
+    assert "https://c.com/python" in tool.invoke("python")
+    assert sorted(calls) == ["a", "b", "c"]
+    tool.close()
+
+
+def test_circuit_opens_after_repeated_failures():
+    calls = []
+    tool = SearchTool(engines=[make_engine("broken", results=False, calls=calls)], retry=5, backoff=0.0,
+                      failure_threshold=2, reset_timeout=60.0, strategy="sequential")
+    assert tool.invoke("python") == "The search result is empty."
+    assert tool.invoke("java") == "The search result is empty."
+    assert calls == ["broken", "broken"]
+
+
+def test_close_stops_the_worker_threads():
+    tool = SearchTool(engines=[make_engine("slow", delay=0.3), make_engine("fast")], backoff=0.0)
+    tool.invoke("python")
+    assert search_threads()
+    tool.close()
+    deadline = time.monotonic() + 2.0
+    while search_threads() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not search_threads()
+    # the tool creates new threads when it is used again
+    assert "https://fast.com/rust" in tool.invoke("rust")
+    tool.close()
@@ -0,0 +1,46 @@
+import ftfy
+import pytest
+from miniagent.utils.text import collapse_whitespace, fix_text, normalize_many, normalize_text
+
+TEXTS = {
+    "ascii": "Plain ASCII text.\nWith two lines, \"quotes\" and tabs\there.",
+    "cjk": "東京は日本の首都です.\nひらがなとカタカナ, 한국어도 있습니다.",
+    "mojibake": "The cafÃ© is open.\nClean line in between.\nâ€œQuotedâ€\x9d and Ã¼ber.",
+    "entities": "Fish &amp; chips &lt;3\nCaf&eacute; &#x263A;",
+    "after a tag": "AT&amp;T\n<p>Tom &amp; Jerry</p>\nBen &amp; Jerry's",
+    "tag on the same line": "x < y &amp; z\nA &amp; B",
+    "curly quotes": "It’s “fine” — really.\n",
+    "control characters": "Line\x00 with\x1b[31m escapes\r\nand​ zero width﻿.",
+    "ligatures": "The ﬁrst ﬂoor, ＦＵＬＬＷＩＤＴＨ.",
+    "mixed": "ok line\nnaÃ¯ve line\n\nok again\n&amp; more\n",
+}
+
+
+@pytest.mark.parametrize("text", TEXTS.values(), ids=TEXTS.keys())
+def test_fix_text_matches_ftfy(text):
+    assert fix_text(text) == ftfy.fix_text(text)
+
+
+def test_clean_text_is_not_fixed(monkeypatch):
+    monkeypatch.setattr(ftfy, "fix_text", lambda *args: pytest.fail("ftfy should not run on clean text"))
+    assert fix_text(TEXTS["ascii"]) == TEXTS["ascii"]
+    assert fix_text(TEXTS["cjk"]) == TEXTS["cjk"]
+
+
+def test_only_suspicious_lines_go_through_ftfy(monkeypatch):
+    lines = []
+    original = ftfy.fix_text
+    monkeypatch.setattr(ftfy, "fix_text", lambda text, config=None: lines.append(text) or original(text, config))
+    assert fix_text(TEXTS["mixed"]) == original(TEXTS["mixed"])
+    assert lines == ["naÃ¯ve line\n", "&amp; more\n"]
+
+
+def test_normalize_text():
+    assert normalize_text("") == ""
+    assert normalize_text("cafÃ©  \t au\xa0lait \n\n\n\nnext  \n", collapse=True) == "café au lait\n\nnext"
+    assert collapse_whitespace(" a \t b ") == "a b"
+
+
+def test_normalize_many_keeps_the_order():
+    texts = ["cafÃ©", "", "ok", "cafÃ©"]
+    assert normalize_many(texts) == ["café", "", "ok", "café"]
@@ -0,0 +1,90 @@
+import time
+import pytest
+from miniagent.llm.cache import InMemoryCache, SQLiteCache
+from miniagent.tools import BaseTool, ToolCache
+from miniagent.tools.cache import cached
+
+
+class CountingTool(BaseTool):
+    tool_name = "CountingTool"
+    tool_description = "Echoes its query."
+    tool_args = [("query", "The query")]
+
+    def __init__(self, top_k: int = 5) -> None:
+        self.top_k = top_k
+        self._calls = 0
+
+    @cached
+    def invoke(self, query: str) -> str:
+        self._calls += 1
+        if query == "fail":
+            raise RuntimeError("failed")
+        return f"{query} x{self.top_k}"
+
+
+class SideEffectTool(CountingTool):
+    tool_name = "SideEffectTool"
+    cacheable = False
+
+
+def test_entries_can_override_the_ttl(tmp_path):
+    for cache in [InMemoryCache(ttl=0.05), SQLiteCache(path=str(tmp_path / "tools.sqlite"), ttl=0.05)]:
+        cache.set("short", "value")
+        cache.set("long", "value", ttl=60)
+        time.sleep(0.1)
+        assert cache.get("short") is None
+        assert cache.get("long") == "value"
+    cache.close()
+
+
+def test_tool_cache_hit_and_miss():
+    tool = CountingTool()
+    tool.set_cache(ToolCache())
+    assert tool.invoke("python") == tool.invoke(" python ") == "python x5"
+    tool.invoke("rust")
+    assert tool._calls == 2
+    assert (tool.cache_stats.hits, tool.cache_stats.misses) == (1, 2)
+
+
+def test_tool_settings_are_part_of_the_key():
+    cache = ToolCache()
+    first, second = CountingTool(top_k=5), CountingTool(top_k=10)
+    first.set_cache(cache)
+    second.set_cache(cache)
+    assert first.invoke("python") == "python x5"
+    assert second.invoke("python") == "python x10"
+
+
+def test_tool_cache_ttl_policy():
+    tool = CountingTool()
+    tool.set_cache(ToolCache(default_ttl=60, ttl_policy={"CountingTool": 0.05}))
+    tool.invoke("python")
+    time.sleep(0.1)
+    tool.invoke("python")
+    assert tool._calls == 2
+
+
+def test_tool_cache_disk_tier(tmp_path):
+    path = str(tmp_path / "tools.sqlite")
+    tool = CountingTool()
+    tool.set_cache(ToolCache(path=path))
+    tool.invoke("python")
+    # a new process starts with an empty memory tier
+    other = CountingTool()
+    other.set_cache(ToolCache(path=path))
+    assert other.invoke("python") == "python x5"
+    assert other._calls == 0
+
+
+def test_failures_and_side_effects_are_not_cached():
+    tool = CountingTool()
+    tool.set_cache(ToolCache())
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            tool.invoke("fail")
+    assert tool._calls == 2
+    side_effect = SideEffectTool()
+    side_effect.set_cache(ToolCache())
+    side_effect.invoke("send")
+    side_effect.invoke("send")
+    assert side_effect.cache is None and side_effect._calls == 2
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from miniagent.llm import ChatGPT
+from miniagent.llm.base import LLMInput
+from miniagent.utils import transport as transport_module
+from miniagent.utils.transport import TransportManager, get_transport, set_transport
+
+
+COMPLETION = {
+    "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Hello!"}}],
+}
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    monkeypatch.setattr(transport_module, "_transport", None)
+    manager = TransportManager(http2=False)
+    set_transport(manager)
+    yield manager
+    manager.close()
+
+
+def test_sync_client_reuses_connections(transport, http_server):
+    http_server.route("/page", body="ok")
+    client = get_transport().client()
+    for _ in range(5):
+        assert client.get(f"{http_server.url}/page").status_code == 200
+    metrics = transport.metrics()
+    assert metrics.requests == 5
+    assert metrics.connections_opened == 1
+    assert metrics.reuse_ratio == pytest.approx(0.8)
+
+
+def test_async_client_survives_repeated_asyncio_run(transport, http_server):
+    http_server.route("/page", body="ok")
+
+    async def fetch():
+        response = await get_transport().async_client().get(f"{http_server.url}/page")
+        return response.status_code
+
+    # each asyncio.run closes its loop, which used to break the keep-alive connections of the next run
+    assert [asyncio.run(fetch()) for _ in range(3)] == [200, 200, 200]
+    assert len(transport._async_clients) <= 1
+
+
+def test_async_client_is_shared_within_a_loop(transport):
+    async def clients():
+        return get_transport().async_client(), get_transport().async_client()
+
+    first, second = asyncio.run(clients())
+    assert first is second
+    other, _ = asyncio.run(clients())
+    assert other is not first
+
+
+def test_chatgpt_ainvoke_with_repeated_asyncio_run(transport, http_server):
+    http_server.route("/v1/chat/completions", headers={"Content-Type": "application/json"}, body=COMPLETION)
+    llm = ChatGPT(api_key="test", base_url=f"{http_server.url}/v1", max_retries=0)
+    message = LLMInput(role="user", content="Hi")
+    for _ in range(3):
+        assert asyncio.run(llm.ainvoke([message])).content == "Hello!"
+    assert llm.invoke([message]).content == "Hello!"